@@ -18,6 +18,7 @@ echo "Creating Symbolic links..!"
 
 declare -a fileList=("headers.py"
 	"functions.py"
+	"beamframe.py"
 	"classes.py")
 
 for i in "${fileList[@]}"; do
@@ -0,0 +1,167 @@
+from headers import *
+
+class BeamFrame:
+    """Beam direction and beam frame precomputed once as numpy constants.
+       Longitudinal/Transverse work on scalars and numpy arrays and give the same
+       values as vec.Dot(beamDir) and vec - (vec.Dot(beamDir))*beamDir with the
+       TVector3 of AverageBeamDirection().
+    """
+    def __init__(self, dirX, dirY, dirZ):
+        """Initialize the frame from a (not necessarily unit) beam direction
+
+        Args:
+            dirX, dirY, dirZ (double): beam direction
+        """
+        # normalized exactly like TVector3.Unit()
+        tot2 = dirX*dirX + dirY*dirY + dirZ*dirZ
+        tot  = 1.0/sqrt(tot2) if (tot2 > 0) else 1.0
+
+        self.unit      = (dirX*tot, dirY*tot, dirZ*tot)
+        self.direction = np.array(self.unit)
+        # TVector3 created on first use, building the frame does not import ROOT
+        self.vector    = None
+
+        # rows: transverse axes (x' perpendicular to the beam in the horizontal plane, y' = z' x x') and the beam
+        beamAxis = self.direction
+        xAxis    = np.cross([0.0, 1.0, 0.0], beamAxis)
+        xAxis    = xAxis/np.linalg.norm(xAxis)
+        yAxis    = np.cross(beamAxis, xAxis)
+
+        self.rotation = np.array([xAxis, yAxis, beamAxis])
+        self.direction.setflags(write=False)
+        self.rotation.setflags(write=False)
+
+    def GetDirection(self):
+        """Unit beam direction as a TVector3. Every call gets its own copy, modifying it
+           does not change the frame
+
+        Returns:
+            TVector3: beam direction
+        """
+        if (self.vector is None):
+            self.vector = ROOT.TVector3(*self.unit)
+        return ROOT.TVector3(self.vector)
+
+    def GetUnitArray(self):
+        return self.direction
+
+    def GetRotation(self):
+        """Rotation matrix into the beam frame (third axis = beam)
+
+        Returns:
+            numpy array: 3x3 matrix
+        """
+        return self.rotation
+
+    def Longitudinal(self, x, y, z):
+        """Component along the beam
+
+        Args:
+            x, y, z (double, numpy array): vector components
+
+        Returns:
+            double, numpy array: longitudinal component
+        """
+        bx, by, bz = self.unit
+        return x*bx + y*by + z*bz
+
+    def Transverse(self, x, y, z):
+        """Vector component perpendicular to the beam
+
+        Args:
+            x, y, z (double, numpy array): vector components
+
+        Returns:
+            list: [x, y, z] of the transverse component
+        """
+        bx, by, bz = self.unit
+        pl         = x*bx + y*by + z*bz
+        return [x - pl*bx, y - pl*by, z - pl*bz]
+
+    def TransverseMag(self, x, y, z):
+        """Magnitude of the component perpendicular to the beam
+
+        Args:
+            x, y, z (double, numpy array): vector components
+
+        Returns:
+            double, numpy array: transverse magnitude
+        """
+        tx, ty, tz = self.Transverse(x, y, z)
+        return np.sqrt(tx*tx + ty*ty + tz*tz)
+
+    def ToBeamFrame(self, x, y, z):
+        """Rotate vectors into the beam frame
+
+        Args:
+            x, y, z (double, numpy array): vector components
+
+        Returns:
+            list: [x', y', z'] with z' along the beam
+        """
+        r = self.rotation
+        return [r[0][0]*x + r[0][1]*y + r[0][2]*z,
+                r[1][0]*x + r[1][1]*y + r[1][2]*z,
+                r[2][0]*x + r[2][1]*y + r[2][2]*z]
+
+class BeamFrameMap:
+    """Beam frames of individual runs (e.g. from a per-run beam direction map),
+       every frame is built once when the map is created
+    """
+    def __init__(self, runDirections, default=None):
+        """Initialize the map
+
+        Args:
+            runDirections (dict): run number -> [dirX, dirY, dirZ]
+            default (BeamFrame): frame of runs missing in the map (None = DefaultBeamFrame)
+        """
+        self.default    = default if (default is not None) else DefaultBeamFrame
+        self.frames     = {int(run): BeamFrame(*direction) for run, direction in runDirections.items()}
+        self.runs       = np.array(sorted(self.frames), dtype=np.int64)
+        self.directions = np.array([self.frames[run].unit for run in self.runs] + [self.default.unit]).reshape(-1, 3)
+
+    def GetFrame(self, run):
+        return self.frames.get(int(run), self.default)
+
+    def GetDirectionArrays(self, runs):
+        """Unit beam direction of every event
+
+        Args:
+            runs (numpy array): run number of every event
+
+        Returns:
+            list: [bx, by, bz] numpy arrays
+        """
+        runs = np.asarray(runs, dtype=np.int64)
+        # runs that are not in the map use the last row (default frame)
+        if (len(self.runs) == 0):
+            index = np.zeros(len(runs), dtype=np.int64)
+        else:
+            index = np.minimum(np.searchsorted(self.runs, runs), len(self.runs) - 1)
+            index = np.where(self.runs[index] == runs, index, len(self.runs))
+        return [self.directions[index, 0], self.directions[index, 1], self.directions[index, 2]]
+
+    def Longitudinal(self, runs, x, y, z):
+        bx, by, bz = self.GetDirectionArrays(runs)
+        return x*bx + y*by + z*bz
+
+    def Transverse(self, runs, x, y, z):
+        bx, by, bz = self.GetDirectionArrays(runs)
+        pl         = x*bx + y*by + z*bz
+        return [x - pl*bx, y - pl*by, z - pl*bz]
+
+# Average NuMI beam direction used by the kinematics functions
+DefaultBeamFrame = BeamFrame(0.0011401229, -0.061901052, 0.99807253)
+beamFrame        = DefaultBeamFrame
+
+def GetBeamFrame():
+    return beamFrame
+
+def SetBeamFrame(frame):
+    """Change the beam frame used by AverageBeamDirection() and the kinematics functions
+
+    Args:
+        frame (BeamFrame): new beam frame (None = DefaultBeamFrame)
+    """
+    global beamFrame
+    beamFrame = frame if (frame is not None) else DefaultBeamFrame
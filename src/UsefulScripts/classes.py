@@ -4,6 +4,30 @@ from functions import *
 
 scale = 1.3562/1.9291582726279203
 
+# Branches needed to build the reconstructed |t| histograms in columnar mode
+recoTBranches     = ["BestKalmanMuonID", "FinalPionID", "FinalHitScore", "NewKinematicScore", "RecoTKalman", "weight"]
+recoTDataBranches = ["BestKalmanMuonID", "FinalPionID", "FinalHitScore", "NewKinematicScore", "RecoTKalman"]
+
+# Cumulative cuts of the cut table (see CutTableCell): histogram name -> conditions
+cutTableCuts = [["npngsMuonID", [("BestKalmanMuonID" , ">" , 0.4 )]],
+                ["npngsPionID", [("FinalPionID"      , ">" , 0.3 )]],
+                ["npngsHitID" , [("FinalHitScore"    , ">" , 0.46)]],
+                ["npngsKID"   , [("RecoTKalman"      , ">=", 0   ),
+                                 ("NewKinematicScore", ">" , 0.84)]]]
+
+# Interaction categories of the cut table: name -> [inttype, iscc] (see CutTableCell)
+cutTableCategories = {"All"  : [999, 1],
+                      "CCQE" : [0  , 1],
+                      "CCRES": [1  , 1],
+                      "CCDIS": [2  , 1],
+                      "CCCOH": [3  , 1],
+                      "CCMEC": [10 , 1],
+                      "NC"   : [-1 , 0]}
+
+# Cuts applied by the |t| builders (loops and region masks), the same dicts key the cached histograms (see HistCache)
+signalRegionCuts     = {"muonIDCut": 0.4, "pionIDCut": 0.3 , "hitIDCut": 0.46, "kinematicIDCut": 0.84, "recoTCut": 0}
+backgroundRegionCuts = {"muonIDCut": 0.4, "pionIDCut": 0.05, "hitIDCut": 0.05, "kinematicIDCut": 0.84, "recoTCut": 0}
+
 class CutTableEntries:
     """Get saved entries in histogram file and return as a python list
 
@@ -52,18 +76,45 @@ class LoadFile:
         :param  fileName:   Name of the ROOT File that ends with .root
         :type   fileName:   .root
     """
-    def __init__(self, fileName):
+    def __init__(self, fileName, lazy=False, maxCachedHists=None):
+        """Open the ROOT file
+
+        Args:
+            fileName (string): Name of the ROOT File
+            lazy (bool): only index the keys, trees and histograms are read when they are requested
+            maxCachedHists (int): lazy mode only, maximum number of detached directory histograms
+                                  kept in memory, the least recently used ones are dropped (None = no limit)
+        """
         self.file   =   ROOT.TFile.Open(fileName,"READ")
+        self.lazy   =   lazy
         self.Trees  =   []
         self.TH1    =   [] 
         self.TH2    =   []
         self.pot    =   []
 
+        self.treeKeys       = []
+        self.dirKeys        = []
+        self.potKey         = None
+        self.cachedTrees    = {}
+        self.cachedHists    = OrderedDict()
+        self.maxCachedHists = maxCachedHists
+
         keys = self.file.GetListOfKeys()
         i = 0
         j = 0
         for key in keys:
             #print(key.GetClassName())
+            if (lazy):
+                if(key.GetClassName() == "TTree"):
+                    self.treeKeys.append(key.GetName())
+
+                if ((key.GetClassName() == 'TH1D') and (key.GetName()=='TotalPOT')):
+                    self.potKey = key.GetName()
+
+                if(key.GetClassName() == "TDirectoryFile"):
+                    self.dirKeys.append(key.GetName())
+                continue
+
             if(key.GetClassName() == "TTree"):
                 self.Trees.append(self.file.Get(key.GetName()))
 
@@ -82,6 +133,59 @@ class LoadFile:
                 hist.SetName(key.GetName())
                 self.TH1.append(hist)
 
+    def GetNTrees(self):
+        return len(self.treeKeys) if (self.lazy) else len(self.Trees)
+
+    def GetNHists(self):
+        return len(self.dirKeys) if (self.lazy) else len(self.TH1)
+
+    def GetTree(self, number):
+        """Returns one TTree, in lazy mode it is read from the file the first time it is requested
+
+        Args:
+            number (int): Tree index according to the table printed
+
+        Returns:
+            TTree: requested tree
+        """
+        if (not self.lazy):
+            return self.Trees[number]
+
+        name = self.treeKeys[number]
+        if (name not in self.cachedTrees):
+            self.cachedTrees[name] = self.file.Get(name)
+        return self.cachedTrees[name]
+
+    def GetHistAndPOT(self, number):
+        """Returns the hist and pot histograms of one TDirectoryFile. In lazy mode they are
+           read and detached the first time they are requested and kept in a LRU cache
+
+        Args:
+            number (int): Hist index according to the table printed
+
+        Returns:
+            list: [hist, pot]
+        """
+        if (not self.lazy):
+            return [self.TH1[number], self.pot[number]]
+
+        name = self.dirKeys[number]
+        if (name in self.cachedHists):
+            self.cachedHists.move_to_end(name)
+            return self.cachedHists[name]
+
+        dir  = self.file.Get(name)
+        hist = dir.Get('hist')
+        pot  = dir.Get('pot')
+        hist.SetDirectory(0)
+        pot.SetDirectory(0)
+        hist.SetName(name)
+
+        self.cachedHists[name] = [hist, pot]
+        if ((self.maxCachedHists is not None) and (len(self.cachedHists) > self.maxCachedHists)):
+            self.cachedHists.popitem(last=False)
+        return [hist, pot]
+
     def PrintContent(self):
         #scale = 1.42283/5.5167
         """This function prints the file contents as a table in terminal: \n
@@ -95,16 +199,26 @@ class LoadFile:
             |            |       TH1         |             |                   |                   |
             +------------+-------------------+-------------+-------------------+-------------------+
 
+        In lazy mode only the trees are read (header only), the directory histograms that were
+        not requested yet are listed by name without their contents.
+
         .. note:: **Usage:** ``loadFileObject.PrintContent()``
         """
         table_data = []
         table_data.append(['Number', 'Object Class Name', 'Object Name', 'Number of Entries', 'pot', 'Under bin', 'Over Bin'])
         i = 0
-        for tree in self.Trees:
+        for number in range(self.GetNTrees()):
+            tree = self.GetTree(number)
             #treeInfo    =   tree.GetTreeInfo()
             table_data.append([i, "TTree", tree.GetName(),tree.GetEntries(), "N/A", "N/A", "N/A"])
             i += 1
-        for hist, pot in zip(self.TH1, self.pot):
+        for number in range(self.GetNHists()):
+            # lazy mode: histograms not read yet are listed from the key only
+            if (self.lazy and (self.dirKeys[number] not in self.cachedHists)):
+                table_data.append([i, "TDirectoryFile", self.dirKeys[number], "N/A", "N/A", "N/A", "N/A"])
+                i += 1
+                continue
+            hist, pot = self.GetHistAndPOT(number)
             #treeInfo    =   tree.GetTreeInfo()
             nBins = hist.GetNbinsX()
             table_data.append([i, hist.ClassName(), hist.GetName(),int(hist.Integral(1,-1)), pot.GetBinContent(1), hist.GetBinContent(0), hist.GetBinContent(nBins + 1)])
@@ -133,7 +247,8 @@ class LoadFile:
 
             i           = 0
 
-            for tree in self.Trees:
+            for number in range(self.GetNTrees()):
+                tree = self.GetTree(number)
                 writer.writerow({
                                     'Number'            : i                 ,
                                     'Object Class Name' : "TTree"           ,  
@@ -145,7 +260,8 @@ class LoadFile:
                                 })
                 i += 1
 
-            for hist, pot in zip(self.TH1, self.pot):
+            for number in range(self.GetNHists()):
+                hist, pot = self.GetHistAndPOT(number)
                 nBins = hist.GetNbinsX()
                 writer.writerow({
                                     'Number'            : i                              ,
@@ -169,7 +285,7 @@ class LoadFile:
         """
         treeList = []
         for num in numbers:
-            treeList.append(self.Trees[num])
+            treeList.append(self.GetTree(num))
         return treeList
 
     def GetHists(self, numbers):
@@ -183,10 +299,22 @@ class LoadFile:
         """
         histList = []
         for num in numbers:
-            histList.append(self.TH1[num])
+            histList.append(self.GetHistAndPOT(num)[0])
         return histList
 
+    def ExportHists(self, fileName, fileFormat=None):
+        """Write every directory histogram of the file into one table (see ExportHists)
+
+        Args:
+            fileName (string): output file name
+            fileFormat (string): "csv", "parquet" or "feather" (None = from the file extension)
+        """
+        ExportHists([self.GetHistAndPOT(number)[0] for number in range(self.GetNHists())], fileName, fileFormat)
+
     def GetPOTHist(self):
+        if (self.lazy and (not hasattr(self, "potHist")) and (self.potKey is not None)):
+            self.potHist = self.file.Get(self.potKey)
+            self.potHist.SetDirectory(0)
         return self.potHist
 
 
@@ -217,7 +345,7 @@ class CutTableCell:
         self.inFile  = inputFile
         self.outFile = outFile
 
-        f = LoadFile(inputFile)
+        f = LoadFile(inputFile, lazy=True)
         f.PrintContent()
         tree = f.GetTrees([0])[0]
 
@@ -302,6 +430,158 @@ class CutTableCell:
 
 
 
+class CutFlow:
+    """Declarative replacement of the nested MuonID -> PionID -> HitID -> KID cascade of CutTableCell.
+       The cuts are applied cumulatively in the given order and every interaction
+       category is filled from the same read of the TTree, so one pass over the
+       file replaces one CutTableCell run per (inttype, iscc) pair:
+
+       .. code-block:: python
+
+            cutFlow = CutFlow()
+            cutFlow.Run(inputFile)
+            cutFlow.Save("CCCOH", "CCCOH_CutTable.root")   # same file as CutTableCell(inputFile, ..., 3, 1)
+    """
+    def __init__(self, cuts=cutTableCuts, categories=cutTableCategories, variable="nProngs", weight="weight", binning=(10, 0, 10)):
+        """Input arguments of the constructor
+
+        Args:
+            cuts (list): ordered list of [histName, [(branch, operator, threshold), ...]]
+            categories (dict): category name -> [inttype, iscc] as used by CutTableCell
+            variable (string): branch filled in the stage histograms
+            weight (string): weight branch (None = unweighted)
+            binning (tuple): (nBins, xMin, xMax) of the stage histograms
+        """
+        self.cuts       = cuts
+        self.categories = categories
+        self.variable   = variable
+        self.weight     = weight
+        self.binning    = binning
+        self.bins       = {}
+
+    def GetStageNames(self):
+        return [cut[0] for cut in self.cuts]
+
+    def GetBranches(self):
+        """Returns every branch needed by the cut flow
+
+        Returns:
+            list: branch names
+        """
+        branches = [self.variable, "IntType", "IsCC"]
+        if (self.weight is not None):
+            branches.append(self.weight)
+        for name, conditions in self.cuts:
+            for condition in conditions:
+                if (condition[0] not in branches):
+                    branches.append(condition[0])
+        return branches
+
+    def StageMasks(self, columns):
+        """Cumulative pass masks of every cut stage
+
+        Args:
+            columns (dict): branch name -> numpy array
+
+        Returns:
+            list: boolean masks, one per stage
+        """
+        masks = []
+        mask  = None
+        for name, conditions in self.cuts:
+            passed = CutConditionsMask(columns, conditions)
+            mask   = passed if (mask is None) else (mask & passed)
+            masks.append(mask)
+        return masks
+
+    def Fill(self, columns):
+        """Fill the stage histograms of every category from column arrays
+
+        Args:
+            columns (dict): branch name -> numpy array
+
+        Returns:
+            dict: category name -> list of HistBins (one per stage)
+        """
+        values  = columns[self.variable]
+        weights = None if (self.weight is None) else columns[self.weight]
+        stages  = self.StageMasks(columns)
+
+        for category, (inttype, iscc) in self.categories.items():
+            categoryMask = InteractionCategoryMask(columns, inttype, iscc)
+            self.bins[category] = []
+            for stage in stages:
+                mask = categoryMask & stage
+                self.bins[category].append(HistBins.FromColumns(self.binning,
+                                                                values[mask],
+                                                                None if (weights is None) else weights[mask]))
+        return self.bins
+
+    def Run(self, inputFile, treeNumber=0):
+        """Read the TTree once and fill every category
+
+        Args:
+            inputFile (string): Input file name and location
+            treeNumber (int): index of the TTree as printed by LoadFile.PrintContent
+
+        Returns:
+            dict: category name -> list of HistBins (one per stage)
+        """
+        f = LoadFile(inputFile, lazy=True)
+        f.PrintContent()
+        treeName = f.GetTrees([treeNumber])[0].GetName()
+        f.Close()
+
+        return self.Fill(ReadTreeColumns(inputFile, treeName, self.GetBranches()))
+
+    def GetHists(self, category):
+        """Returns the stage histograms of a category
+
+        Args:
+            category (string): Name of the category
+
+        Returns:
+            list: TH1D named after the stages (npngsMuonID, npngsPionID, ...)
+        """
+        return [bins.GetHist(name) for name, bins in zip(self.GetStageNames(), self.bins[category])]
+
+    def GetStageCounts(self, category):
+        """Returns the weighted number of events after each stage (including under/overflow)
+
+        Args:
+            category (string): Name of the category
+
+        Returns:
+            list: number of events, one per stage
+        """
+        return [float(np.sum(bins.GetContent())) for bins in self.bins[category]]
+
+    def Save(self, category, outFile):
+        """Save the stage histograms of a category the same way as CutTableCell
+
+        Args:
+            category (string): Name of the category
+            outFile (string): Output file name and location
+        """
+        fOut = ROOT.TFile(outFile, "RECREATE")
+        fOut.cd()
+        for hist in self.GetHists(category):
+            hist.Write()
+        fOut.Write()
+        fOut.Close()
+        print(f"{outFile} created successfully.!")
+
+    def SaveAll(self, outFiles):
+        """Save the stage histograms of several categories
+
+        Args:
+            outFiles (dict): category name -> output file name and location
+        """
+        for category, outFile in outFiles.items():
+            self.Save(category, outFile)
+
+
+
 class CreateBkgdTFile:
     """Create reconstructed |t| plot and save it to a ROOT files
 
@@ -309,49 +589,66 @@ class CreateBkgdTFile:
         TFile: TFile That contains TH1
     """
     
-    def __init__(self, inFile, outFile):
+    def __init__(self, inFile, outFile, columnar=False, cache=None):
         """Constructor for CreateRecoTFile
 
         Args:
             inFile (string): input file name
             outFileName (string): output file name
+            columnar (bool): read the branches in bulk with uproot instead of looping over the TTree
+            cache (HistCache): reuse the histogram of a previous run with the same input file (None = no cache)
         """
         self.inFile  = inFile
         self.outFile = outFile
 
-        f = LoadFile(inFile)
+        if (cache is not None):
+            key = cache.GetKey(inFile, "CreateBkgdTFile", backgroundRegionCuts, [200, 0, 1], scale)
+            if (cache.WriteHistFile(key, outFile, "CreateBkgdTFile")):
+                return
+
+        f = LoadFile(inFile, lazy=True)
         f.PrintContent()
         tree = f.GetTrees([0])[0]
 
         hist = ROOT.TH1D("hist","", 200, 0, 1)
         hist.SetDirectory(0)
 
-        for event in tree:
-            muonID      = getattr(event, "BestKalmanMuonID" )
-            pionID      = getattr(event, "FinalPionID"      )       
-            hitID       = getattr(event, "FinalHitScore"    )       
-            kinematicID = getattr(event, "NewKinematicScore")           
-            recoT       = getattr(event, "RecoTKalman"      )   
-            weight      = getattr(event, "weight"           )
-            #shift       = getattr(event, "_")
+        if (columnar):
+            columns = ReadTreeColumns(inFile, tree.GetName(), recoTBranches)
+            mask    = BackgroundRegionMask(columns, **backgroundRegionCuts)
+            FillHistFromColumns(hist, columns["RecoTKalman"][mask], columns["weight"][mask])
 
-            ############################################################
-            # Background Control Region Cuts                           #
-            ############################################################
-            if ((muonID       >= 0.4  ) and 
-                ((pionID      <  0.05)  or 
-                 (hitID       <  0.05)) and 
-                (kinematicID  >  0.84 ) and 
-                (recoT        >= 0    )):
-                hist.Fill(recoT, weight)
+        else:
+            cuts = backgroundRegionCuts
+            for event in tree:
+                muonID      = getattr(event, "BestKalmanMuonID" )
+                pionID      = getattr(event, "FinalPionID"      )       
+                hitID       = getattr(event, "FinalHitScore"    )       
+                kinematicID = getattr(event, "NewKinematicScore")           
+                recoT       = getattr(event, "RecoTKalman"      )   
+                weight      = getattr(event, "weight"           )
+                #shift       = getattr(event, "_")
+
+                ############################################################
+                # Background Control Region Cuts                           #
+                ############################################################
+                if ((muonID       >= cuts["muonIDCut"]     ) and 
+                    ((pionID      <  cuts["pionIDCut"])      or 
+                     (hitID       <  cuts["hitIDCut"]))      and 
+                    (kinematicID  >  cuts["kinematicIDCut"]) and 
+                    (recoT        >= cuts["recoTCut"]      )):
+                    hist.Fill(recoT, weight)
 
-            else:
-                continue
+                else:
+                    continue
 
         hist.Scale(scale)
         newHist = CalculateStatisticalErrorBinByBin(hist)        
         newHist.SetDirectory(0)
         newHist.SetName(f"hist_{randint(1000, 9999)}")
+
+        if (cache is not None):
+            cache.Store(key, {"hist": HistBins.FromHist(hist)}, inFile)
         
         fout = ROOT.TFile(outFile, "RECREATE")
         fout.cd()
@@ -368,49 +665,73 @@ class CreateSigTFile:
         TFile: TFile That contains TH1
     """
     
-    def __init__(self, inFile, outFile):
+    def __init__(self, inFile, outFile, columnar=False, chunkSize=None, nWorkers=None, cache=None):
         """Constructor for CreateRecoTFile
 
         Args:
             inFile (string): input file name
             outFileName (string): output file name
+            columnar (bool): read the branches in bulk with uproot instead of looping over the TTree
+            chunkSize (int): fill entry ranges of chunkSize in a process pool (None = no chunking)
+            nWorkers (int): number of processes used with chunkSize (None = number of cores)
+            cache (HistCache): reuse the histogram of a previous run with the same input file (None = no cache)
         """
         self.inFile  = inFile
         self.outFile = outFile
 
-        f = LoadFile(inFile)
+        if (cache is not None):
+            key = cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [200, 0, 1], scale)
+            if (cache.WriteHistFile(key, outFile, "CreateSigTFile")):
+                return
+
+        f = LoadFile(inFile, lazy=True)
         f.PrintContent()
         tree = f.GetTrees([0])[0]
 
         hist = ROOT.TH1D("hist","", 200, 0, 1)
         hist.SetDirectory(0)
 
-        for event in tree:
-            muonID      = getattr(event, "BestKalmanMuonID" )
-            pionID      = getattr(event, "FinalPionID"      )       
-            hitID       = getattr(event, "FinalHitScore"    )       
-            kinematicID = getattr(event, "NewKinematicScore")           
-            recoT       = getattr(event, "RecoTKalman"      )   
-            weight      = getattr(event, "weight"           )
-            #shift       = getattr(event, "_")
+        if (chunkSize is not None):
+            regions = [HistRegion("sig", "RecoTKalman", SignalRegionMask, [200, 0, 1], cutArgs=signalRegionCuts)]
+            bins    = MultiRegionFill.FillChunks(inFile, tree.GetName(), regions, chunkSize, nWorkers)["sig"]
+            SetHistBinArrays(hist, bins.GetContent(), bins.GetSumw2(), bins.GetEntries())
 
-            ############################################################
-            # Signal Region Cuts                                       #
-            ############################################################
-            if ((muonID       >= 0.4  ) and 
-                (pionID       >  0.3  ) and 
-                (hitID        >  0.46 ) and 
-                (kinematicID  >  0.84 ) and 
-                (recoT        >= 0    )):
-                hist.Fill(recoT, weight)
+        elif (columnar):
+            columns = ReadTreeColumns(inFile, tree.GetName(), recoTBranches)
+            mask    = SignalRegionMask(columns, **signalRegionCuts)
+            FillHistFromColumns(hist, columns["RecoTKalman"][mask], columns["weight"][mask])
 
-            else:
-                continue
+        else:
+            cuts = signalRegionCuts
+            for event in tree:
+                muonID      = getattr(event, "BestKalmanMuonID" )
+                pionID      = getattr(event, "FinalPionID"      )       
+                hitID       = getattr(event, "FinalHitScore"    )       
+                kinematicID = getattr(event, "NewKinematicScore")           
+                recoT       = getattr(event, "RecoTKalman"      )   
+                weight      = getattr(event, "weight"           )
+                #shift       = getattr(event, "_")
+
+                ############################################################
+                # Signal Region Cuts                                       #
+                ############################################################
+                if ((muonID       >= cuts["muonIDCut"]     ) and 
+                    (pionID       >  cuts["pionIDCut"]     ) and 
+                    (hitID        >  cuts["hitIDCut"]      ) and 
+                    (kinematicID  >  cuts["kinematicIDCut"]) and 
+                    (recoT        >= cuts["recoTCut"]      )):
+                    hist.Fill(recoT, weight)
+
+                else:
+                    continue
 
         hist.Scale(scale)                
         newHist = CalculateStatisticalErrorBinByBin(hist)        
         newHist.SetDirectory(0)
         newHist.SetName(f"hist_{randint(1000, 9999)}")
+
+        if (cache is not None):
+            cache.Store(key, {"hist": HistBins.FromHist(hist)}, inFile)
         
         fout = ROOT.TFile(outFile, "RECREATE")
         fout.cd()
@@ -427,41 +748,49 @@ class CreateSigTFileAfterMuonIDCut:
         TFile: TFile That contains TH1
     """
     
-    def __init__(self, inFile, outFile):
+    def __init__(self, inFile, outFile, columnar=False):
         """Constructor for CreateRecoTFile
 
         Args:
             inFile (string): input file name
             outFileName (string): output file name
+            columnar (bool): read the branches in bulk with uproot instead of looping over the TTree
         """
         self.inFile  = inFile
         self.outFile = outFile
 
-        f = LoadFile(inFile)
+        f = LoadFile(inFile, lazy=True)
         f.PrintContent()
         tree = f.GetTrees([0])[0]
 
         hist = ROOT.TH1D("hist","", 200, 0, 1)
         hist.SetDirectory(0)
 
-        for event in tree:
-            muonID      = getattr(event, "BestKalmanMuonID" )
-            pionID      = getattr(event, "FinalPionID"      )       
-            hitID       = getattr(event, "FinalHitScore"    )       
-            kinematicID = getattr(event, "NewKinematicScore")           
-            recoT       = getattr(event, "RecoTKalman"      )   
-            weight      = getattr(event, "weight"           )
-            #shift       = getattr(event, "_")
+        if (columnar):
+            columns = ReadTreeColumns(inFile, tree.GetName(), recoTBranches)
+            mask    = MuonIDRegionMask(columns)
+            FillHistFromColumns(hist, columns["RecoTKalman"][mask], columns["weight"][mask])
 
-            ############################################################
-            # Background Control Region Cuts                           #
-            ############################################################
-            if ((muonID       >= 0.4  ) and 
-                (recoT        >= 0    )):
-                hist.Fill(recoT, weight)
+        else:
+            for event in tree:
+                muonID      = getattr(event, "BestKalmanMuonID" )
+                pionID      = getattr(event, "FinalPionID"      )       
+                hitID       = getattr(event, "FinalHitScore"    )       
+                kinematicID = getattr(event, "NewKinematicScore")           
+                recoT       = getattr(event, "RecoTKalman"      )   
+                weight      = getattr(event, "weight"           )
+                #shift       = getattr(event, "_")
+
+                ############################################################
+                # Background Control Region Cuts                           #
+                ############################################################
+                if ((muonID       >= 0.4  ) and 
+                    (recoT        >= 0    )):
+                    hist.Fill(recoT, weight)
+
+                else:
+                    continue
 
-            else:
-                continue
     
         newHist = CalculateStatisticalErrorBinByBin(hist)        
         newHist.SetDirectory(0)
@@ -484,44 +813,53 @@ class CreateBkgdDataTFile:
         TFile: TFile That contains TH1
     """
     
-    def __init__(self, inFile, outFile):
+    def __init__(self, inFile, outFile, columnar=False):
         """Constructor for CreateRecoTFile
 
         Args:
             inFile (string): input file name
             outFileName (string): output file name
+            columnar (bool): read the branches in bulk with uproot instead of looping over the TTree
         """
         self.inFile  = inFile
         self.outFile = outFile
 
-        f = LoadFile(inFile)
+        f = LoadFile(inFile, lazy=True)
         f.PrintContent()
         tree = f.GetTrees([0])[0]
 
         hist = ROOT.TH1D("hist","", 200, 0, 1)
         hist.SetDirectory(0)
 
-        for event in tree:
-            muonID      = getattr(event, "BestKalmanMuonID" )
-            pionID      = getattr(event, "FinalPionID"      )       
-            hitID       = getattr(event, "FinalHitScore"    )       
-            kinematicID = getattr(event, "NewKinematicScore")           
-            recoT       = getattr(event, "RecoTKalman"      )   
-            #weight      = getattr(event, "weight"           )
-            #shift       = getattr(event, "_")
+        if (columnar):
+            columns = ReadTreeColumns(inFile, tree.GetName(), recoTDataBranches)
+            mask    = BackgroundRegionMask(columns, **backgroundRegionCuts)
+            FillHistFromColumns(hist, columns["RecoTKalman"][mask])
 
-            ############################################################
-            # Background Control Region Cuts                           #
-            ############################################################
-            if ((muonID       >= 0.4  ) and 
-                ((pionID      <  0.05)  or 
-                 (hitID       <  0.05)) and 
-                (kinematicID  >  0.84 ) and 
-                (recoT        >= 0    )):
-                hist.Fill(recoT)
+        else:
+            cuts = backgroundRegionCuts
+            for event in tree:
+                muonID      = getattr(event, "BestKalmanMuonID" )
+                pionID      = getattr(event, "FinalPionID"      )       
+                hitID       = getattr(event, "FinalHitScore"    )       
+                kinematicID = getattr(event, "NewKinematicScore")           
+                recoT       = getattr(event, "RecoTKalman"      )   
+                #weight      = getattr(event, "weight"           )
+                #shift       = getattr(event, "_")
+
+                ############################################################
+                # Background Control Region Cuts                           #
+                ############################################################
+                if ((muonID       >= cuts["muonIDCut"]     ) and 
+                    ((pionID      <  cuts["pionIDCut"])      or 
+                     (hitID       <  cuts["hitIDCut"]))      and 
+                    (kinematicID  >  cuts["kinematicIDCut"]) and 
+                    (recoT        >= cuts["recoTCut"]      )):
+                    hist.Fill(recoT)
+
+                else:
+                    continue
 
-            else:
-                continue
     
         newHist = CalculateStatisticalErrorBinByBin(hist)        
         newHist.SetDirectory(0)
@@ -543,18 +881,31 @@ class CreateTRatio:
     Returns:
         TH1D: |t| ratio histogram
     """
-    def __init__(self, fileName, outFname):
+    def __init__(self, fileName, outFname, cache=None):
         """Constructor for |t| ratio plot
 
         Args:
             fileName (string): file name of TTree
             outFname (string): output file name to save TH1
+            cache (HistCache): reuse the ratio of a previous run with the same input file (None = no cache)
         """
         self.fileName = fileName
         self.outFName = outFname
+        self.cache    = cache
 
-    def CalculateRatio(self):
-        f = LoadFile(self.fileName)
+    def CalculateRatio(self, chunkSize=None, nWorkers=None):
+        """Fill the signal/background region histograms and save their ratio
+
+        Args:
+            chunkSize (int): fill entry ranges of chunkSize in a process pool (None = loop over the TTree)
+            nWorkers (int): number of processes used with chunkSize (None = number of cores)
+        """
+        if (self.cache is not None):
+            key = self.cache.GetKey(self.fileName, "CreateTRatio", {"signal": signalRegionCuts, "background": backgroundRegionCuts}, [200, 0, 1])
+            if (self.cache.WriteHistFile(key, self.outFName, "CreateTRatio")):
+                return
+
+        f = LoadFile(self.fileName, lazy=True)
         f.PrintContent()
         tree = f.GetTrees([0])[0]
 
@@ -564,39 +915,52 @@ class CreateTRatio:
         backHist = ROOT.TH1D("bkgdHistInBackRegion", "", 200, 0, 1)
         backHist.SetDirectory(0)
 
-        for event in tree:
-            muonID      = getattr(event, "BestKalmanMuonID" )
-            pionID      = getattr(event, "FinalPionID"      )       
-            hitID       = getattr(event, "FinalHitScore"    )       
-            kinematicID = getattr(event, "NewKinematicScore")           
-            recoT       = getattr(event, "RecoTKalman"      )   
-            weight      = getattr(event, "weight"           )
-            #shift       = getattr(event, "_")
-
-            ############################################################
-            # Signal Region Cuts                                       #
-            ############################################################
-            if ((muonID      >= 0.4) and 
-                (pionID      >  0.3) and 
-                (hitID       > 0.46) and 
-                (kinematicID > 0.84) and 
-                (recoT       >=0   )):
-                sigHist.Fill(recoT, weight)
+        if (chunkSize is not None):
+            regions = [HistRegion("sig" , "RecoTKalman", SignalRegionMask    , [200, 0, 1], cutArgs=signalRegionCuts    ),
+                       HistRegion("bkgd", "RecoTKalman", BackgroundRegionMask, [200, 0, 1], cutArgs=backgroundRegionCuts)]
+            bins    = MultiRegionFill.FillChunks(self.fileName, tree.GetName(), regions, chunkSize, nWorkers)
+            SetHistBinArrays(sigHist , bins["sig" ].GetContent(), bins["sig" ].GetSumw2(), bins["sig" ].GetEntries())
+            SetHistBinArrays(backHist, bins["bkgd"].GetContent(), bins["bkgd"].GetSumw2(), bins["bkgd"].GetEntries())
 
-            ############################################################
-            # Background Control Region Cuts                           #
-            ############################################################
-            if ((muonID       >= 0.4  ) and 
-                ((pionID      <  0.05)  or 
-                 (hitID       <  0.05)) and 
-                (kinematicID  >  0.84 ) and
-                (recoT        >= 0    )):
-                backHist.Fill(recoT, weight)
+        else:
+            sigCuts  = signalRegionCuts
+            backCuts = backgroundRegionCuts
+            for event in tree:
+                muonID      = getattr(event, "BestKalmanMuonID" )
+                pionID      = getattr(event, "FinalPionID"      )       
+                hitID       = getattr(event, "FinalHitScore"    )       
+                kinematicID = getattr(event, "NewKinematicScore")           
+                recoT       = getattr(event, "RecoTKalman"      )   
+                weight      = getattr(event, "weight"           )
+                #shift       = getattr(event, "_")
+
+                ############################################################
+                # Signal Region Cuts                                       #
+                ############################################################
+                if ((muonID      >= sigCuts["muonIDCut"]     ) and 
+                    (pionID      >  sigCuts["pionIDCut"]     ) and 
+                    (hitID       >  sigCuts["hitIDCut"]      ) and 
+                    (kinematicID >  sigCuts["kinematicIDCut"]) and 
+                    (recoT       >= sigCuts["recoTCut"]      )):
+                    sigHist.Fill(recoT, weight)
+
+                ############################################################
+                # Background Control Region Cuts                           #
+                ############################################################
+                if ((muonID       >= backCuts["muonIDCut"]     ) and 
+                    ((pionID      <  backCuts["pionIDCut"])      or 
+                     (hitID       <  backCuts["hitIDCut"]))      and 
+                    (kinematicID  >  backCuts["kinematicIDCut"]) and
+                    (recoT        >= backCuts["recoTCut"]      )):
+                    backHist.Fill(recoT, weight)
                 
         hist = CalculateErrorOfRatioHist(backHist, sigHist)
         #hist = CalculateErrorOfRatioHist(backHist, sigHist)
         hist.SetDirectory(0)
         hist.SetName(f"hist_{randint(1000, 9999)}")
+
+        if (self.cache is not None):
+            self.cache.Store(key, {"hist": HistBins.FromHist(hist)}, self.fileName)
         
         fout = ROOT.TFile(self.outFName, "RECREATE")
         fout.cd()
@@ -622,7 +986,7 @@ class CreateTRatioGENIEKnobs:
         self.outFName = outFname
 
     def CalculateRatio(self):
-        f = LoadFile(self.fileName)
+        f = LoadFile(self.fileName, lazy=True)
         f.PrintContent()
         tree = f.GetTrees([0])[0]
 
@@ -676,41 +1040,930 @@ class CreateTRatioGENIEKnobs:
 
         
 
-class CompleteCutTable:
-    """Creates the complete Cut Table
+class GENIEUniverseRatios:
+    """Signal and background control region |t| histograms of N GENIE knob universes
+       filled from a single read of the event kinematics. The universes are either N
+       shift weight branches of one file or N files with the same events, each with
+       its own _systshift_weight branch. Every ratio is the one CreateTRatioGENIEKnobs
+       would make from the corresponding knob file:
+
+       .. code-block:: python
+
+            universes = GENIEUniverseRatios(nominalFile, shiftFiles=knobFiles)
+            universes.SaveRatios(outFiles)
     """
+    def __init__(self, fileName, shiftBranches=None, shiftFiles=None, shiftBranch="_systshift_weight", binning=(200, 0, 1), treeNumber=0):
+        """Input arguments of the constructor
 
-    def __init__(self, csvName, title, rows):
-        """Constructor for Complete Cut Table
+        Args:
+            fileName (string): file with the event kinematics (and the shift branches)
+            shiftBranches (list): shift weight branch of every universe in fileName
+            shiftFiles (list): file of every universe, shiftBranch is read from each of them
+            shiftBranch (string): shift weight branch of the shiftFiles
+            binning (tuple): (nBins, xMin, xMax) of the |t| histograms
+            treeNumber (int): index of the TTree as printed by LoadFile.PrintContent
+        """
+        if ((shiftBranches is None) == (shiftFiles is None)):
+            raise ValueError("Either shiftBranches or shiftFiles has to be given")
+
+        self.fileName      = fileName
+        self.shiftBranches = shiftBranches
+        self.shiftFiles    = shiftFiles
+        self.shiftBranch   = shiftBranch
+        self.binning       = binning
+        self.sigBins       = None
+        self.backBins      = None
+
+        f = LoadFile(fileName, lazy=True)
+        f.PrintContent()
+        self.treeName = f.GetTrees([treeNumber])[0].GetName()
+        f.Close()
+
+    def GetNUniverses(self):
+        return len(self.shiftBranches) if (self.shiftBranches is not None) else len(self.shiftFiles)
+
+    def ReadShifts(self, mask):
+        """Shift weights of the selected events in every universe
 
         Args:
-            csvName (string): Name of the csv file
-            title (string): Title of the Table
-            rows (list): list of CutTable rows
+            mask (numpy array): boolean mask of the events needed
+
+        Returns:
+            numpy array: (nUniverses, nSelected) shift weights
         """
-        self.rows    = rows
-        self.csvName = csvName
-        self.title   = title
+        # one branch at a time, at most one full column is in memory next to the selected shifts
+        if (self.shiftBranches is not None):
+            sources = [[self.fileName, branch] for branch in self.shiftBranches]
+        else:
+            sources = [[shiftFile, self.shiftBranch] for shiftFile in self.shiftFiles]
 
-    def PrintCutTable(self):
-        """Create ASCII Table and print to Terminal
+        shifts = np.empty((len(sources), np.count_nonzero(mask)))
+        for universe, (shiftFile, branch) in enumerate(sources):
+            shift = ReadTreeColumns(shiftFile, self.treeName, [branch])[branch]
+            if (len(shift) != len(mask)):
+                raise ValueError(f"{shiftFile} has {len(shift)} events, {self.fileName} has {len(mask)}")
+            shifts[universe] = shift[mask]
+        return shifts
+
+    def Fill(self):
+        """Read the kinematics once and fill both regions in every universe
+
+        Returns:
+            list: [signal HistBins of every universe, background HistBins of every universe]
         """
-        """Prints cut table to the Terminal
+        columns  = ReadTreeColumns(self.fileName, self.treeName, recoTBranches)
+        sigMask  = SignalRegionMask(columns, **signalRegionCuts)
+        backMask = BackgroundRegionMask(columns, **backgroundRegionCuts)
+
+        # only the shifts of events in one of the regions are kept in memory
+        selected = sigMask | backMask
+        shifts   = self.ReadShifts(selected)
+        recoT    = columns["RecoTKalman"][selected]
+        weights  = columns["weight"][selected]*shifts
+
+        nBins, xMin, xMax = self.binning
+        self.sigBins  = []
+        self.backBins = []
+        for regionMask, regionBins in [[sigMask[selected], self.sigBins], [backMask[selected], self.backBins]]:
+            regionWeights  = weights[:, regionMask]
+            content, sumw2 = FillUniverseBinArrays(recoT[regionMask], regionWeights, nBins, xMin, xMax)
+            for universe in range(self.GetNUniverses()):
+                # TH1::Fill only switches on Sumw2 once it sees a weight different from 1
+                hasSumw2 = np.any(regionWeights[universe] != 1)
+                regionBins.append(HistBins(self.binning, content[universe], sumw2[universe] if (hasSumw2) else None,
+                                           np.count_nonzero(regionMask)))
+
+        return [self.sigBins, self.backBins]
+
+    def GetRatioHist(self, universe):
+        """Ratio of one universe with the CalculateErrorOfRatioHist errors
+
+        Args:
+            universe (int): universe index
+
+        Returns:
+            TH1D: background control region / signal region ratio
         """
-        table_data = []
-        table_data.append(['Cut Name'    , 
-                            'CC COH'     , 
-                            'CC QE'      , 
-                            'CC RES'     , 
-                            'CC DIS'     , 
-                            'CC MEC'     , 
-                            'NC'         , 
-                            'Other'      , 
-                            'Total Bkgd' ,
-                            'Total MC'   ,
-                            'Data'       ,
-                            'Data/MC'    ,
-                            'Purity'     , 
+        if (self.sigBins is None):
+            self.Fill()
+
+        sigHist  = self.sigBins [universe].GetHist("bkgdHistInSigRegion")
+        backHist = self.backBins[universe].GetHist("bkgdHistInBackRegion")
+
+        hist = CalculateErrorOfRatioHist(backHist, sigHist)
+        hist.SetDirectory(0)
+        hist.SetName(f"hist_{randint(1000, 9999)}")
+        return hist
+
+    def GetRatioHists(self):
+        return [self.GetRatioHist(universe) for universe in range(self.GetNUniverses())]
+
+    def SaveRatios(self, outFiles):
+        """Save the ratio of every universe the same way as CreateTRatioGENIEKnobs
+
+        Args:
+            outFiles (list): output file name of every universe
+        """
+        if (len(outFiles) != self.GetNUniverses()):
+            raise ValueError(f"{len(outFiles)} output files for {self.GetNUniverses()} universes")
+
+        for universe, outFile in enumerate(outFiles):
+            hist = self.GetRatioHist(universe)
+            fout = ROOT.TFile(outFile, "RECREATE")
+            fout.cd()
+            hist.Write()
+            fout.Write()
+            fout.Close()
+            print(f"Successfully created {outFile} GENIE universe {universe}")
+
+class BuilderJob:
+    """One entry of a BuilderScheduler manifest: builder class name, input file,
+       output file and the extra constructor arguments (e.g. inttype and iscc of CutTableCell)
+    """
+    def __init__(self, builderName, inFile, outFile, extraArgs=(), logFile=None):
+        """Initialize job
+
+        Args:
+            builderName (string): name of the builder class (CreateSigTFile, CutTableCell, CreateTRatioGENIEKnobs, ...)
+            inFile (string): Input file name and location
+            outFile (string): Output file name and location
+            extraArgs (list, optional): constructor arguments after inFile and outFile. Defaults to ().
+            logFile (string, optional): log file of the job. Defaults to None, i.e. outFile with .log extension.
+        """
+        self.builderName = builderName
+        self.inFile      = inFile
+        self.outFile     = outFile
+        self.extraArgs   = list(extraArgs)
+        self.logFile     = logFile if (logFile is not None) else f"{os.path.splitext(outFile)[0]}.log"
+        self.attempts    = 0
+        self.status      = "pending"
+        self.error       = None
+        self.elapsed     = 0.0
+
+    def GetName(self):
+        return f"{self.builderName}({self.inFile} -> {self.outFile})"
+
+class BuilderScheduler:
+    """Run builder jobs (one input file -> one output file each) on a bounded process pool.
+       The stdout/stderr of every job (including the output of ROOT) goes to the log file of
+       the job, failed jobs are retried up to maxRetries times and progress is printed as the
+       jobs finish.
+    """
+    def __init__(self, jobs, nWorkers=None, maxRetries=1):
+        """Initialize scheduler
+
+        Args:
+            jobs (list): BuilderJob objects or (builderName, inFile, outFile[, extraArgs]) tuples
+            nWorkers (int, optional): number of worker processes. Defaults to None, i.e. number of cores.
+            maxRetries (int, optional): number of times a failed job is resubmitted. Defaults to 1.
+        """
+        self.jobs       = [job if isinstance(job, BuilderJob) else BuilderJob(*job) for job in jobs]
+        self.nWorkers   = nWorkers if (nWorkers is not None) else multiprocessing.cpu_count()
+        self.maxRetries = maxRetries
+
+        for job in self.jobs:
+            if (not isinstance(globals().get(job.builderName), type)):
+                raise ValueError(f"Unknown builder {job.builderName} for {job.inFile}")
+
+    @staticmethod
+    def ReadManifest(manifestFile, nWorkers=None, maxRetries=1):
+        """Create scheduler from a csv manifest. Every row is
+           builderName, inFile, outFile[, extra arguments...]
+           Empty rows and rows starting with # are skipped, numeric extra arguments are converted.
+
+        Args:
+            manifestFile (string): manifest file name and location
+            nWorkers (int, optional): number of worker processes. Defaults to None.
+            maxRetries (int, optional): number of times a failed job is resubmitted. Defaults to 1.
+
+        Returns:
+            BuilderScheduler: scheduler
+        """
+        jobs = []
+        with open(manifestFile, newline="") as manifest:
+            for row in csv.reader(manifest):
+                row = [column.strip() for column in row]
+                if ((len(row) == 0) or (row[0] == "") or row[0].startswith("#")):
+                    continue
+                if (len(row) < 3):
+                    raise ValueError(f"Manifest row {row} needs at least builder, input and output file")
+                jobs.append(BuilderJob(row[0], row[1], row[2], [BuilderScheduler.ParseArgument(arg) for arg in row[3:]]))
+
+        return BuilderScheduler(jobs, nWorkers, maxRetries)
+
+    @staticmethod
+    def ParseArgument(arg):
+        for conversion in (int, float):
+            try:
+                return conversion(arg)
+            except ValueError:
+                pass
+        return arg
+
+    @staticmethod
+    def RunJob(builderName, inFile, outFile, extraArgs, logFile, attempt):
+        """Run one job in a worker process with stdout and stderr redirected to the log file
+
+        Returns:
+            list: [succeeded, elapsed time in s, error message]
+        """
+        start = time.time()
+        error = None
+        sys.stdout.flush()
+        sys.stderr.flush()
+        savedFds     = [os.dup(1), os.dup(2)]
+        savedStreams = [sys.stdout, sys.stderr]
+        # line buffered to keep the python lines in order with the ones ROOT writes to the descriptors
+        with open(logFile, "a", buffering=1) as log:
+            # the descriptors catch the output of ROOT, sys.stdout/sys.stderr the one of python
+            # when they do not write to the descriptors (pytest capture, notebooks)
+            os.dup2(log.fileno(), 1)
+            os.dup2(log.fileno(), 2)
+            sys.stdout = sys.stderr = log
+            try:
+                print(f"### {builderName} {inFile} -> {outFile} {extraArgs} attempt {attempt}", flush=True)
+                builder = globals()[builderName](inFile, outFile, *extraArgs)
+                if (hasattr(builder, "CalculateRatio")):
+                    builder.CalculateRatio()
+            except Exception:
+                error = traceback.format_exc()
+                print(error)
+            finally:
+                log.flush()
+                sys.stdout, sys.stderr = savedStreams
+                os.dup2(savedFds[0], 1)
+                os.dup2(savedFds[1], 2)
+                os.close(savedFds[0])
+                os.close(savedFds[1])
+
+        return [error is None, time.time() - start, error]
+
+    def Run(self):
+        """Run all jobs. Failed jobs are resubmitted after the current round
+           (a fresh pool is used for every round, so a crashed worker does not stop the others)
+
+        Returns:
+            list: jobs that failed after all retries
+        """
+        total   = len(self.jobs)
+        done    = 0
+        pending = list(self.jobs)
+        while (len(pending) > 0):
+            retry = []
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.nWorkers) as executor:
+                futures = {}
+                for job in pending:
+                    job.attempts += 1
+                    job.status    = "running"
+                    futures[executor.submit(BuilderScheduler.RunJob, job.builderName, job.inFile, job.outFile,
+                                            job.extraArgs, job.logFile, job.attempts)] = job
+
+                for future in concurrent.futures.as_completed(futures):
+                    job = futures[future]
+                    try:
+                        succeeded, job.elapsed, job.error = future.result()
+                    except Exception as exception:
+                        succeeded, job.error = False, f"{type(exception).__name__}: {exception}"
+
+                    if (succeeded):
+                        job.status = "done"
+                        done      += 1
+                        print(f"[{done}/{total}] done   {job.GetName()} ({job.elapsed:.1f} s)")
+                    elif (job.attempts <= self.maxRetries):
+                        job.status = "retry"
+                        retry.append(job)
+                        print(f"[{done}/{total}] retry  {job.GetName()} attempt {job.attempts} failed, see {job.logFile}")
+                    else:
+                        job.status = "failed"
+                        done      += 1
+                        print(f"[{done}/{total}] failed {job.GetName()} after {job.attempts} attempts, see {job.logFile}")
+            pending = retry
+
+        failed = self.GetFailedJobs()
+        print(f"{total - len(failed)}/{total} jobs completed successfully.!")
+        return failed
+
+    def GetFailedJobs(self):
+        return [job for job in self.jobs if (job.status == "failed")]
+
+class HistBins:
+    """Bin arrays of a fixed bin width TH1 (contents and sum of squared weights
+       including under/overflow) that can be merged and turned into a TH1D
+    """
+    def __init__(self, binning, content, sumw2, entries):
+        """Initialize the bin arrays
+
+        Args:
+            binning (list): [nBins, xMin, xMax]
+            content (numpy array): bin contents, length nBins + 2
+            sumw2 (numpy array): sum of squared weights, length nBins + 2 (None = unweighted)
+            entries (double): number of entries
+        """
+        self.binning = binning
+        self.content = content
+        self.sumw2   = sumw2
+        self.entries = entries
+
+    @staticmethod
+    def FromColumns(binning, values, weights=None):
+        """Fill bin arrays from column arrays the same way TH1::Fill would
+
+        Args:
+            binning (list): [nBins, xMin, xMax]
+            values (numpy array): values to fill
+            weights (numpy array): weight of each value (None = unweighted)
+
+        Returns:
+            HistBins: filled bin arrays
+        """
+        # TH1::Fill only switches on Sumw2 once it sees a weight different from 1
+        if ((weights is not None) and (not np.any(weights != 1))):
+            weights = None
+
+        content, sumw2 = FillBinArrays(values, weights, binning[0], binning[1], binning[2])
+        return HistBins(binning, content, sumw2, len(values))
+
+    @staticmethod
+    def FromHist(hist):
+        """Read the bin arrays of a fixed bin width TH1
+
+        Args:
+            hist (TH1): histogram
+
+        Returns:
+            HistBins: bin arrays of the histogram
+        """
+        binning        = [hist.GetNbinsX(), hist.GetXaxis().GetXmin(), hist.GetXaxis().GetXmax()]
+        content, sumw2 = GetHistBinArrays(hist)
+        return HistBins(binning, content, sumw2, hist.GetEntries())
+
+    def GetContent(self):
+        return self.content
+
+    def GetSumw2(self):
+        return self.sumw2
+
+    def GetErrors(self):
+        if (self.sumw2 is None):
+            return np.sqrt(np.abs(self.content))
+        return np.sqrt(self.sumw2)
+
+    def GetEntries(self):
+        return self.entries
+
+    def Add(self, other):
+        """Add the bins of another HistBins with the same binning
+
+        Args:
+            other (HistBins): bins to add
+
+        Returns:
+            HistBins: self
+        """
+        if (list(self.binning) != list(other.binning)):
+            raise ValueError(f"Unable to add bins with binning {other.binning} to bins with binning {self.binning}")
+
+        if ((self.sumw2 is not None) or (other.sumw2 is not None)):
+            selfSumw2  = np.abs(self.content)  if (self.sumw2  is None) else self.sumw2
+            otherSumw2 = np.abs(other.content) if (other.sumw2 is None) else other.sumw2
+            self.sumw2 = selfSumw2 + otherSumw2
+
+        self.content  = self.content + other.content
+        self.entries += other.entries
+        return self
+
+    def GetHist(self, histName="hist"):
+        """Create a TH1D from the bin arrays
+
+        Args:
+            histName (string): name of the histogram
+
+        Returns:
+            TH1D: histogram detached from any file
+        """
+        hist = ROOT.TH1D(histName, "", self.binning[0], self.binning[1], self.binning[2])
+        hist.SetDirectory(0)
+        SetHistBinArrays(hist, self.content, self.sumw2, self.entries)
+        return hist
+
+class HistRegion:
+    """Blue print of a histogram region filled by MultiRegionFill
+    """
+    def __init__(self, name, variable, cut, binning, weight="weight", cutArgs=None, cutBranches=recoTDataBranches):
+        """Input arguments of the constructor
+
+        Args:
+            name (string): Name of the region
+            variable (string): Branch to histogram
+            cut (function): function(columns, **cutArgs) returning the boolean mask of the region (None = no cut)
+            binning (list): [nBins, xMin, xMax]
+            weight (string, list): weight branch, list of branches to multiply (e.g. ["weight", "_systshift_weight"])
+                                   or None for an unweighted fill
+            cutArgs (dict): thresholds passed to the cut function
+            cutBranches (list): branches used by the cut function
+        """
+        self.name        = name
+        self.variable    = variable
+        self.cut         = cut
+        self.binning     = binning
+        self.weight      = weight
+        self.cutArgs     = {} if (cutArgs is None) else cutArgs
+        self.cutBranches = [] if (cut is None) else list(cutBranches)
+
+    def GetName(self):
+        return self.name
+
+    def GetSettings(self):
+        """Settings that define the content of the region (used in the HistCache keys).
+           The cut function is identified by its name, so it should not be a lambda.
+
+        Returns:
+            dict: settings of the region
+        """
+        cutName = None if (self.cut is None) else f"{self.cut.__module__}.{self.cut.__qualname__}"
+        return {"name"    : self.name     ,
+                "variable": self.variable ,
+                "cut"     : cutName       ,
+                "cutArgs" : self.cutArgs  ,
+                "binning" : self.binning  ,
+                "weight"  : self.weight   }
+
+    def GetWeightBranches(self):
+        if (self.weight is None):
+            return []
+        if (isinstance(self.weight, str)):
+            return [self.weight]
+        return list(self.weight)
+
+    def GetBranches(self):
+        """Returns every branch needed to fill the region
+
+        Returns:
+            list: branch names
+        """
+        return [self.variable] + self.cutBranches + self.GetWeightBranches()
+
+    def Fill(self, columns):
+        """Fill the region from column arrays
+
+        Args:
+            columns (dict): branch name -> numpy array
+
+        Returns:
+            HistBins: bin arrays of the region
+        """
+        values = columns[self.variable]
+        if (self.cut is None):
+            mask = np.ones(len(values), dtype=bool)
+        else:
+            mask = self.cut(columns, **self.cutArgs)
+
+        weights = None
+        for branch in self.GetWeightBranches():
+            weights = columns[branch][mask] if (weights is None) else (weights*columns[branch][mask])
+
+        return HistBins.FromColumns(self.binning, values[mask], weights)
+
+class MultiRegionFill:
+    """Fill any number of histogram regions from a single read of the TTree.
+       Replaces one full scan per CreateSigTFile/CreateBkgdTFile/CreateTRatio call
+       by one scan for all of them:
+
+       .. code-block:: python
+
+            fill = MultiRegionFill(inFile, [HistRegion("sig" , "RecoTKalman", SignalRegionMask    , [200, 0, 1]),
+                                            HistRegion("bkgd", "RecoTKalman", BackgroundRegionMask, [200, 0, 1])])
+            fill.SaveHist("sig", sigOutFile, scale)            # CreateSigTFile
+            fill.SaveHist("bkgd", bkgdOutFile, scale)          # CreateBkgdTFile
+            fill.SaveRatio("bkgd", "sig", ratioOutFile)        # CreateTRatio
+    """
+    def __init__(self, fileName, regions, treeNumber=0, cache=None):
+        """Input arguments of the constructor
+
+        Args:
+            fileName (string): Input file name and location
+            regions (list): list of HistRegion
+            treeNumber (int): index of the TTree as printed by LoadFile.PrintContent
+            cache (HistCache): reuse the bins of a previous fill with the same file and regions (None = no cache)
+        """
+        self.fileName = fileName
+        self.regions  = regions
+        self.cache    = cache
+        self.bins     = {}
+
+        names = [region.GetName() for region in regions]
+        if (len(set(names)) != len(names)):
+            raise ValueError(f"Region names must be unique: {names}")
+
+        f = LoadFile(fileName, lazy=True)
+        f.PrintContent()
+        self.treeName = f.GetTrees([treeNumber])[0].GetName()
+        f.Close()
+
+    def GetBranches(self):
+        """Returns the union of the branches needed by all regions
+
+        Returns:
+            list: branch names
+        """
+        branches = []
+        for region in self.regions:
+            for branch in region.GetBranches():
+                if (branch not in branches):
+                    branches.append(branch)
+        return branches
+
+    def Fill(self, chunkSize=None, nWorkers=None):
+        """Read the TTree once and fill every region
+
+        Args:
+            chunkSize (int): number of entries read at once (None = whole tree in one go)
+            nWorkers (int): number of processes filling the chunks (None = number of cores)
+
+        Returns:
+            dict: region name -> HistBins
+        """
+        if (self.cache is not None):
+            key  = self.cache.GetKey(self.fileName, "MultiRegionFill",
+                                     {"tree": self.treeName, "regions": [region.GetSettings() for region in self.regions]},
+                                     [region.binning for region in self.regions])
+            bins = self.cache.Load(key)
+            if (bins is not None):
+                self.bins = bins
+                return self.bins
+
+        if (chunkSize is None):
+            self.bins = MultiRegionFill.FillChunk(self.fileName, self.treeName, self.regions)
+        else:
+            self.bins = MultiRegionFill.FillChunks(self.fileName, self.treeName, self.regions, chunkSize, nWorkers)
+
+        if (self.cache is not None):
+            self.cache.Store(key, self.bins, self.fileName)
+        return self.bins
+
+    @staticmethod
+    def FillChunk(fileName, treeName, regions, entryStart=None, entryStop=None):
+        """Fill every region from the entries [entryStart, entryStop) of the TTree
+
+        Returns:
+            dict: region name -> HistBins
+        """
+        branches = []
+        for region in regions:
+            for branch in region.GetBranches():
+                if (branch not in branches):
+                    branches.append(branch)
+
+        columns = ReadTreeColumns(fileName, treeName, branches, entryStart, entryStop)
+        return {region.GetName(): region.Fill(columns) for region in regions}
+
+    @staticmethod
+    def FillChunks(fileName, treeName, regions, chunkSize, nWorkers=None):
+        """Split the TTree in entry ranges of chunkSize, fill every chunk in a process pool
+           and merge the partial bin arrays (contents and sum of squared weights)
+
+        Args:
+            fileName (string): Input file name and location
+            treeName (string): Name of the TTree inside the file
+            regions (list): list of HistRegion (cut functions have to be module level functions)
+            chunkSize (int): number of entries per chunk
+            nWorkers (int): number of processes (None = number of cores, 1 = no pool)
+
+        Returns:
+            dict: region name -> HistBins
+        """
+        ranges = EntryRanges(GetTreeNumEntries(fileName, treeName), chunkSize)
+        if (len(ranges) == 0):
+            return MultiRegionFill.FillChunk(fileName, treeName, regions, 0, 0)
+
+        if ((nWorkers == 1) or (len(ranges) == 1)):
+            chunks = [MultiRegionFill.FillChunk(fileName, treeName, regions, start, stop) for start, stop in ranges]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=nWorkers) as executor:
+                chunks = list(executor.map(MultiRegionFill.FillChunk,
+                                           itertools.repeat(fileName),
+                                           itertools.repeat(treeName),
+                                           itertools.repeat(regions),
+                                           [start for start, stop in ranges],
+                                           [stop  for start, stop in ranges]))
+
+        # chunks are merged in entry order so the result does not depend on the scheduling
+        bins = chunks[0]
+        for chunk in chunks[1:]:
+            for name in bins:
+                bins[name].Add(chunk[name])
+        return bins
+
+    def GetBins(self, name):
+        if (not self.bins):
+            self.Fill()
+        return self.bins[name]
+
+    def GetHist(self, name, histName="hist"):
+        """Returns the histogram of a region
+
+        Args:
+            name (string): Name of the region
+            histName (string): Name of the returned histogram
+
+        Returns:
+            TH1D: histogram of the region
+        """
+        return self.GetBins(name).GetHist(histName)
+
+    def SaveHist(self, name, outFile, histScale=1.0):
+        """Save a region the same way as CreateSigTFile/CreateBkgdTFile
+
+        Args:
+            name (string): Name of the region
+            outFile (string): output file name
+            histScale (double): scale factor applied before the statistical errors
+        """
+        hist = self.GetHist(name)
+        if (histScale != 1.0):
+            hist.Scale(histScale)
+        CalculateStatisticalErrorBinByBin(hist)
+
+        fout = ROOT.TFile(outFile, "RECREATE")
+        fout.cd()
+        hist.Write()
+        fout.Write()
+        fout.Close()
+        print(f"Successfully created {outFile} from region {name}")
+
+    def SaveRatio(self, numName, denomName, outFile):
+        """Save the ratio of two regions the same way as CreateTRatio
+
+        Args:
+            numName (string): Name of the numerator region
+            denomName (string): Name of the denominator region
+            outFile (string): output file name
+        """
+        numHist   = self.GetHist(numName, "bkgdHistInBackRegion")
+        denomHist = self.GetHist(denomName, "bkgdHistInSigRegion")
+
+        hist = CalculateErrorOfRatioHist(numHist, denomHist)
+        hist.SetDirectory(0)
+        hist.SetName(f"hist_{randint(1000, 9999)}")
+
+        fout = ROOT.TFile(outFile, "RECREATE")
+        fout.cd()
+        hist.Write()
+        fout.Write()
+        fout.Close()
+        print(f"Successfully created {outFile} from regions {numName}/{denomName}")
+
+
+        
+
+class HistCache:
+    """On-disk cache of derived histograms (bin arrays stored as .npz files).
+       Entries are keyed by the identity of the input file (path, size and mtime, or a
+       hash of its content), the builder, the cut thresholds, the binning and the scale
+       factor. The cache directory is kept below maxSizeMB by dropping the least
+       recently used entries.
+
+       .. code-block:: python
+
+            cache = HistCache("/path/to/cache")
+            CreateSigTFile(inFile, outFile, columnar=True, cache=cache)   # cold: fill and store
+            CreateSigTFile(inFile, outFile, columnar=True, cache=cache)   # warm: read the stored bins
+    """
+    def __init__(self, cacheDir, maxSizeMB=1024, useContentHash=False):
+        """Initialize cache
+
+        Args:
+            cacheDir (string): directory of the cache files (created if missing)
+            maxSizeMB (double): maximum size of the cache directory in MB
+            useContentHash (bool): identify input files by a sha256 of their content instead of size and mtime
+        """
+        self.cacheDir       = cacheDir
+        self.maxSize        = maxSizeMB*1024*1024
+        self.useContentHash = useContentHash
+        self.contentHashes  = {}
+        os.makedirs(cacheDir, exist_ok=True)
+
+    def GetFileIdentity(self, inFile):
+        """Identity of an input file used in the keys
+
+        Args:
+            inFile (string): file name and location
+
+        Returns:
+            list: [absolute path, size, mtime in ns] or [sha256 of the content]
+        """
+        path = os.path.abspath(inFile)
+        stat = os.stat(path)
+        if (not self.useContentHash):
+            return [path, stat.st_size, stat.st_mtime_ns]
+
+        # the content is hashed only once per (path, size, mtime) and session
+        statKey = (path, stat.st_size, stat.st_mtime_ns)
+        if (statKey not in self.contentHashes):
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(16*1024*1024), b""):
+                    digest.update(block)
+            self.contentHashes[statKey] = digest.hexdigest()
+        return [self.contentHashes[statKey]]
+
+    def GetKey(self, inFile, builder, cuts, binning, histScale=1.0):
+        """Key of a cache entry
+
+        Args:
+            inFile (string): input file name and location
+            builder (string): name of the builder (e.g. CreateSigTFile)
+            cuts (dict, list): cut thresholds and any other setting changing the result
+            binning (list): [nBins, xMin, xMax] (or list of them)
+            histScale (double): scale factor applied to the histograms
+
+        Returns:
+            string: sha256 hex digest
+        """
+        description = {"file"     : self.GetFileIdentity(inFile),
+                       "builder"  : builder                     ,
+                       "cuts"     : cuts                        ,
+                       "binning"  : binning                     ,
+                       "histScale": histScale                   }
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+    def GetPath(self, key):
+        return os.path.join(self.cacheDir, f"{key}.npz")
+
+    def Load(self, key):
+        """Returns the stored bin arrays of a key
+
+        Args:
+            key (string): key from GetKey
+
+        Returns:
+            dict: name -> HistBins (None if the key is not cached)
+        """
+        path = self.GetPath(key)
+        if (not os.path.exists(path)):
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                bins = {}
+                for i, name in enumerate(data["names"]):
+                    binning = data[f"binning{i}"]
+                    sumw2   = data[f"sumw2{i}"] if (f"sumw2{i}" in data.files) else None
+                    bins[str(name)] = HistBins([int(binning[0]), float(binning[1]), float(binning[2])],
+                                               data[f"content{i}"], sumw2, float(data[f"entries{i}"]))
+        except (OSError, ValueError, KeyError):
+            # unreadable entry (e.g. interrupted write): treat as a miss
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+
+        # the mtime of an entry is its last use for the LRU eviction
+        os.utime(path)
+        return bins
+
+    def WriteHistFile(self, key, outFile, builder):
+        """Write the cached "hist" of a key to outFile as the builders do
+
+        Args:
+            key (string): key from GetKey
+            outFile (string): output ROOT file
+            builder (string): name of the builder, printed
+
+        Returns:
+            bool: True if the key was cached and the file written
+        """
+        bins = self.Load(key)
+        if (bins is None):
+            return False
+
+        hist = bins["hist"].GetHist(f"hist_{randint(1000, 9999)}")
+        fout = ROOT.TFile(outFile, "RECREATE")
+        fout.cd()
+        hist.Write()
+        fout.Write()
+        fout.Close()
+        print(f"Successfully created {outFile} {builder} from cache")
+        return True
+
+    def Store(self, key, bins, inFile=None):
+        """Store bin arrays and evict old entries if the cache is too large
+
+        Args:
+            key (string): key from GetKey
+            bins (dict): name -> HistBins
+            inFile (string): input file of the entry, used by Invalidate
+        """
+        arrays = {"names" : np.array(list(bins.keys())),
+                  "inFile": np.array("" if (inFile is None) else os.path.abspath(inFile))}
+        for i, hist in enumerate(bins.values()):
+            arrays[f"binning{i}"] = np.array(hist.binning, dtype=np.float64)
+            arrays[f"content{i}"] = np.asarray(hist.GetContent(), dtype=np.float64)
+            arrays[f"entries{i}"] = np.array(hist.GetEntries(), dtype=np.float64)
+            if (hist.GetSumw2() is not None):
+                arrays[f"sumw2{i}"] = np.asarray(hist.GetSumw2(), dtype=np.float64)
+
+        # write next to the final file and rename, so readers never see a partial entry
+        tmpPath = os.path.join(self.cacheDir, f"{key}.{os.getpid()}.tmp.npz")
+        np.savez(tmpPath, **arrays)
+        os.replace(tmpPath, self.GetPath(key))
+        self.Evict(keep=self.GetPath(key))
+
+    def GetEntries(self):
+        """Returns the cache files sorted from the least to the most recently used
+
+        Returns:
+            list: [path, size, mtime] of every entry
+        """
+        entries = []
+        for fileName in os.listdir(self.cacheDir):
+            if (fileName.endswith(".npz") and (".tmp." not in fileName)):
+                path = os.path.join(self.cacheDir, fileName)
+                stat = os.stat(path)
+                entries.append([path, stat.st_size, stat.st_mtime])
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def Evict(self, keep=None):
+        """Remove the least recently used entries until the cache is below maxSizeMB
+
+        Args:
+            keep (string): path never removed, e.g. the entry just stored (it may alone exceed maxSizeMB)
+        """
+        entries = self.GetEntries()
+        size    = sum(entry[1] for entry in entries)
+        for path, entrySize, mtime in entries:
+            if (size <= self.maxSize):
+                break
+            if (path == keep):
+                continue
+            os.remove(path)
+            size -= entrySize
+
+    def Invalidate(self, key=None, inFile=None):
+        """Remove the entry of a key or every entry made from an input file
+
+        Args:
+            key (string): key from GetKey
+            inFile (string): input file name and location
+
+        Returns:
+            int: number of removed entries
+        """
+        removed = 0
+        if ((key is not None) and os.path.exists(self.GetPath(key))):
+            os.remove(self.GetPath(key))
+            removed += 1
+
+        if (inFile is not None):
+            path = os.path.abspath(inFile)
+            for entry in self.GetEntries():
+                with np.load(entry[0], allow_pickle=False) as data:
+                    matches = (str(data["inFile"]) == path)
+                if (matches):
+                    os.remove(entry[0])
+                    removed += 1
+        return removed
+
+    def Clear(self):
+        for entry in self.GetEntries():
+            os.remove(entry[0])
+
+class CompleteCutTable:
+    """Creates the complete Cut Table
+    """
+
+    def __init__(self, csvName, title, rows):
+        """Constructor for Complete Cut Table
+
+        Args:
+            csvName (string): Name of the csv file
+            title (string): Title of the Table
+            rows (list): list of CutTable rows
+        """
+        self.rows    = rows
+        self.csvName = csvName
+        self.title   = title
+
+    def PrintCutTable(self):
+        """Create ASCII Table and print to Terminal
+        """
+        """Prints cut table to the Terminal
+        """
+        table_data = []
+        table_data.append(['Cut Name'    , 
+                            'CC COH'     , 
+                            'CC QE'      , 
+                            'CC RES'     , 
+                            'CC DIS'     , 
+                            'CC MEC'     , 
+                            'NC'         , 
+                            'Other'      , 
+                            'Total Bkgd' ,
+                            'Total MC'   ,
+                            'Data'       ,
+                            'Data/MC'    ,
+                            'Purity'     , 
                             'RelEff'     , 
                             'Eff'
                             ])
@@ -1209,25 +2462,224 @@ class CutTableRow:
         """Returns total Background Events
 
         Returns:
-            double: total Background Events
+            double: total Background Events
+        """
+        return self.ntotBkgd
+
+    def GetTotalMC(self):
+        """Returns total MC Events
+
+        Returns:
+            double: returns total MC events
+        """
+        return self.ntotMC
+
+    def GetData(self):
+        """Returns total data Events
+
+        Returns:
+            double: returns total data events
+        """
+        return self.nData
+
+class CutTableAccumulator:
+    """Streaming tally of the cut table. MC and data trees are read chunk by chunk and
+       only the weighted counts per cut stage x interaction category (x sample) are kept,
+       so the memory does not grow with the input. Partial tallies (e.g. of parallel
+       workers) are combined with Merge:
+
+       .. code-block:: python
+
+            tally = CutTableAccumulator(mcScale=scale)
+            tally.AddTree(mcFile  , "mc"  , chunkSize=500000, nWorkers=8)
+            tally.AddTree(dataFile, "data", chunkSize=500000, nWorkers=8)
+            table = tally.CreateCutTable("CutTable.csv", "Cut Table")
+            table.PrintCutTable()
+    """
+    samples    = ["mc", "data"]
+
+    # Cut table columns: category name -> [inttype, iscc] (see InteractionCategoryMask),
+    # events in none of them are counted as Other
+    categories = OrderedDict([("COH", [3  , 1]),
+                              ("QE" , [0  , 1]),
+                              ("RES", [1  , 1]),
+                              ("DIS", [2  , 1]),
+                              ("MEC", [10 , 1]),
+                              ("NC" , [-1 , 0])])
+
+    def __init__(self, cuts=cutTableCuts, weight="weight", mcScale=1.0, firstRowName="Preselection"):
+        """Input arguments of the constructor
+
+        Args:
+            cuts (list): ordered list of [stageName, [(branch, operator, threshold), ...]] applied cumulatively
+            weight (string): MC weight branch (None = unweighted)
+            mcScale (double): scale applied to the MC counts of the rows (e.g. POT scaling)
+            firstRowName (string): name of the row before any cut (efficiency denominator of CompleteCutTable)
+        """
+        self.cuts         = cuts
+        self.weight       = weight
+        self.mcScale      = mcScale
+        self.firstRowName = firstRowName
+
+        # rows: no cut + one per stage, columns: categories + Other
+        self.mc   = np.zeros((len(cuts) + 1, len(self.categories) + 1))
+        self.data = np.zeros(len(cuts) + 1)
+
+    def Empty(self):
+        return CutTableAccumulator(self.cuts, self.weight, self.mcScale, self.firstRowName)
+
+    def GetStageNames(self):
+        return [self.firstRowName] + [cut[0] for cut in self.cuts]
+
+    def GetBranches(self, sample):
+        """Returns the branches read from a tree of the sample
+
+        Args:
+            sample (string): "mc" or "data"
+
+        Returns:
+            list: branch names
+        """
+        branches = ["IntType", "IsCC"] if (sample == "mc") else []
+        if ((sample == "mc") and (self.weight is not None)):
+            branches.append(self.weight)
+        for name, conditions in self.cuts:
+            for condition in conditions:
+                if (condition[0] not in branches):
+                    branches.append(condition[0])
+        return branches
+
+    def StageMasks(self, columns, nEvents):
+        """Cumulative pass masks, the first one selects every event
+
+        Args:
+            columns (dict): branch name -> numpy array
+            nEvents (int): number of events in the columns
+
+        Returns:
+            list: boolean masks, one per row
+        """
+        mask  = np.ones(nEvents, dtype=bool)
+        masks = [mask]
+        for name, conditions in self.cuts:
+            mask = mask & CutConditionsMask(columns, conditions)
+            masks.append(mask)
+        return masks
+
+    def Add(self, sample, columns):
+        """Add the events of one chunk
+
+        Args:
+            sample (string): "mc" or "data"
+            columns (dict): branch name -> numpy array (see GetBranches)
+        """
+        if (sample not in self.samples):
+            raise ValueError(f"Unknown sample {sample}, known: {self.samples}")
+
+        branches = self.GetBranches(sample)
+        nEvents  = len(columns[branches[0]]) if (branches) else 0
+        masks    = self.StageMasks(columns, nEvents)
+
+        if (sample == "data"):
+            self.data += [np.count_nonzero(mask) for mask in masks]
+            return
+
+        # category index of every event (the categories do not overlap), the last one is Other
+        category = np.full(nEvents, len(self.categories), dtype=np.int64)
+        for index, (inttype, iscc) in enumerate(self.categories.values()):
+            category[InteractionCategoryMask(columns, inttype, iscc)] = index
+
+        weights = None if (self.weight is None) else columns[self.weight]
+        for stage, mask in enumerate(masks):
+            self.mc[stage] += np.bincount(category[mask],
+                                          weights=None if (weights is None) else weights[mask],
+                                          minlength=len(self.categories) + 1)
+
+    def Merge(self, other):
+        """Add the tallies of another accumulator with the same cuts
+
+        Args:
+            other (CutTableAccumulator): partial tally
+
+        Returns:
+            CutTableAccumulator: self
+        """
+        if (self.GetStageNames() != other.GetStageNames()):
+            raise ValueError(f"Cannot merge cut tables with different stages: {self.GetStageNames()} and {other.GetStageNames()}")
+        self.mc   += other.mc
+        self.data += other.data
+        return self
+
+    @staticmethod
+    def FillChunk(accumulator, fileName, treeName, sample, entryStart=None, entryStop=None):
+        """Tally the entries [entryStart, entryStop) of a TTree in an empty copy of accumulator
+
+        Returns:
+            CutTableAccumulator: partial tally
+        """
+        chunk = accumulator.Empty()
+        chunk.Add(sample, ReadTreeColumns(fileName, treeName, chunk.GetBranches(sample), entryStart, entryStop))
+        return chunk
+
+    def AddTree(self, fileName, sample, treeNumber=0, chunkSize=1000000, nWorkers=1):
+        """Stream a TTree chunk by chunk into the tally
+
+        Args:
+            fileName (string): Input file name and location
+            sample (string): "mc" or "data"
+            treeNumber (int): index of the TTree as printed by LoadFile.PrintContent
+            chunkSize (int): number of entries read at once
+            nWorkers (int): number of processes tallying chunks (None = number of cores, 1 = no pool)
+
+        Returns:
+            CutTableAccumulator: self
         """
-        return self.ntotBkgd
+        f = LoadFile(fileName, lazy=True)
+        treeName = f.GetTrees([treeNumber])[0].GetName()
+        f.Close()
 
-    def GetTotalMC(self):
-        """Returns total MC Events
+        ranges = EntryRanges(GetTreeNumEntries(fileName, treeName), chunkSize)
+        if ((nWorkers == 1) or (len(ranges) <= 1)):
+            for start, stop in ranges:
+                self.Merge(CutTableAccumulator.FillChunk(self, fileName, treeName, sample, start, stop))
+            return self
+
+        # partial tallies are merged in entry order so the result does not depend on the scheduling
+        with concurrent.futures.ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            for chunk in executor.map(CutTableAccumulator.FillChunk,
+                                      itertools.repeat(self.Empty()),
+                                      itertools.repeat(fileName),
+                                      itertools.repeat(treeName),
+                                      itertools.repeat(sample),
+                                      [start for start, stop in ranges],
+                                      [stop  for start, stop in ranges]):
+                self.Merge(chunk)
+        return self
+
+    def GetRows(self):
+        """Cut table rows of the tallies
 
         Returns:
-            double: returns total MC events
+            list: CutTableRow, the first one before any cut
         """
-        return self.ntotMC
+        rows = []
+        for name, mc, data in zip(self.GetStageNames(), self.mc*self.mcScale, self.data):
+            nSig, nQE, nRES, nDIS, nMEC, nNC, nOther = [float(count) for count in mc]
+            ntotBkgd = nQE + nRES + nDIS + nMEC + nNC + nOther
+            rows.append(CutTableRow(name, nSig, nQE, nRES, nDIS, nMEC, nNC, ntotBkgd, nSig + ntotBkgd, float(data)))
+        return rows
 
-    def GetData(self):
-        """Returns total data Events
+    def CreateCutTable(self, csvName, title):
+        """Cut table ready for PrintCutTable/SaveCSV
+
+        Args:
+            csvName (string): Name of the csv file
+            title (string): Title of the Table
 
         Returns:
-            double: returns total data events
+            CompleteCutTable: cut table
         """
-        return self.nData
+        return CompleteCutTable(csvName, title, self.GetRows())
 
 
 
@@ -1249,7 +2701,18 @@ class FillHists:
         self.tree     = tree
         self.histInfo = histInfo
 
-    def FillHists(self, isBackgroundRegion):
+    def FillHists(self, isBackgroundRegion, chunkSize=None, nWorkers=None):
+        """Fill the PionID/HitID/KinematicID sideband histograms
+
+        Args:
+            isBackgroundRegion (bool): fill the background region histograms
+            chunkSize (int): fill entry ranges of chunkSize in a process pool (None = loop over the TTree,
+                             which is also used for a TChain)
+            nWorkers (int): number of processes used with chunkSize (None = number of cores)
+
+        Returns:
+            list: [pionIDHist, hitIDHist, kinematicIDHist]
+        """
         if (isBackgroundRegion):
             pionIDHist = ROOT.TH1D(f"{self.histInfo[0]}_PionID", # Hist Name 
                                    f"{self.histInfo[1]}",        # Hits Title
@@ -1273,22 +2736,35 @@ class FillHists:
             hitIDHist.      SetDirectory(0)
             kinematicIDHist.SetDirectory(0)
 
-            for event in self.tree:
-                muonID      = getattr(event, "BestKalmanMuonID" )
-                pionID      = getattr(event, "FinalPionID"      )
-                hitID       = getattr(event, "FinalHitScore"    )
-                kinematicID = getattr(event, "NewKinematicScore")
-                recoT       = getattr(event, "RecoTKalman"      )
-
-                if ( getattr(event, "BestKalmanMuonID" ) >  0.615 and getattr(event, "RecoTKalman") >= 0 and getattr(event, "RecoTKalman"      ) <  0.2):
-                    if (getattr(event, "FinalHitScore") < 0.46 or getattr(event, "NewKinematicScore") < 0.84):
-                        pionIDHist.Fill(pionID)
+            # a TChain or a tree that is not in a file can not be read in chunks, it is filled by the event loop
+            source = GetTreeFileAndPath(self.tree) if (chunkSize is not None) else None
+            if (source is not None):
+                binning = self.histInfo[2:5]
+                regions = [HistRegion("PionID"     , "FinalPionID"      , PionIDSidebandMask     , binning, weight=None),
+                           HistRegion("HitID"      , "FinalHitScore"    , HitIDSidebandMask      , binning, weight=None),
+                           HistRegion("KinematicID", "NewKinematicScore", KinematicIDSidebandMask, binning, weight=None)]
+                fileName, treePath = source
+                bins               = MultiRegionFill.FillChunks(fileName, treePath, regions, chunkSize, nWorkers)
+                for name, hist in [["PionID", pionIDHist], ["HitID", hitIDHist], ["KinematicID", kinematicIDHist]]:
+                    SetHistBinArrays(hist, bins[name].GetContent(), bins[name].GetSumw2(), bins[name].GetEntries())
 
-                    if ((pionID < 0.3 or kinematicID < 0.84)):
-                        hitIDHist.Fill(hitID)
-
-                    if ((pionID < 0.05 or hitID < 0.05)):
-                        kinematicIDHist.Fill(kinematicID)
+            else:
+                for event in self.tree:
+                    muonID      = getattr(event, "BestKalmanMuonID" )
+                    pionID      = getattr(event, "FinalPionID"      )
+                    hitID       = getattr(event, "FinalHitScore"    )
+                    kinematicID = getattr(event, "NewKinematicScore")
+                    recoT       = getattr(event, "RecoTKalman"      )
+
+                    if ( getattr(event, "BestKalmanMuonID" ) >  0.615 and getattr(event, "RecoTKalman") >= 0 and getattr(event, "RecoTKalman"      ) <  0.2):
+                        if (getattr(event, "FinalHitScore") < 0.46 or getattr(event, "NewKinematicScore") < 0.84):
+                            pionIDHist.Fill(pionID)
+
+                        if ((pionID < 0.3 or kinematicID < 0.84)):
+                            hitIDHist.Fill(hitID)
+
+                        if ((pionID < 0.05 or hitID < 0.05)):
+                            kinematicIDHist.Fill(kinematicID)
         return [pionIDHist, hitIDHist, kinematicIDHist]
 
 
@@ -1302,98 +2778,63 @@ class FillHists:
 
 
 class FigOfMerits:
+    """Cut scan figures of merit of a signal and a background histogram. The cumulative
+       sums are computed once (see CumulativeFigOfMerits) and shared by all Get*Hist methods,
+       so the histograms should not be modified after the first call.
+    """
     def __init__(self, sigHist, backHist):
         self.SigHist  = sigHist
         self.BackHist = backHist
+        self.scan     = None
 
-    def GetSensitivityHist(self):
-        nBins = self.SigHist.GetNbinsX()
-        xMin  = self.SigHist.GetXaxis().GetXmin()
-        xMax  = self.SigHist.GetXaxis().GetXmax()
-        
-        #print(nBins, xMin, xMax)
-        #cumSigHist = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-        hist       = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-
-        #cumSigHist.SetDirectory(0)
-        hist.SetDirectory(0)
+    def GetScan(self):
+        if (self.scan is None):
+            self.scan = CumulativeFigOfMerits(GetHistBinArrays(self.SigHist , withSumw2=False)[0],
+                                              GetHistBinArrays(self.BackHist, withSumw2=False)[0])
+        return self.scan
 
+    def CreateScanHist(self, content, binningHist):
+        nBins = binningHist.GetNbinsX()
+        xMin  = binningHist.GetXaxis().GetXmin()
+        xMax  = binningHist.GetXaxis().GetXmax()
 
-        total = 0
-        for i in range(1, nBins + 1):
-            sig  = self.SigHist.Integral(i, nBins)
-            back = self.BackHist.Integral(i, nBins)
-            if ((sig + back) == 0):
-                hist.SetBinContent(i, 0)
-            else:
-                hist.SetBinContent(i, sig/sqrt(sig + back))
+        hist  = ROOT.TH1D("hist", "", nBins, xMin, xMax)
+        hist.SetDirectory(0)
+        # entries as after one SetBinContent per bin
+        SetHistBinArrays(hist, content, None, nBins)
 
         return hist
 
-    def GetPurityHist(self):
-        nBins = self.SigHist.GetNbinsX()
-        xMin  = self.SigHist.GetXaxis().GetXmin()
-        xMax  = self.SigHist.GetXaxis().GetXmax()
-        
-        #print(nBins, xMin, xMax)
-        #cumSigHist = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-        hist       = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-
-        #cumSigHist.SetDirectory(0)
-        hist.SetDirectory(0)
+    def GetSensitivityHist(self):
+        scan = self.GetScan()
+        if (np.any((scan["sigCum"] + scan["backCum"]) < 0)):
+            # same failure as sqrt(sig + back) of a negative bin
+            raise ValueError("math domain error")
 
-        total = 0
-        for i in range(1, nBins + 1):
-            sig  = self.SigHist.Integral(i, nBins)
-            back = self.BackHist.Integral(i, nBins)
-            if ((sig + back) == 0):
-                hist.SetBinContent(i, 0)
-            else:
-                hist.SetBinContent(i, sig/(sig + back))
+        return self.CreateScanHist(scan["sensitivity"], self.SigHist)
 
-        return hist
+    def GetPurityHist(self):
+        return self.CreateScanHist(self.GetScan()["purity"], self.SigHist)
 
     def GetSignalEfficiencyHist(self):
-        nBins = self.SigHist.GetNbinsX()
-        xMin  = self.SigHist.GetXaxis().GetXmin()
-        xMax  = self.SigHist.GetXaxis().GetXmax()
-        
-        #print(nBins, xMin, xMax)
-        #cumSigHist = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-        hist       = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-
-        #cumSigHist.SetDirectory(0)
-        hist.SetDirectory(0)
+        scan = self.GetScan()
+        if (scan["sigEfficiency"] is None):
+            raise ZeroDivisionError("float division by zero")
 
-        total = self.SigHist.Integral(1, -1)
-        for i in range(1, nBins + 1):
-            sigEff = self.SigHist.Integral(i, nBins)/total
-            hist.SetBinContent(i, sigEff)
-
-        return hist
+        return self.CreateScanHist(scan["sigEfficiency"], self.SigHist)
 
     def GetBackgroundEfficiencyHist(self):
-        nBins = self.BackHist.GetNbinsX()
-        xMin  = self.BackHist.GetXaxis().GetXmin()
-        xMax  = self.BackHist.GetXaxis().GetXmax()
-    
-        #print(nBins, xMin, xMax)
-        #cumbackHist = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-        hist       = ROOT.TH1D("hist", "", nBins, xMin, xMax)
-
-        #cumbackHist.SetDirectory(0)
-        hist.SetDirectory(0)
-
-        total = self.BackHist.Integral(1, -1)
-        for i in range(1, nBins + 1):
-            backEff = self.BackHist.Integral(i, nBins)/total
-            hist.SetBinContent(i, backEff)
+        scan = self.GetScan()
+        if (scan["backEfficiency"] is None):
+            raise ZeroDivisionError("float division by zero")
 
-        return hist
+        return self.CreateScanHist(scan["backEfficiency"], self.BackHist)
 
 
 
 class Prong:
+    __slots__ = ("MuonID", "PionID", "Length", "CalE", "PID", "dir")
+
     def __init__(self  ,
                  MuonID,
                  PionID,
@@ -1427,6 +2868,8 @@ class Prong:
         return self.PID
 
 class MuonInfo:
+    __slots__ = ("nKalman", "LenInAct", "LenInCat", "DirX", "DirY", "DirZ")
+
     def __init__(self     ,
                  nKalman  ,
                  LenInAct ,
@@ -1463,6 +2906,9 @@ class MuonInfo:
     
 
 class PionInfo:
+    __slots__ = ("MuonOverlapE", "SlcCalE", "MuonCalE", "nTracks", "PionPngKE",
+                 "pngDirX", "pngDirY", "pngDirZ", "trkDirX", "trkDirY", "trkDirZ")
+
     def __init__(self         ,
                  nTracks      ,
                  muonOverlapE ,
@@ -1525,6 +2971,8 @@ class PionInfo:
     
 
 class Track:
+    __slots__ = ("MuonID", "Length", "CalE", "TrueE", "PID", "dir")
+
     def __init__(self  ,
                  MuonID,
                  Length,
@@ -1557,6 +3005,533 @@ class Track:
     def GetPID(self):
         return self.PID
 
+class KalmanKinematics:
+    """Derived kinematics of one event from the Kalman track information.
+       The muon/pion energies, directions, momentum vectors and beam projections are
+       computed once on first use and shared by every Get* method, which return the same
+       values (and sentinels) as the corresponding *UsingKalmanTracks function:
+
+       .. code-block:: python
+
+            kinematics = KalmanKinematics(muonInfo, pionInfo)
+            recoT      = kinematics.GetRecoT()        # CalculateRecoTUsingKalmanTracks(muonInfo, pionInfo)
+            missingPt  = kinematics.GetMissingPt()    # CalculateMissingPtUsingKalmanTracks(muonInfo, pionInfo)
+    """
+    def __init__(self, muonInfo, pionInfo=None):
+        """Initialize with the event information
+
+        Args:
+            muonInfo (MuonInfo): Kalman track information of the muon
+            pionInfo (PionInfo): Kalman track information of the pion (None = muon variables only)
+        """
+        self.muonInfo = muonInfo
+        self.pionInfo = pionInfo
+        self.cache    = {}
+
+    def Cached(self, name, function):
+        if (name not in self.cache):
+            self.cache[name] = function()
+        return self.cache[name]
+
+    def GetBeamDirection(self):
+        return self.Cached("beamDir", AverageBeamDirection)
+
+    def GetMuonE(self):
+        return self.Cached("muonE", lambda: CalculateMuonEUsingKalmanTracks(self.muonInfo))
+
+    def GetPionE(self):
+        return self.Cached("pionE", lambda: CalculatePionEUsingKalmanTracks(self.pionInfo))
+
+    def GetMuonDirection(self):
+        return self.Cached("muonDir", lambda: ROOT.TVector3(self.muonInfo.GetDirX(), self.muonInfo.GetDirY(), self.muonInfo.GetDirZ()).Unit())
+
+    def GetPionDirection(self, source):
+        """Unit direction of the pion
+
+        Args:
+            source (string): "track" (Kalman track) or "prong"
+
+        Returns:
+            TVector3: unit direction
+        """
+        if (source == "track"):
+            return self.Cached("trackPionDir", lambda: ROOT.TVector3(self.pionInfo.GetTrackDirX(), self.pionInfo.GetTrackDirY(), self.pionInfo.GetTrackDirZ()).Unit())
+        return self.Cached("prongPionDir", lambda: ROOT.TVector3(self.pionInfo.GetProngDirX(), self.pionInfo.GetProngDirY(), self.pionInfo.GetProngDirZ()).Unit())
+
+    def GetPionSourceE(self, source):
+        """Pion energy used with a source: Kalman track estimate or prong kinetic energy + pion mass
+
+        Args:
+            source (string): "track" or "prong"
+
+        Returns:
+            double: pion energy
+        """
+        if (source == "track"):
+            return self.GetPionE()
+        return self.Cached("prongPionE", lambda: self.pionInfo.GetPionPngKE() + 0.13957)
+
+    def GetMuonMomentum(self):
+        def Momentum():
+            muonE = self.GetMuonE()
+            Pmuon = sqrt( pow(muonE, 2) - pow(0.105658, 2) )
+            return self.GetMuonDirection()*Pmuon
+        return self.Cached("vecMuon", Momentum)
+
+    def GetPionMomentum(self, source):
+        def Momentum():
+            pionE = self.GetPionSourceE(source)
+            Ppion = sqrt( (pionE * pionE) - pow(0.13957, 2) )
+            return self.GetPionDirection(source)*Ppion
+        return self.Cached(f"vecPion_{source}", Momentum)
+
+    def GetTotalMomentum(self, source):
+        return self.Cached(f"vecTotalP_{source}", lambda: self.GetMuonMomentum() + self.GetPionMomentum(source))
+
+    def GetPairSource(self):
+        """Pion source of the muon + pion variables (missing pT, visible angle, recoT)
+
+        Returns:
+            string: "track", "prong" or None if the event has no valid pair
+        """
+        def Source():
+            muonE = self.GetMuonE()
+            if (self.muonInfo.GetNTracks() == 2 and (muonE > 0) and (self.GetPionE() > 0.13957)):
+                return "track"
+            if (muonE > 0 and self.pionInfo.GetPionPngKE() > 0):
+                return "prong"
+            return None
+        return self.Cached("pairSource", Source)
+
+    def GetMuonPt(self):
+        if ((self.muonInfo.GetNTracks() > 0) and (self.GetMuonE() > 0)):
+            vecMuon   = self.GetMuonMomentum()
+            beamDir   = self.GetBeamDirection()
+            muonPlDir = (vecMuon.Dot(beamDir))*beamDir
+            muonPtDir = vecMuon - muonPlDir
+            return muonPtDir.Mag()
+        return -10000.0
+
+    def GetPionPt(self):
+        if (self.pionInfo.GetNTracks() == 2 and self.GetPionE() > 0.13957):
+            source = "track"
+        elif (self.pionInfo.GetPionPngKE() > 0):
+            source = "prong"
+        else:
+            return -10000.0
+
+        vecPion   = self.GetPionMomentum(source)
+        beamDir   = self.GetBeamDirection()
+        pionPlDir = (vecPion.Dot(beamDir))*beamDir
+        pionPtDir = vecPion - pionPlDir
+        return pionPtDir.Mag()
+
+    def GetMissingPt(self):
+        source = self.GetPairSource()
+        if (source is None):
+            return -10000.0
+
+        vecTotalP = self.GetTotalMomentum(source)
+        return (sqrt(vecTotalP.Mag2() - pow(vecTotalP.Dot(self.GetBeamDirection()), 2)))
+
+    def GetOpeningAngle(self):
+        source = "track" if (self.muonInfo.GetNTracks() == 2 and (self.GetMuonE() > 0)) else "prong"
+        return acos(self.GetMuonDirection().Dot(self.GetPionDirection(source)))
+
+    def GetVisibleAngle(self):
+        source = self.GetPairSource()
+        if (source is None):
+            return -10000.0
+
+        unitVecTotalP = self.GetTotalMomentum(source).Unit()
+        return (acos(unitVecTotalP.Dot(self.GetBeamDirection())))
+
+    def GetRecoT(self):
+        source = self.GetPairSource()
+        if (source is None):
+            return -10000.0
+
+        beamDir   = self.GetBeamDirection()
+        muonE     = self.GetMuonE()
+        pionE     = self.GetPionSourceE(source)
+        muonPl    = self.GetMuonMomentum().Dot(beamDir)
+        pionPl    = self.GetPionMomentum(source).Dot(beamDir)
+        vecTotalP = self.GetTotalMomentum(source)
+
+        return (pow((muonE - muonPl + pionE - pionPl), 2) + (vecTotalP.Mag2() - pow((vecTotalP.Dot(beamDir)), 2)))
+
+    def GetVariables(self):
+        """Every derived variable of the event
+
+        Returns:
+            dict: variable name -> value
+        """
+        return {"MuonE"        : self.GetMuonE()        ,
+                "PionE"        : self.GetPionE()        ,
+                "MuonPt"       : self.GetMuonPt()       ,
+                "PionPt"       : self.GetPionPt()       ,
+                "MissingPt"    : self.GetMissingPt()    ,
+                "OpeningAngle" : self.GetOpeningAngle() ,
+                "VisibleAngle" : self.GetVisibleAngle() ,
+                "RecoT"        : self.GetRecoT()        }
+
+class MuonInfoArrays(MuonInfo):
+    """Structure of arrays version of MuonInfo: every field is a numpy array with
+       one entry per event. The getters return the arrays, so the objects can be
+       passed directly to the *UsingKalmanTracksArray functions, and GetRow gives
+       a MuonInfo-like view of one event for the scalar functions.
+    """
+    __slots__ = ()
+
+    def __init__(self     ,
+                 nKalman  ,
+                 LenInAct ,
+                 LenInCat ,
+                 DirX     ,
+                 DirY     ,
+                 DirZ     ):
+        # np.asarray does not copy arrays that are already numpy arrays (e.g. from uproot)
+        MuonInfo.__init__(self               ,
+                          np.asarray(nKalman ),
+                          np.asarray(LenInAct),
+                          np.asarray(LenInCat),
+                          np.asarray(DirX    ),
+                          np.asarray(DirY    ),
+                          np.asarray(DirZ    ))
+
+    @staticmethod
+    def FromColumns(columns, branchMap):
+        """Build the container from uproot branch arrays without copying them
+
+        Args:
+            columns (dict): branch name -> numpy array
+            branchMap (dict): constructor argument name (nKalman, LenInAct, ...) -> branch name
+
+        Returns:
+            MuonInfoArrays: container
+        """
+        return MuonInfoArrays(**{field: columns[branch] for field, branch in branchMap.items()})
+
+    def __len__(self):
+        return len(self.nKalman)
+
+    def GetRow(self, index):
+        return MuonInfoRow(self, index)
+
+class MuonInfoRow:
+    """Lightweight MuonInfo view of one event of a MuonInfoArrays
+    """
+    __slots__ = ("arrays", "index")
+
+    def __init__(self, arrays, index):
+        self.arrays = arrays
+        self.index  = index
+
+    def GetNTracks(self):
+        return self.arrays.nKalman[self.index]
+
+    def GetLenInAct(self):
+        return self.arrays.LenInAct[self.index]
+
+    def GetLenInCat(self):
+        return self.arrays.LenInCat[self.index]
+
+    def GetDirX(self):
+        return self.arrays.DirX[self.index]
+
+    def GetDirY(self):
+        return self.arrays.DirY[self.index]
+
+    def GetDirZ(self):
+        return self.arrays.DirZ[self.index]
+
+class PionInfoArrays(PionInfo):
+    """Structure of arrays version of PionInfo: every field is a numpy array with
+       one entry per event (see MuonInfoArrays)
+    """
+    __slots__ = ()
+
+    def __init__(self         ,
+                 nTracks      ,
+                 muonOverlapE ,
+                 slcCalE      ,
+                 muonCalE     ,
+                 pionPngKEReg ,
+                 pngDirX      ,
+                 pngDirY      ,
+                 pngDirZ      ,
+                 trkDirX      ,
+                 trkDirY      ,
+                 trkDirZ      ):
+        PionInfo.__init__(self                   ,
+                          np.asarray(nTracks     ),
+                          np.asarray(muonOverlapE),
+                          np.asarray(slcCalE     ),
+                          np.asarray(muonCalE    ),
+                          np.asarray(pionPngKEReg),
+                          np.asarray(pngDirX     ),
+                          np.asarray(pngDirY     ),
+                          np.asarray(pngDirZ     ),
+                          np.asarray(trkDirX     ),
+                          np.asarray(trkDirY     ),
+                          np.asarray(trkDirZ     ))
+
+    @staticmethod
+    def FromColumns(columns, branchMap):
+        """Build the container from uproot branch arrays without copying them
+
+        Args:
+            columns (dict): branch name -> numpy array
+            branchMap (dict): constructor argument name (nTracks, muonOverlapE, ...) -> branch name
+
+        Returns:
+            PionInfoArrays: container
+        """
+        return PionInfoArrays(**{field: columns[branch] for field, branch in branchMap.items()})
+
+    def __len__(self):
+        return len(self.nTracks)
+
+    def GetRow(self, index):
+        return PionInfoRow(self, index)
+
+class PionInfoRow:
+    """Lightweight PionInfo view of one event of a PionInfoArrays
+    """
+    __slots__ = ("arrays", "index")
+
+    def __init__(self, arrays, index):
+        self.arrays = arrays
+        self.index  = index
+
+    def GetNTracks(self):
+        return self.arrays.nTracks[self.index]
+
+    def GetMuonOverlapE(self):
+        return self.arrays.MuonOverlapE[self.index]
+
+    def GetSlcCalE(self):
+        return self.arrays.SlcCalE[self.index]
+
+    def GetMuonCalE(self):
+        return self.arrays.MuonCalE[self.index]
+
+    def GetPionPngKE(self):
+        return self.arrays.PionPngKE[self.index]
+
+    def GetTrackDirX(self):
+        return self.arrays.trkDirX[self.index]
+
+    def GetTrackDirY(self):
+        return self.arrays.trkDirY[self.index]
+
+    def GetTrackDirZ(self):
+        return self.arrays.trkDirZ[self.index]
+
+    def GetProngDirX(self):
+        return self.arrays.pngDirX[self.index]
+
+    def GetProngDirY(self):
+        return self.arrays.pngDirY[self.index]
+
+    def GetProngDirZ(self):
+        return self.arrays.pngDirZ[self.index]
+
+class ProngArrays(Prong):
+    """Structure of arrays version of Prong for all prongs of all events.
+       Every field is a flat numpy array and the prongs of event i are
+       flat[offsets[i]:offsets[i + 1]]. GetDirection returns [DirX, DirY, DirZ].
+    """
+    __slots__ = ("offsets",)
+
+    def __init__(self   ,
+                 offsets,
+                 MuonID ,
+                 PionID ,
+                 Length ,
+                 CalE   ,
+                 PID    ,
+                 DirX   ,
+                 DirY   ,
+                 DirZ   ):
+        Prong.__init__(self              ,
+                       np.asarray(MuonID),
+                       np.asarray(PionID),
+                       np.asarray(Length),
+                       np.asarray(CalE  ),
+                       np.asarray(PID   ),
+                       [np.asarray(DirX), np.asarray(DirY), np.asarray(DirZ)])
+        self.offsets = np.asarray(offsets)
+
+    @staticmethod
+    def FromJagged(columns, branchMap):
+        """Build the container from jagged (per-event) uproot branches
+
+        Args:
+            columns (dict): branch name -> jagged array (awkward or numpy object array)
+            branchMap (dict): constructor argument name (MuonID, PionID, ...) -> branch name
+
+        Returns:
+            ProngArrays: container
+        """
+        fields  = {}
+        offsets = None
+        for field, branch in branchMap.items():
+            fieldOffsets, fields[field] = FlattenJagged(columns[branch])
+            if (offsets is None):
+                offsets = fieldOffsets
+            elif (not np.array_equal(offsets, fieldOffsets)):
+                raise ValueError(f"Branch {branch} does not have the same number of prongs per event as the other branches")
+        return ProngArrays(offsets, **fields)
+
+    def __len__(self):
+        return len(self.MuonID)
+
+    def GetNEvents(self):
+        return len(self.offsets) - 1
+
+    def GetRow(self, index):
+        return ProngRow(self, index)
+
+    def GetEventProngs(self, event):
+        """Returns the prongs of one event as Prong-like views (e.g. for SelectProngMuonCandidate)
+
+        Args:
+            event (int): event index
+
+        Returns:
+            list: ProngRow objects
+        """
+        return [ProngRow(self, index) for index in range(self.offsets[event], self.offsets[event + 1])]
+
+    def SelectMuonCandidates(self):
+        """Flat index of the muon candidate prong of every event (see SelectProngMuonCandidateArrays)
+
+        Returns:
+            numpy array: prong index, -1 for events without a candidate
+        """
+        return SelectProngMuonCandidateArrays(self.offsets, self.MuonID, self.Length)
+
+class ProngRow:
+    """Lightweight Prong view of one prong of a ProngArrays
+    """
+    __slots__ = ("arrays", "index")
+
+    def __init__(self, arrays, index):
+        self.arrays = arrays
+        self.index  = index
+
+    def GetMuonID(self):
+        return self.arrays.MuonID[self.index]
+
+    def GetPionID(self):
+        return self.arrays.PionID[self.index]
+
+    def GetLength(self):
+        return self.arrays.Length[self.index]
+
+    def GetCalE(self):
+        return self.arrays.CalE[self.index]
+
+    def GetDirection(self):
+        return ROOT.TVector3(*(component[self.index] for component in self.arrays.dir))
+
+    def GetPID(self):
+        return self.arrays.PID[self.index]
+
+class TrackArrays(Track):
+    """Structure of arrays version of Track for all tracks of all events
+       (same layout as ProngArrays)
+    """
+    __slots__ = ("offsets",)
+
+    def __init__(self   ,
+                 offsets,
+                 MuonID ,
+                 Length ,
+                 CalE   ,
+                 TrueE  ,
+                 PID    ,
+                 DirX   ,
+                 DirY   ,
+                 DirZ   ):
+        Track.__init__(self              ,
+                       np.asarray(MuonID),
+                       np.asarray(Length),
+                       np.asarray(CalE  ),
+                       np.asarray(TrueE ),
+                       np.asarray(PID   ),
+                       [np.asarray(DirX), np.asarray(DirY), np.asarray(DirZ)])
+        self.offsets = np.asarray(offsets)
+
+    @staticmethod
+    def FromJagged(columns, branchMap):
+        """Build the container from jagged (per-event) uproot branches
+
+        Args:
+            columns (dict): branch name -> jagged array (awkward or numpy object array)
+            branchMap (dict): constructor argument name (MuonID, Length, ...) -> branch name
+
+        Returns:
+            TrackArrays: container
+        """
+        fields  = {}
+        offsets = None
+        for field, branch in branchMap.items():
+            fieldOffsets, fields[field] = FlattenJagged(columns[branch])
+            if (offsets is None):
+                offsets = fieldOffsets
+            elif (not np.array_equal(offsets, fieldOffsets)):
+                raise ValueError(f"Branch {branch} does not have the same number of tracks per event as the other branches")
+        return TrackArrays(offsets, **fields)
+
+    def __len__(self):
+        return len(self.MuonID)
+
+    def GetNEvents(self):
+        return len(self.offsets) - 1
+
+    def GetRow(self, index):
+        return TrackRow(self, index)
+
+    def GetEventTracks(self, event):
+        """Returns the tracks of one event as Track-like views
+
+        Args:
+            event (int): event index
+
+        Returns:
+            list: TrackRow objects
+        """
+        return [TrackRow(self, index) for index in range(self.offsets[event], self.offsets[event + 1])]
+
+class TrackRow:
+    """Lightweight Track view of one track of a TrackArrays
+    """
+    __slots__ = ("arrays", "index")
+
+    def __init__(self, arrays, index):
+        self.arrays = arrays
+        self.index  = index
+
+    def GetMuonID(self):
+        return self.arrays.MuonID[self.index]
+
+    def GetLength(self):
+        return self.arrays.Length[self.index]
+
+    def GetCalE(self):
+        return self.arrays.CalE[self.index]
+
+    def GetTrueE(self):
+        return self.arrays.TrueE[self.index]
+
+    def GetDirection(self):
+        return ROOT.TVector3(*(component[self.index] for component in self.arrays.dir))
+
+    def GetPID(self):
+        return self.arrays.PID[self.index]
+
 # class CutTableRow:
 #     def __init__(self, backTree, scale):
 #         self.backTree = backTree
@@ -1647,28 +3622,82 @@ class Track:
 
 
 
-class CreateParticleCandidateTable:
-    def __init__(self, candidateList, particleName, csvFileName):
-        self.Candidates   = candidateList
-        self.ParticleName = particleName
-        self.CSVFileName  = csvFileName
+class CreateParticleCandidateTable:
+    """Number of events per particle candidate (e.g. PDG code of the muon candidate).
+       The candidates are counted in one pass and can be added chunk by chunk;
+       the table lists them in order of first appearance.
+    """
+    def __init__(self, candidateList, particleName, csvFileName):
+        """Input arguments of the constructor
+
+        Args:
+            candidateList (list, numpy array): candidate of every event (None = added later with AddCandidates)
+            particleName (string): particle name used in the column names
+            csvFileName (string): output csv file name
+        """
+        self.ParticleName = particleName
+        self.CSVFileName  = csvFileName
+        self.Counts       = Counter()
+        self.NEvents      = 0
+
+        if (candidateList is not None):
+            self.AddCandidates(candidateList)
+
+    def AddCandidates(self, candidates):
+        """Count a chunk of candidates
+
+        Args:
+            candidates (list, numpy array): candidate of every event of the chunk
+        """
+        if (isinstance(candidates, np.ndarray) and (candidates.dtype != object)):
+            values, firstIndex, counts = np.unique(candidates, return_index=True, return_counts=True)
+            order = np.argsort(firstIndex, kind="stable")
+            self.Counts.update(dict(zip(values[order].tolist(), counts[order].tolist())))
+        else:
+            self.Counts.update(candidates)
+        self.NEvents += len(candidates)
+
+    def GetCounts(self):
+        return self.Counts
 
+    def GetPercentage(self, particleCand):
+        if (self.NEvents == 0):
+            return 0.0
+        return round(((self.Counts[particleCand])/(self.NEvents))*100, 3)
 
     def SaveCSVFile(self):
-        particleCands = list(dict.fromkeys(self.Candidates))
         with open(self.CSVFileName, "w", newline='') as csvfile:
             fieldnames = [f"{self.ParticleName} Candidate", "Number of Events", "Percentage"]
             writer     = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
             writer.writeheader()
-            for particleCand in particleCands:
-                writer.writerow({f"{self.ParticleName} Candidate":particleCand, "Number of Events":self.Candidates.count(particleCand), "Percentage":round(((self.Candidates.count(particleCand))/(len(self.Candidates)))*100, 3)})
+            for particleCand, count in self.Counts.items():
+                writer.writerow({f"{self.ParticleName} Candidate":particleCand, "Number of Events":count, "Percentage":self.GetPercentage(particleCand)})
 
-            csvfile.close()
+    @staticmethod
+    def SaveCombinedCSVFile(tables, csvFileName):
+        """Save several candidate tables (e.g. muon and pion) as one table with a
+           "<ParticleName> Events"/"<ParticleName> Percentage" column pair per table
 
+        Args:
+            tables (list): CreateParticleCandidateTable objects
+            csvFileName (string): output csv file name
+        """
+        particleCands = list(dict.fromkeys(itertools.chain.from_iterable(table.GetCounts() for table in tables)))
+        with open(csvFileName, "w", newline='') as csvfile:
+            fieldnames = ["Candidate"]
+            for table in tables:
+                fieldnames += [f"{table.ParticleName} Events", f"{table.ParticleName} Percentage"]
+            writer     = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
+            writer.writeheader()
+            for particleCand in particleCands:
+                row = {"Candidate": particleCand}
+                for table in tables:
+                    row[f"{table.ParticleName} Events"    ] = table.GetCounts()[particleCand]
+                    row[f"{table.ParticleName} Percentage"] = table.GetPercentage(particleCand)
+                writer.writerow(row)
 
-    
 
 
 class EventSelection:
@@ -1874,6 +3903,144 @@ class EventSelection:
                     self.MuonLenCut          () and 
                     self.MuonIDCut           () )
 
+class CompiledEventSelection:
+    """Column version of EventSelection built once for all events. The cuts are evaluated
+       as boolean masks over column arrays and the masks of all cumulative stages
+       (MuonID -> PionID -> HitInfo -> RecoT -> Kinematic) come out of one pass.
+    """
+    # cumulative stages in the order they are applied
+    stages = ["MuonID", "PionID", "HitInfo", "RecoT", "Kinematic"]
+
+    # EventSelection.Output(): (IsMuonID, IsPionID, IsRecoT, IsKinematic, IsHitInfo) -> last stage applied
+    outputStages = {(True, True , True , True , True ): "HitInfo"  ,
+                    (True, True , True , True , False): "Kinematic",
+                    (True, True , True , False, False): "RecoT"    ,
+                    (True, True , False, False, False): "PionID"   ,
+                    (True, False, False, False, False): "MuonID"   }
+
+    # EventSelection.SetVariables argument -> branch name
+    defaultBranchMap = {"MuonLen"     : "MuonLen"          ,
+                        "PionCalE"    : "PionCalE"         ,
+                        "MuonID"      : "BestKalmanMuonID" ,
+                        "PionID"      : "FinalPionID"      ,
+                        "HitInfoScore": "FinalHitScore"    ,
+                        "RecoT"       : "RecoTKalman"      ,
+                        "Kinematic"   : "NewKinematicScore"}
+
+    def __init__(self                ,
+                 CutName             ,
+                 IsMuonID            ,
+                 IsPionID            ,
+                 IsRecoT             ,
+                 IsKinematic         ,
+                 IsHitInfo           ,
+                 muonIDThreshold     ,
+                 pionIDThreshold     ,
+                 recoTThreshold      ,
+                 KinematicThreshold  ,
+                 HiInfoScoreThreshold,
+                 branchMap=None      ):
+        """Initialize the selection from the EventSelection cut flags and thresholds
+
+        Args:
+            CutName (str): cut name
+            IsMuonID, IsPionID, IsRecoT, IsKinematic, IsHitInfo (bool): cut flags (see EventSelection)
+            muonIDThreshold, pionIDThreshold, KinematicThreshold, HiInfoScoreThreshold (double): thresholds
+            recoTThreshold (list): [low, high] |t| thresholds, only low is applied (as in EventSelection)
+            branchMap (dict): SetVariables argument name -> branch name, overrides defaultBranchMap.
+                              A None branch drops that precondition (MuonLen or PionCalE >= 0).
+        """
+        self.CutName     = CutName
+        self.outputStage = self.outputStages.get((IsMuonID == True, IsPionID == True, IsRecoT == True,
+                                                  IsKinematic == True, IsHitInfo == True))
+        self.thresholds  = {"MuonID"   : muonIDThreshold     ,
+                            "PionID"   : pionIDThreshold     ,
+                            "HitInfo"  : HiInfoScoreThreshold,
+                            "RecoT"    : recoTThreshold[0]   ,
+                            "Kinematic": KinematicThreshold  }
+
+        self.branchMap = dict(self.defaultBranchMap)
+        if (branchMap is not None):
+            self.branchMap.update(branchMap)
+
+    @staticmethod
+    def FromEventSelection(selection, branchMap=None):
+        """Compile an EventSelection whose thresholds are set
+
+        Args:
+            selection (EventSelection): selection with SetThresholds called
+            branchMap (dict): see __init__
+
+        Returns:
+            CompiledEventSelection: compiled selection
+        """
+        return CompiledEventSelection(selection.CutName              ,
+                                      selection.IsMuonIDCut          ,
+                                      selection.IsPionIDCut          ,
+                                      selection.IsTCut               ,
+                                      selection.IsKinematicCut       ,
+                                      selection.IsHitInfo            ,
+                                      selection.MuonIDThreshold      ,
+                                      selection.PionIDThreshold      ,
+                                      selection.recoTThreshold       ,
+                                      selection.KinematicThreshold   ,
+                                      selection.HitInfoScoreThreshold,
+                                      branchMap)
+
+    def GetName(self):
+        return self.CutName
+
+    def GetBranches(self):
+        return [branch for branch in self.branchMap.values() if (branch is not None)]
+
+    def GetColumn(self, columns, variable):
+        return np.asarray(columns[self.branchMap[variable]])
+
+    def GetStageMasks(self, columns):
+        """Pass masks of all cumulative stages
+
+        Args:
+            columns (dict): branch name -> numpy array
+
+        Returns:
+            OrderedDict: stage name -> boolean mask of the events passing this and all previous stages
+        """
+        muonID = self.GetColumn(columns, "MuonID")
+
+        # preconditions of every EventSelection output
+        mask = np.ones(len(muonID), dtype=bool)
+        for variable in ["PionCalE", "MuonLen"]:
+            if (self.branchMap[variable] is not None):
+                mask &= self.GetColumn(columns, variable) >= 0
+
+        # MuonIDCut fails only for val < threshold (NaN passes)
+        cuts = OrderedDict()
+        cuts["MuonID"   ] = ~(muonID < self.thresholds["MuonID"])
+        cuts["PionID"   ] = self.GetColumn(columns, "PionID"      ) >  self.thresholds["PionID"   ]
+        cuts["HitInfo"  ] = self.GetColumn(columns, "HitInfoScore") >  self.thresholds["HitInfo"  ]
+        cuts["RecoT"    ] = self.GetColumn(columns, "RecoT"       ) >= self.thresholds["RecoT"    ]
+        cuts["Kinematic"] = self.GetColumn(columns, "Kinematic"   ) >  self.thresholds["Kinematic"]
+
+        masks = OrderedDict()
+        for stage, cut in cuts.items():
+            mask         = mask & cut
+            masks[stage] = mask
+        return masks
+
+    def Mask(self, columns):
+        """Pass mask of the selection, the column version of EventSelection.Output()
+
+        Args:
+            columns (dict): branch name -> numpy array
+
+        Returns:
+            numpy array: boolean mask (all False for flag combinations Output() does not handle)
+        """
+        masks = self.GetStageMasks(columns)
+        if (self.outputStage is None):
+            return np.zeros(len(masks["MuonID"]), dtype=bool)
+        return masks[self.outputStage]
+
 class CreateHist:
     def __init__(self, histDim, histName):
         self.hist       =   ROOT.TH1D(histName, "", histDim[0], histDim[1], histDim[2])
@@ -1921,13 +4088,316 @@ class HitEPlot:
 
         c.SaveAs(fileName)
 
+class OutputPolicy:
+    """Which files the SaveCanvas methods write. The default writes what they always wrote
+       (canvas as pdf and root, objects of SaveCanvas.SaveCanvas in a _Objects.root file per plot).
+       With a session file the objects of every plot go into one TFile, one directory per plot
+       and an "index" TObjString listing the directories:
+
+       .. code-block:: python
+
+            policy = OutputPolicy(formats=["png"], dpi=150, sessionFile="validation_Objects.root")
+            for hists, canvasParam in plots:
+                SaveCanvas(hists, canvasParam, True, policy).SaveCanvas(leg)
+            policy.Close()
+    """
+    canvasFormats = ["pdf", "png", "root", "eps", "svg", "C"]
+
+    def __init__(self, formats=("pdf", "root"), dpi=None, writeObjects=True, sessionFile=None):
+        """Input arguments of the constructor
+
+        Args:
+            formats (list): canvas file formats ([] = no canvas files, e.g. ROOT objects only)
+            dpi (int): resolution of png files (None = canvas size)
+            writeObjects (bool): write the canvas and histograms of the methods that save objects
+            sessionFile (string): single TFile receiving the objects of every plot (None = one file per plot)
+        """
+        for fileFormat in formats:
+            if (fileFormat not in self.canvasFormats):
+                raise ValueError(f"Unknown canvas format {fileFormat}, known: {self.canvasFormats}")
+
+        self.formats      = list(formats)
+        self.dpi          = dpi
+        self.writeObjects = writeObjects
+        self.sessionName  = sessionFile
+        self.session      = None
+        self.index        = []
+
+    def SaveCanvasFiles(self, c, stem):
+        """Save the canvas in every format of the policy
+
+        Args:
+            c (TCanvas): canvas
+            stem (string): file name without extension
+        """
+        for fileFormat in self.formats:
+            if ((fileFormat == "png") and (self.dpi is not None)):
+                # ROOT draws 72 pixels per inch, resize the canvas for the requested resolution
+                width, height = c.GetWw(), c.GetWh()
+                c.SetCanvasSize(int(width*self.dpi/72), int(height*self.dpi/72))
+                c.SaveAs(f"{stem}.png")
+                c.SetCanvasSize(width, height)
+            else:
+                c.SaveAs(f"{stem}.{fileFormat}")
+
+    def GetSession(self):
+        if (self.session is None):
+            # opening a TFile makes it the current directory, keep the current one
+            with ROOT.TDirectory.TContext():
+                self.session = ROOT.TFile(self.sessionName, "RECREATE")
+        return self.session
+
+    def SaveObjects(self, c, objects, name):
+        """Write the canvas and the objects of one plot
+
+        Args:
+            c (TCanvas): canvas
+            objects (list): ROOT objects (histograms, ...)
+            name (string): per plot file name without extension, directory name in the session file
+        """
+        if (not self.writeObjects):
+            return
+
+        if (self.sessionName is None):
+            fOut = ROOT.TFile(f"{name}.root","RECREATE")
+            fOut.cd()
+            c.Write()
+            for obj in objects:
+                obj.Write()
+            fOut.Write()
+            fOut.Close()
+            return
+
+        dirName = name.replace("/", "_")
+        session = self.GetSession()
+        plotDir = session.GetDirectory(dirName) or session.mkdir(dirName)
+        # restore gDirectory afterwards, histograms created later must not be owned by the session file
+        with ROOT.TDirectory.TContext(plotDir):
+            c.Write(c.GetName(), ROOT.TObject.kOverwrite)
+            for obj in objects:
+                obj.Write(obj.GetName(), ROOT.TObject.kOverwrite)
+        if (dirName not in self.index):
+            self.index.append(dirName)
+
+    def Save(self, c, stem, objects=None, objectsName=None):
+        """Save one plot according to the policy
+
+        Args:
+            c (TCanvas): canvas
+            stem (string): canvas file name without extension
+            objects (list): objects written with the canvas (None = the plot has no object file)
+            objectsName (string): name of the object file or session directory (None = stem)
+        """
+        self.SaveCanvasFiles(c, stem)
+        if (objects is not None):
+            self.SaveObjects(c, objects, stem if (objectsName is None) else objectsName)
+
+    def Close(self):
+        """Write the index and close the session file, gROOT is the current directory afterwards
+        """
+        if (self.session is None):
+            return
+        with ROOT.TDirectory.TContext(self.session):
+            ROOT.TObjString("\n".join(self.index)).Write("index", ROOT.TObject.kOverwrite)
+        self.session.Close()
+        self.session = None
+        ROOT.gROOT.cd()
+        print(f"Successfully saved {len(self.index)} plots in {self.sessionName}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        self.Close()
+
+class DataMCComparison:
+    """Differential and cumulative (Integral(i, nBins)) data/MC ratios with errors computed
+       from one read of the bin arrays of both histograms. The ratio histograms are built
+       on demand from a single clone of the data histogram (or of its cumulative clone) each,
+       with the same contents, errors and entries as CalculateErrorOfRatioHist of the
+       histograms or of their cumulative clones.
+    """
+    def __init__(self, dataHist, mcHist):
+        """Input arguments of the constructor
+
+        Args:
+            dataHist (TH1): data histogram (binning and axis style of the ratio histograms)
+            mcHist (TH1): total MC histogram
+        """
+        self.dataHist = dataHist
+        self.mcHist   = mcHist
+        self.nBins    = dataHist.GetNbinsX()
+
+        self.dataContent = GetHistBinArrays(dataHist, withSumw2=False)[0].copy()
+        self.mcContent   = GetHistBinArrays(mcHist  , withSumw2=False)[0].copy()
+
+        # the cumulative clones keep the under/overflow contents of the histograms
+        self.dataCumContent = ReverseCumulativeSum(self.dataContent)
+        self.mcCumContent   = ReverseCumulativeSum(self.mcContent)
+        for cumContent, content in [[self.dataCumContent, self.dataContent], [self.mcCumContent, self.mcContent]]:
+            cumContent[0]              = content[0]
+            cumContent[self.nBins + 1] = content[self.nBins + 1]
+
+        self.ratio   , self.ratioErrors   , self.both    = RatioWithErrorArrays(self.dataContent   , self.mcContent   )
+        self.cumRatio, self.cumRatioErrors, self.cumBoth = RatioWithErrorArrays(self.dataCumContent, self.mcCumContent)
+
+    def GetRatio(self):
+        return [self.ratio, self.ratioErrors]
+
+    def GetCumulativeRatio(self):
+        return [self.cumRatio, self.cumRatioErrors]
+
+    def CreateCumulativeClone(self, hist, content, cumContent, name):
+        """Clone of hist with bin i = Integral(i, nBins) and error sqrt(content), as the
+           SetBinContent/SetBinError loop of SaveDATACanvasCumRatio left it
+
+        Returns:
+            TH1: cumulative clone
+        """
+        cum = hist.Clone(name)
+        cum.SetDirectory(0)
+        # the first SetBinError switches Sumw2 on from the contents
+        sumw2 = GetHistBinArrays(hist)[1]
+        sumw2 = np.abs(content) if (sumw2 is None) else sumw2.copy()
+        sumw2[1:self.nBins + 1] = np.sqrt(cumContent[1:self.nBins + 1])**2
+        SetHistBinArrays(cum, cumContent, sumw2, hist.GetEntries() + self.nBins)
+        return cum
+
+    def CreateRatioHist(self, name, numHist, denomHist, content, errors, both):
+        hist = numHist.Clone(name)
+        hist.SetDirectory(0)
+        # TH1::Divide recomputes the entries from the divided bins, then one SetBinContent per bin in both
+        hist.Divide(denomHist)
+        SetHistBinArrays(hist, content, errors*errors, hist.GetEntries() + np.count_nonzero(both))
+        return hist
+
+    def GetRatioHist(self, name="ratioHist"):
+        """Data/MC ratio histogram
+
+        Returns:
+            TH1: ratio with errors
+        """
+        return self.CreateRatioHist(name, self.dataHist, self.mcHist, self.ratio, self.ratioErrors, self.both)
+
+    def GetCumulativeRatioHist(self, name="ratioCumHist"):
+        """Ratio of the cumulative data and MC histograms
+
+        Returns:
+            TH1: cumulative ratio with errors
+        """
+        dataCum = self.CreateCumulativeClone(self.dataHist, self.dataContent, self.dataCumContent, "dataCum")
+        mcCum   = self.CreateCumulativeClone(self.mcHist  , self.mcContent  , self.mcCumContent  , "mcCum"  )
+        return self.CreateRatioHist(name, dataCum, mcCum, self.cumRatio, self.cumRatioErrors, self.cumBoth)
+
+class SystematicEnvelope:
+    """Ratios of N shifted histograms to the nominal one and their envelope, computed on the
+       (N x bins) stack of bin arrays in one pass (see SystematicRatioArrays/SystematicEnvelopeArrays).
+       With cumulative=True the histograms are integrated first, to the last bin
+       (Integral(i, nBins), as CreateCumulativePlot) if isIntToInf else from the first bin.
+    """
+    def __init__(self, nominalHist, shiftedHists, sources=None, isCorr=False, cumulative=False, isIntToInf=True):
+        """Input arguments of the constructor
+
+        Args:
+            nominalHist (TH1): nominal histogram
+            shiftedHists (list): shifted histograms
+            sources (list): systematic source of every shifted histogram, e.g. ["GENIE", "GENIE", "Calib"]
+                            (None = every histogram is its own source)
+            isCorr (bool): fully correlated errors (CalculateErrorOfRatioHistFullyCorelated)
+            cumulative (bool): compare cumulative histograms
+            isIntToInf (bool): cumulative direction, see above
+        """
+        self.nominalHist  = nominalHist
+        self.shiftedHists = shiftedHists
+        self.isCorr       = isCorr
+        self.cumulative   = cumulative
+        self.isIntToInf   = isIntToInf
+
+        nominal = GetHistBinArrays(nominalHist, withSumw2=False)[0]
+        shifted = np.array([GetHistBinArrays(hist, withSumw2=False)[0] for hist in shiftedHists])
+
+        if (cumulative):
+            Cumulate = ReverseCumulativeSum if (isIntToInf) else ForwardCumulativeSum
+            nominal  = Cumulate(nominal)
+            shifted  = Cumulate(shifted)
+            # cumulative histograms have no Sumw2, their errors are sqrt(|content|)
+            nominalErrors = np.sqrt(np.abs(nominal))
+        else:
+            nominalErrors = GetHistBinErrors(nominalHist)
+
+        self.ratio, self.errors, self.both = SystematicRatioArrays(nominal, shifted, nominalErrors if (isCorr) else None)
+        self.envelope                      = SystematicEnvelopeArrays(self.ratio, nominal, sources)
+
+    def GetEnvelope(self):
+        return self.envelope
+
+    def GetRatioHist(self, index, name=None):
+        """Ratio histogram of one shifted histogram
+
+        Args:
+            index (int): index in shiftedHists
+            name (string): histogram name (None = "<shifted name>_ratio")
+
+        Returns:
+            TH1: ratio with errors
+        """
+        source = self.shiftedHists[index]
+        if (self.cumulative):
+            numHist   = CreateCumulativePlot(source, self.isIntToInf)
+            denomHist = CreateCumulativePlot(self.nominalHist, self.isIntToInf)
+        else:
+            numHist   = source
+            denomHist = self.nominalHist
+
+        hist = numHist.Clone(f"{source.GetName()}_ratio" if (name is None) else name)
+        hist.SetDirectory(0)
+        if (self.isCorr):
+            # CalculateErrorOfRatioHistFullyCorelated: one SetBinContent per bin
+            entries = hist.GetEntries() + hist.GetNbinsX()
+        else:
+            # CalculateErrorOfRatioHist: TH1::Divide recomputes the entries from the divided bins,
+            # then one SetBinContent per bin with both contents non zero
+            hist.Divide(denomHist)
+            entries = hist.GetEntries() + np.count_nonzero(self.both[index])
+        SetHistBinArrays(hist, self.ratio[index], self.errors[index]*self.errors[index], entries)
+        return hist
+
+    def GetNominalRatioHist(self):
+        nominalRatio = self.nominalHist.Clone("nominalHistRatio")
+        nominalRatio.SetDirectory(0)
+        nominalRatio.Divide(self.nominalHist)
+        return nominalRatio
+
+    def GetBandHists(self):
+        """Total systematic band around the nominal ratio
+
+        Returns:
+            list: [1 + up, 1 - down] histograms (quadrature sum of the sources)
+        """
+        bands = []
+        for name, content in [["sysBandUp", 1 + self.envelope["up"]], ["sysBandDown", 1 - self.envelope["down"]]]:
+            hist = self.nominalHist.Clone(name)
+            hist.SetDirectory(0)
+            SetHistBinArrays(hist, content, np.zeros(len(content)), self.nominalHist.GetNbinsX())
+            bands.append(hist)
+        return bands
+
 class SaveCanvas:
     """This Class is generated to save histograms in a canvas.
     """
-    def __init__(self, hists, canvasParam, isSim):
-        self.hists       = hists
-        self.canvasParam = canvasParam
-        self.IsSim       = isSim
+    def __init__(self, hists, canvasParam, isSim, outputPolicy=None):
+        """Input arguments of the constructor
+
+        Args:
+            hists (list): histograms
+            canvasParam (list): canvas parameters
+            isSim (bool): simulation label
+            outputPolicy (OutputPolicy): files written per plot (None = pdf and root, see OutputPolicy)
+        """
+        self.hists        = hists
+        self.canvasParam  = canvasParam
+        self.IsSim        = isSim
+        self.outputPolicy = outputPolicy if (outputPolicy is not None) else OutputPolicy()
 
     def SaveCanvas(self, leg):
         c = ROOT.TCanvas("c")
@@ -2012,16 +4482,7 @@ class SaveCanvas:
 
         l.Draw()
         
-        c.SaveAs(f"{self.canvasParam[6]}_Canvas.pdf")
-        c.SaveAs(f"{self.canvasParam[6]}_Canvas.root")
-        fOut = ROOT.TFile(f"{self.canvasParam[6]}_Objects.root","RECREATE")
-        fOut.cd()
-        c.Write()
-        for hist in self.hists:
-            hist.Write()
-
-        fOut.Write()
-        fOut.Close()
+        self.outputPolicy.Save(c, f"{self.canvasParam[6]}_Canvas", self.hists, f"{self.canvasParam[6]}_Objects")
 
         c.Destructor()
 
@@ -2117,8 +4578,7 @@ class SaveCanvas:
 
         l.Draw()
         
-        c.SaveAs(f"{self.canvasParam[6]}.pdf")
-        c.SaveAs(f"{self.canvasParam[6]}.root")
+        self.outputPolicy.Save(c, f"{self.canvasParam[6]}")
         c.Destructor()
 
 
@@ -2203,8 +4663,7 @@ class SaveCanvas:
         #l.AddEntry(fit, eq, "l")
         l.Draw()
         
-        c.SaveAs(f"{self.canvasParam[6]}.pdf")
-        c.SaveAs(f"{self.canvasParam[6]}.root")
+        self.outputPolicy.Save(c, f"{self.canvasParam[6]}")
 
 
     def SaveDATACanvas(self, leg, isSimulation):
@@ -2240,17 +4699,9 @@ class SaveCanvas:
 
             hist.SetStats(0)
             if ("data" in hist.GetName()):
-                nBins = hist.GetNbinsX()
                 print(f"data Histogram Name: {hist.GetName()}")
-                dataCum = hist.Clone("dataHistCum")
-                dataCum.SetDirectory(0)
-
                 hist.Draw ( "PE same" )
-                dataHist = hist.Clone("dataHist")
-                dataHist.SetDirectory(0)
-                
-                ratioHist = hist.Clone("ratioHist")
-                ratioHist.SetDirectory(0)
+                dataHist = hist
             else:
                 hist.Draw("hist same")
 
@@ -2258,13 +4709,7 @@ class SaveCanvas:
 
             if (("total" in hist.GetName()) and ("_MC" in hist.GetName())):
                 print(f"Total MC Histogram Name: {hist.GetName()}")
-                totalMCHist = hist.Clone("totalMCHist")
-                totalMCHist.SetDirectory(0)
-                ratioHist.Divide(hist)
-                ratioHistWithErrors = CalculateErrorOfRatioHist(dataHist, totalMCHist)
-
-                nBins = hist.GetNbinsX()
-                #ratioHist.SetDirectory(0)
+                comparison = DataMCComparison(dataHist, hist)
 
 
             if ( self.canvasParam[4] != False):
@@ -2325,6 +4770,7 @@ class SaveCanvas:
         pad2.cd ()
 
         
+        ratioHistWithErrors = comparison.GetRatioHist()
         ratioHistWithErrors.GetYaxis().SetLabelSize(0.12)
         ratioHistWithErrors.GetYaxis().SetTitleSize(0.12)
         ratioHistWithErrors.GetYaxis().SetTitle("Data/MC")
@@ -2337,8 +4783,7 @@ class SaveCanvas:
         baseline = ROOT.TLine( self.canvasParam[0][0], 1, self.canvasParam[0][1], 1)
         baseline.Draw()
 
-        c.SaveAs(f"{self.canvasParam[6]}.pdf")
-        c.SaveAs(f"{self.canvasParam[6]}.root")
+        self.outputPolicy.Save(c, f"{self.canvasParam[6]}")
         c.Destructor()
 
 
@@ -2374,23 +4819,9 @@ class SaveCanvas:
 
             hist.SetStats(0)
             if ("data" in hist.GetName()):
-                nBins = hist.GetNbinsX()
                 print(f"data Histogram Name: {hist.GetName()}")
-                dataCum = hist.Clone("dataHistCum")
-
-                for i in range(1, nBins+1):
-                    dataCum.SetBinContent(i, hist.Integral(i, nBins))
-                    binError = dataCum.GetBinContent(i)
-                    dataCum.SetBinError(i, sqrt(binError))
-                    #binError = hist.GetBinContent(i)
-                    #hist.SetBinError(i, sqrt(binError))
-
                 hist.Draw ( "PE same" )
-                dataHist = hist.Clone("dataHist")
-                dataHist.SetDirectory(0)
-                
-                ratioHist = hist.Clone("ratioHist")
-                ratioHist.SetDirectory(0)
+                dataHist = hist
             else:
                 hist.Draw("hist same")
 
@@ -2398,27 +4829,7 @@ class SaveCanvas:
 
             if (("total" in hist.GetName()) and ("_MC" in hist.GetName())):
                 print(f"Total MC Histogram Name: {hist.GetName()}")
-                totalMCHist = hist.Clone("totalMCHist")
-                totalMCHist.SetDirectory(0)
-                ratioHist.Divide(hist)
-                ratioHistWithErrors = CalculateErrorOfRatioHist(dataHist, totalMCHist)
-
-                totalCum = hist.Clone("toalMCHistCum")
-                totalCum.SetDirectory(0)
-                nBins = hist.GetNbinsX()
-                for i in range(1, nBins+1):
-                    totalCum.SetBinContent(i, hist.Integral(i, nBins))
-                    binError = totalCum.GetBinContent(i)
-                    totalCum.SetBinError(i, sqrt(binError))
-
-
-                ratioCumHistWithErrors = CalculateErrorOfRatioHist(dataCum, totalCum)
-                ratioCumHistWithErrors.SetDirectory(0)
-
-
-
-
-                #ratioHist.SetDirectory(0)
+                comparison = DataMCComparison(dataHist, hist)
 
 
             if ( self.canvasParam[4] != False):
@@ -2479,6 +4890,7 @@ class SaveCanvas:
         pad2.cd ()
 
         
+        ratioCumHistWithErrors = comparison.GetCumulativeRatioHist()
         ratioCumHistWithErrors.GetYaxis().SetLabelSize(0.12)
         ratioCumHistWithErrors.GetYaxis().SetTitleSize(0.12)
         ratioCumHistWithErrors.GetYaxis().SetTitle("Data/MC")
@@ -2491,100 +4903,72 @@ class SaveCanvas:
         baseline = ROOT.TLine( self.canvasParam[0][0], 1, self.canvasParam[0][1], 1)
         baseline.Draw()
 
-        c.SaveAs(f"{self.canvasParam[6]}Cum.pdf")
-        c.SaveAs(f"{self.canvasParam[6]}Cum.root")
+        self.outputPolicy.Save(c, f"{self.canvasParam[6]}Cum")
         c.Destructor()
 
-    def SaveSystematicRatio(self, leg, IsCorr):
-        if (len(self.hists)==3):
-            print(len(self.hists))
-            nominalHist = self.hists[1]
-            upHist      = self.hists[0]
-            downHist    = self.hists[2]
-
-            nominalHist.SetDirectory(0)
-            upHist.SetDirectory(0)
-            downHist.SetDirectory(0)
-
-            #nominalHist.Rebin(10)
-            #upHist.Rebin(10)
-            #downHist.Rebin(10)
-
-            nominalRatio = nominalHist.Clone("nominalHistRatio")
-            nominalRatio.SetDirectory(0)
-            #nominalRatio.Rebin(10)
-            nominalRatio.Divide(nominalHist)
-
-            nominalRatio.SetLineColor(1)
-            nominalRatio.SetLineWidth(2)
+    def CreateSystematicHists(self, IsCorr, cumulative=False, IsIntToInf=True, sources=None):
+        """Ratio histograms of the systematic plots from one SystematicEnvelope.
+           2 hists: [nominal, up], 3 hists: [up, nominal, down], more: [nominal, shifted...]
+           (the total band of the shifted histograms is drawn as well)
 
-            #upRatio = upHist.Clone("upHistRatio")
-            #upRatio.SetDirectory(0)
-            #upRatio.Rebin(10)
-            #upRatio.Divide(nominalHist)
-
-            if (IsCorr):
-                upRatio = CalculateErrorOfRatioHistFullyCorelated(upHist, nominalHist)
-            else:
-                upRatio = CalculateErrorOfRatioHist(upHist, nominalHist)
-            upRatio.SetDirectory(0)
-
-            upRatio.SetLineColor(2)
-            upRatio.SetLineWidth(2)
-
-            # downRatio = downHist.Clone("downHistRatio")
-            # downRatio.SetDirectory(0)
-            # #downRatio.Rebin(10)
-            # downRatio.Divide(nominalHist)
-
-            if (IsCorr):
-                downRatio = CalculateErrorOfRatioHistFullyCorelated(downHist, nominalHist)
-            else:
-                downRatio = CalculateErrorOfRatioHist(downHist, nominalHist)
-
-            downRatio.SetDirectory(0)
-
-            downRatio.SetLineColor(4)
-            downRatio.SetLineWidth(2)
-
-            self.sysHists = [upRatio, nominalRatio, downRatio]
-            #self.sysHists = [nominalRatio]
-
-        if (len(self.hists)==2):
-            print(len(self.hists))
-            nominalHist = self.hists[0]
-            upHist      = self.hists[1]
-
-            nominalHist.SetDirectory(0)
-            upHist.SetDirectory(0)
-
-            #nominalHist.Rebin(10)
-            #upHist.Rebin(10)
-
-            nominalRatio = nominalHist.Clone("nominalHistRatio")
-            nominalRatio.SetDirectory(0)
-            #nominalRatio.Rebin(10)
-            nominalRatio.Divide(nominalHist)
-
-            nominalRatio.SetLineColor(1)
-            nominalRatio.SetLineWidth(2)
-
-            upRatio = upHist.Clone("upHistRatio")
-            upRatio.SetDirectory(0)
-            #upRatio.Rebin(10)
-            upRatio.Divide(nominalHist)
+        Args:
+            IsCorr (bool): fully correlated errors
+            cumulative (bool): ratios of the cumulative histograms
+            IsIntToInf (bool): cumulative to the last bin (Integral(i, nBins)), otherwise from the first bin
+            sources (list): systematic source of every shifted histogram, in the order of the shifted
+                            histograms above ([up, down] for 3 hists). Give the up and down shifts of
+                            one knob the same name, e.g. ["MaCCQE", "MaCCQE", "Calib", "Calib"]: a source
+                            contributes its largest deviation per bin and the total band is the
+                            quadrature sum over sources (None = every shifted histogram is its own source)
+        """
+        print(len(self.hists))
+        for hist in self.hists:
+            hist.SetDirectory(0)
 
-            if (IsCorr):
-                upRatio = CalculateErrorOfRatioHistFullyCorelated(upHist, nominalHist)
-            else:
-                upRatio = CalculateErrorOfRatioHist(upHist, nominalHist)
-            upRatio.SetDirectory(0)
+        if (len(self.hists) == 3):
+            nominalHist  = self.hists[1]
+            shiftedHists = [self.hists[0], self.hists[2]]
+            colors       = [2, 4]
+        else:
+            nominalHist  = self.hists[0]
+            shiftedHists = self.hists[1:]
+            colors       = [2, 4, 6, 8, 9, 28, 30, 38, 46]
+
+        if ((sources is not None) and (len(sources) != len(shiftedHists))):
+            raise ValueError(f"Got {len(sources)} sources for {len(shiftedHists)} shifted histograms")
+
+        envelope     = SystematicEnvelope(nominalHist, shiftedHists, sources, IsCorr, cumulative, IsIntToInf)
+        nominalRatio = envelope.GetNominalRatioHist()
+        nominalRatio.SetLineColor(1)
+        nominalRatio.SetLineWidth(2)
+
+        shiftedRatios = []
+        for index in range(len(shiftedHists)):
+            ratio = envelope.GetRatioHist(index)
+            ratio.SetLineColor(colors[index % len(colors)])
+            ratio.SetLineWidth(2)
+            shiftedRatios.append(ratio)
+
+        if (len(self.hists) == 3):
+            self.sysHists = [shiftedRatios[0], nominalRatio, shiftedRatios[1]]
+        elif (len(self.hists) == 2):
+            self.sysHists = [shiftedRatios[0], nominalRatio]
+        else:
+            bands = envelope.GetBandHists()
+            for band in bands:
+                band.SetLineColor(1)
+                band.SetLineStyle(2)
+            self.sysHists = [nominalRatio] + shiftedRatios + bands
 
-            upRatio.SetLineColor(2)
-            upRatio.SetLineWidth(2)
+    def SaveSystematicRatio(self, leg, IsCorr, sources=None):
+        """Ratios of the shifted histograms to the nominal one (see CreateSystematicHists)
 
-            self.sysHists = [upRatio, nominalRatio]
-            #self.sysHists = [nominalRatio]
+        Args:
+            leg (list): legend parameters
+            IsCorr (bool): fully correlated errors
+            sources (list): systematic source of every shifted histogram (None = every histogram is its own source)
+        """
+        self.CreateSystematicHists(IsCorr, sources=sources)
 
         c = ROOT.TCanvas("c")
         c.cd()
@@ -2662,128 +5046,20 @@ class SaveCanvas:
 
         l.Draw()
         
-        c.SaveAs(f"{self.canvasParam[6]}Ratio.pdf")
-        c.SaveAs(f"{self.canvasParam[6]}Ratio.root")
-
-    def SaveCumulativeSystematicRatio(self, leg, IsCorr, IsIntToInf):
-        if (len(self.hists)==3):
-            print(len(self.hists))
-            nominalHist = self.hists[1]
-            upHist      = self.hists[0]
-            downHist    = self.hists[2]
-
-            nominalHist.SetDirectory(0)
-            upHist.SetDirectory(0)
-            downHist.SetDirectory(0)
-
-            #nominalHist.Rebin(10)
-            #upHist.Rebin(10)
-            #downHist.Rebin(10)
-
-            nominalRatio = nominalHist.Clone("nominalHistRatio")
-            nominalRatio.SetDirectory(0)
-            
-            nominalCum = CreateCumulativePlot(nominalHist)
-            nominalCum.SetDirectory(0)
-
-            nominalCumRatio = nominalCum.Clone("nominalCumRatio")
-            nominalCumRatio.SetDirectory(0)
-            nominalCumRatio.Divide(nominalCum)
-
-            upCum = CreateCumulativePlot(upHist)
-            upCum.SetDirectory(0)
-
-            upCumRatio = upCum.Clone("upCumRatio")
-            upCumRatio.SetDirectory(0)
-            upCumRatio.Divide(nominalCum)
-
-            downCum = CreateCumulativePlot(downHist)
-            downCum.SetDirectory(0)
-
-            downCumRatio = downCum.Clone("downCumRatio")
-            downCumRatio.SetDirectory(0)
-            downCumRatio.Divide(nominalCum)
-
-
-            #nominalRatio.Rebin(10)
-            nominalRatio.Divide(nominalHist)
-
-            nominalRatio.SetLineColor(1)
-            nominalRatio.SetLineWidth(2)
-
-            #upRatio = upHist.Clone("upHistRatio")
-            #upRatio.SetDirectory(0)
-            #upRatio.Rebin(10)
-            #upRatio.Divide(nominalHist)
-
-            if (IsCorr):
-                upRatio = CalculateErrorOfRatioHistFullyCorelated(upCum, nominalCum)
-            else:
-                upRatio = CalculateErrorOfRatioHist(upCum, nominalCum)
-            upRatio.SetDirectory(0)
-
-            upRatio.SetLineColor(2)
-            upRatio.SetLineWidth(2)
-
-            # downRatio = downHist.Clone("downHistRatio")
-            # downRatio.SetDirectory(0)
-            # #downRatio.Rebin(10)
-            # downRatio.Divide(nominalHist)
-
-            if (IsCorr):
-                downRatio = CalculateErrorOfRatioHistFullyCorelated(downCum, nominalCum)
-            else:
-                downRatio = CalculateErrorOfRatioHist(downCum, nominalCum)
-
-            downRatio.SetDirectory(0)
-
-            downRatio.SetLineColor(4)
-            downRatio.SetLineWidth(2)
-
-            self.sysHists = [upRatio, nominalRatio, downRatio]
-            #self.sysHists = [nominalRatio]
-
-        if (len(self.hists)==2):
-            print(len(self.hists))
-            nominalHist = self.hists[0]
-            upHist      = self.hists[1]
-
-            nominalHist.SetDirectory(0)
-            upHist.SetDirectory(0)
-
-            #nominalHist.Rebin(10)
-            #upHist.Rebin(10)
-
-            nominalRatio = nominalHist.Clone("nominalHistRatio")
-            nominalRatio.SetDirectory(0)
-            #nominalRatio.Rebin(10)
-            nominalRatio.Divide(nominalHist)
-
-            nominalRatio.SetLineColor(1)
-            nominalRatio.SetLineWidth(2)
-
-            upRatio = upHist.Clone("upHistRatio")
-            upRatio.SetDirectory(0)
-            #upRatio.Rebin(10)
-            upRatio.Divide(nominalHist)
+        self.outputPolicy.Save(c, f"{self.canvasParam[6]}Ratio")
 
-            upCum = CreateCumulativePlot(upHist)
-            upCum.SetDirectory(0)
+    def SaveCumulativeSystematicRatio(self, leg, IsCorr, IsIntToInf, sources=None):
+        """Ratios of the cumulative shifted histograms to the cumulative nominal one (see CreateSystematicHists).
+           IsIntToInf=False integrates from the first bin (Integral(1, i)); before it was ignored and
+           the histograms were always integrated to the last bin, so IsIntToInf=False plots change.
 
-            nominalCum = CreateCumulativePlot(nominalHist)
-            nominalCum.SetDirectory(0)
-
-            if (IsCorr):
-                upRatio = CalculateErrorOfRatioHistFullyCorelated(upCum, nominalCum)
-            else:
-                upRatio = CalculateErrorOfRatioHist(upCum, nominalCum)
-            upRatio.SetDirectory(0)
-
-            upRatio.SetLineColor(2)
-            upRatio.SetLineWidth(2)
-
-            self.sysHists = [upRatio, nominalRatio]
-            #self.sysHists = [nominalRatio]
+        Args:
+            leg (list): legend parameters
+            IsCorr (bool): fully correlated errors
+            IsIntToInf (bool): cumulative to the last bin (Integral(i, nBins)), otherwise from the first bin
+            sources (list): systematic source of every shifted histogram (None = every histogram is its own source)
+        """
+        self.CreateSystematicHists(IsCorr, True, IsIntToInf, sources)
 
         c = ROOT.TCanvas("c")
         c.cd()
@@ -2861,6 +5137,179 @@ class SaveCanvas:
 
         l.Draw()
         
-        c.SaveAs(f"{self.canvasParam[6]}Ratio.pdf")
-        c.SaveAs(f"{self.canvasParam[6]}Ratio.root")
+        self.outputPolicy.Save(c, f"{self.canvasParam[6]}Ratio")
+
+
+class FigureSpec:
+    """Everything needed to render one figure of the PlotService (same layout as SaveCanvas.SaveCanvas)
+    """
+    def __init__(self, hists, legendNames, outStem, xRange, xTitle="", yTitle="", legendBox=(0.6, 0.7, 0.88, 0.88), grid=False, isSim=True, showMax=False):
+        """Input arguments of the constructor
+
+        Args:
+            hists (list): TH1 objects or [fileName, histName] pairs read by the worker
+            legendNames (list): legend entry of every histogram
+            outStem (string): output file name without extension
+            xRange (list): [xMin, xMax] shown on the x axis
+            xTitle, yTitle (string): axis titles
+            legendBox (tuple): (x1, y1, x2, y2) of the legend (NDC)
+            grid (bool): draw the grid
+            isSim (bool): "NOvA Simulation" label, otherwise "NOvA Preliminary"
+            showMax (bool): add the position and value of the maximum to the axis titles
+        """
+        self.hists       = hists
+        self.legendNames = legendNames
+        self.outStem     = outStem
+        self.xRange      = xRange
+        self.xTitle      = xTitle
+        self.yTitle      = yTitle
+        self.legendBox   = legendBox
+        self.grid        = grid
+        self.isSim       = isSim
+        self.showMax     = showMax
+
+    @staticmethod
+    def FromCanvasParam(hists, canvasParam, leg, isSim):
+        """Spec from the SaveCanvas arguments (the extra lines of canvasParam[4] are not drawn)
+
+        Returns:
+            FigureSpec: figure spec
+        """
+        return FigureSpec(hists, leg[4], f"{canvasParam[6]}_Canvas", canvasParam[0], canvasParam[2], canvasParam[3],
+                          leg[0:4], leg[5] == True, isSim, canvasParam[1] == True)
+
+    def GetHists(self):
+        """Returns the histograms, [fileName, histName] pairs are read from their file
+
+        Returns:
+            list: TH1
+        """
+        hists = []
+        for hist in self.hists:
+            if (isinstance(hist, (list, tuple))):
+                f    = ROOT.TFile.Open(hist[0], "READ")
+                hist = f.Get(hist[1])
+                hist.SetDirectory(0)
+                f.Close()
+            hists.append(hist)
+        return hists
+
+class PlotService:
+    """Render many figures in batch mode. Every process sets the style and creates its canvas,
+       labels and legend once and reuses them for all the figures it renders:
+
+       .. code-block:: python
+
+            specs = [FigureSpec([[fileName, "hist"]], ["Signal"], f"plots/{name}", [0, 1], "|t| (GeV^{2})", "Events")
+                     for fileName, name in inputs]
+            PlotService(nWorkers=8).Run(specs)
+    """
+    # objects shared by the figures of one process (see InitWorker)
+    canvas  = None
+    labels  = None
+    legend  = None
+    formats = ["pdf", "root"]
+
+    def __init__(self, nWorkers=1, formats=("pdf", "root"), canvasSize=(800, 600)):
+        """Input arguments of the constructor
+
+        Args:
+            nWorkers (int): number of processes (None = number of cores, 1 = render in this process)
+            formats (list): extensions of the files saved per figure
+            canvasSize (tuple): (width, height) of the canvas in pixels
+        """
+        self.nWorkers   = nWorkers
+        self.formats    = list(formats)
+        self.canvasSize = canvasSize
 
+    @staticmethod
+    def InitWorker(formats, canvasSize):
+        """Batch mode, style, canvas, labels and legend of the process, created once
+        """
+        ROOT.gROOT.SetBatch(True)
+        ROOT.gStyle.SetPadTickX(1)
+        ROOT.gStyle.SetPadTickY(1)
+
+        PlotService.formats = formats
+        PlotService.canvas  = ROOT.TCanvas(f"plotService_{os.getpid()}", "", canvasSize[0], canvasSize[1])
+        PlotService.labels  = {}
+        for isSim, text, color in [[True, "NOvA Simulation", 921], [False, "NOvA Preliminary", 4]]:
+            prelim = ROOT.TLatex(.9, .95, text)
+            prelim.SetTextColor(color)
+            prelim.SetNDC()
+            prelim.SetTextSize(2 / 30.)
+            prelim.SetTextAlign(32)
+            PlotService.labels[isSim] = prelim
+
+        PlotService.legend = ROOT.TLegend(0.6, 0.7, 0.88, 0.88)
+        PlotService.legend.SetBorderSize(0)
+
+    @staticmethod
+    def Render(spec):
+        """Draw one figure on the canvas of the process and save it
+
+        Args:
+            spec (FigureSpec): figure spec
+
+        Returns:
+            list: saved file names
+        """
+        c = PlotService.canvas
+        c.Clear()
+        c.cd()
+        c.SetGrid(int(spec.grid), int(spec.grid))
+
+        hists = spec.GetHists()
+        for index, hist in enumerate(hists):
+            hist.GetXaxis().SetRangeUser(spec.xRange[0], spec.xRange[1])
+            hist.GetXaxis().CenterTitle(True)
+            hist.GetYaxis().CenterTitle(True)
+            hist.SetLineWidth(2)
+
+            if (spec.showMax):
+                hist.GetXaxis().SetTitle(f"{spec.xTitle} (max @ {round(hist.GetXaxis().GetBinCenter(hist.GetMaximumBin()), 3)})")
+                hist.GetYaxis().SetTitle(f"{spec.yTitle} (max @ {round(hist.GetBinContent(hist.GetMaximumBin()), 3)})")
+            else:
+                hist.GetXaxis().SetTitle(f"{spec.xTitle}")
+                hist.GetYaxis().SetTitle(f"{spec.yTitle}")
+
+            hist.SetStats(0)
+            # Clear() keeps the range of the previous figure, so "same" is only dropped on a fresh
+            # canvas: the first histogram is drawn without it to get its own frame and axes
+            option = "E2" if ("Rect" in hist.GetName()) else "hist"
+            hist.Draw(option if (index == 0) else f"{option} same")
+
+        PlotService.labels[spec.isSim].Draw()
+
+        l = PlotService.legend
+        l.Clear()
+        l.SetX1NDC(spec.legendBox[0])
+        l.SetY1NDC(spec.legendBox[1])
+        l.SetX2NDC(spec.legendBox[2])
+        l.SetY2NDC(spec.legendBox[3])
+        for hist, legName in zip(hists, spec.legendNames):
+            l.AddEntry(hist, legName, "l")
+        l.Draw()
+
+        outFiles = [f"{spec.outStem}.{fileFormat}" for fileFormat in PlotService.formats]
+        for outFile in outFiles:
+            c.SaveAs(outFile)
+        return outFiles
+
+    def Run(self, specs):
+        """Render a queue of figures
+
+        Args:
+            specs (list): FigureSpec objects (histograms given as [fileName, histName] avoid pickling them)
+
+        Returns:
+            list: saved file names of every figure, in the order of the specs
+        """
+        if (self.nWorkers == 1):
+            PlotService.InitWorker(self.formats, self.canvasSize)
+            return [PlotService.Render(spec) for spec in specs]
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.nWorkers,
+                                                    initializer=PlotService.InitWorker,
+                                                    initargs=(self.formats, self.canvasSize)) as executor:
+            return list(executor.map(PlotService.Render, specs, chunksize=max(1, len(specs)//(4*(self.nWorkers or os.cpu_count())))))
@@ -1,42 +1,23 @@
-from classes import *
 from headers import *
+from beamframe import *
 
 def CalculateTotalError(hist):
-    esq = 0
-    for i in range(0, (hist.GetNbinsX()+2)):
-        esq += pow(hist.GetBinError(i), 2)
+    errors = GetHistBinErrors(hist)
+    # cumsum adds the bins in order, like the bin loop did
+    esq    = np.cumsum(errors*errors)[-1]
 
     return sqrt(esq)
 
 
 def histToCSV(hist):
+    content = GetHistBinArrays(hist, withSumw2=False)[0].tolist()
+    errors  = GetHistBinErrors(hist).tolist()
+    bins    = ["under"] + list(range(1, hist.GetNbinsX() + 1)) + ["over"]
+
     with open(f"{hist.GetName()}.csv","w", newline='') as csvfile:
-        filednames = ['bin',
-                      'binContent',
-                      'binerror'
-                    ]
-
-        writer = csv.DictWriter(csvfile, fieldnames=filednames)
-        writer.writeheader()
-        writer.writerow({
-            'bin'        : "under",
-            'binContent' : hist.GetBinContent(0),
-            'binerror'   : hist.GetBinError(0)
-
-        })
-
-        for i in range(1, (hist.GetNbinsX() + 1)):
-            writer.writerow({
-                'bin'        : i,
-                'binContent' : hist.GetBinContent(i),
-                'binerror'   : hist.GetBinError(i)
-            })
-
-        writer.writerow({
-            'bin'        : "over",
-            'binContent' : hist.GetBinContent((hist.GetNbinsX() + 1)),
-            'binerror'   : hist.GetBinError((hist.GetNbinsX() + 1))
-        })
+        writer = csv.writer(csvfile)
+        writer.writerow(['bin', 'binContent', 'binerror'])
+        writer.writerows(zip(bins, content, errors))
 
 def GetAllEventsWithErrors(hist):
     total = 0
@@ -96,13 +77,55 @@ def ProcessFile(inputList):
     print(result.stdout)
     print(f"File: {inputList[1]} process completed successfully.!")
 
-def CreateCumulativePlot(inHist):
+# Import time allowed for the scripts (seconds), checked by MeasureImportTime
+importTimeBudget = 0.5
+
+def MeasureImportTime(moduleName="classes", budget=importTimeBudget, repeat=3):
+    """Measure the import time of one of the scripts in fresh python processes
+       (the way a short-lived worker pays it) and check it against a budget
+
+    Args:
+        moduleName (string): module to import ("headers", "functions", "classes", ...)
+        budget (double): allowed import time in seconds
+        repeat (int): number of processes, the fastest one is reported
+
+    Returns:
+        dict: "seconds" (fastest import time), "budget", "withinBudget" and
+              "loadedBackends" (heavy modules imported by the import itself)
+    """
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {moduleName}\n"
+            "print(time.perf_counter() - start)\n"
+            f"print(','.join(name for name in {heavyModules!r} if name in sys.modules))\n")
+
+    times  = []
+    loaded = []
+    for i in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if (result.returncode != 0):
+            raise RuntimeError(f"import {moduleName} failed:\n{result.stderr}")
+        seconds, backends = result.stdout.splitlines()[-2:]
+        times.append(float(seconds))
+        loaded = [name for name in backends.split(",") if name]
+
+    report = {"seconds"       : min(times)          ,
+              "budget"        : budget              ,
+              "withinBudget"  : min(times) <= budget,
+              "loadedBackends": loaded              }
+
+    status = "within" if (report["withinBudget"]) else "OVER"
+    print(f"import {moduleName}: {round(report['seconds'], 3)} s ({status} the {budget} s budget), heavy modules loaded: {loaded}")
+    return report
+
+def CreateCumulativePlot(inHist, isIntToInf=True):
     hist = ROOT.TH1D(f"{inHist.GetName()}_cum","", inHist.GetNbinsX(), inHist.GetXaxis().GetXmin(), inHist.GetXaxis().GetXmax() )
     hist.SetDirectory(0)
-    total = 0
-    for i in range(1, inHist.GetNbinsX() + 1):
-        total = inHist.Integral(i, inHist.GetNbinsX())
-        hist.SetBinContent(i, total)
+    # bin i = inHist.Integral(i, nBins) (Integral(1, i) if not isIntToInf), entries as after nBins SetBinContent calls
+    content  = GetHistBinArrays(inHist, withSumw2=False)[0]
+    Cumulate = ReverseCumulativeSum if (isIntToInf) else ForwardCumulativeSum
+    SetHistBinArrays(hist, Cumulate(content), None, inHist.GetNbinsX())
 
     return hist
 
@@ -158,48 +181,154 @@ def SelectProngMuonCandidate(prongs):
             muonCand = prong
     return muonCand
 
+def SelectProngMuonCandidateArrays(offsets, muonID, length):
+    """Array version of SelectProngMuonCandidate for all events at once. The prongs are
+       processed position by position (vectorized over the events), so the running
+       MuonID/length comparisons and their tie-breaking are the same as in the prong loop.
+
+    Args:
+        offsets (numpy array): prongs of event i are flat[offsets[i]:offsets[i + 1]]
+        muonID (numpy array): flat prong MuonID
+        length (numpy array): flat prong length
+
+    Returns:
+        numpy array: flat index of the muon candidate prong of every event, -1 if there is none
+    """
+    offsets  = np.asarray(offsets, dtype=np.int64)
+    muonID   = np.asarray(muonID)
+    length   = np.asarray(length)
+    nEvents  = len(offsets) - 1
+    counts   = np.diff(offsets)
+
+    bestID   = np.full(nEvents, -1.0)
+    bestLen  = np.full(nEvents, -1.0)
+    muonCand = np.full(nEvents, -1, dtype=np.int64)
+
+    events = np.arange(nEvents)
+    for position in range(int(counts.max()) if (nEvents > 0) else 0):
+        # events that still have a prong at this position
+        events   = events[counts[events] > position]
+        index    = offsets[events] + position
+        prongID  = muonID[index]
+        prongLen = length[index]
+
+        higherID = prongID > bestID[events]
+        longer   = (~higherID) & (prongLen >= 500) & (prongLen > bestLen[events])
+
+        update = higherID | longer
+        bestID  [events[update]] = prongID[update]
+        bestLen [events[longer]] = prongLen[longer]
+        muonCand[events[update]] = index[update]
+
+    return muonCand
+
 
 def AverageBeamDirection():
-    dir = ROOT.TVector3(0.0011401229, -0.061901052, 0.99807253)
-    return dir.Unit()
+    # copy of the unit vector precomputed by the beam frame
+    return GetBeamFrame().GetDirection()
+
+# Energy estimator calibrations: polynomial coefficients in increasing order
+# (c0 + c1*x + c2*x^2 + ..., numpy.polynomial convention) and whether the estimator
+# returns 0 for inputs <= 0
+defaultEnergyEstimators = {
+    "MuonEnergyEstimator": {"coefficients": [0.0201737, 0.00206646],
+                            "positiveOnly": False},
+    # previous calibration: [0.220848, -1.62171, 1.7838, 83.802, -455.285,
+    #                        1046.78, -1162.29, 501.243, 79.3445, -93.2052]
+    "PionEEst"           : {"coefficients": [0.348592, -5.98497, 54.545, -207.531, 361.683,
+                                             -41.3106, -941.125, 1647.79, -1210.14, 343.351],
+                            "positiveOnly": False},
+    "MuonEAct"           : {"coefficients": [1.67012e-01, 1.79305e-01, 3.74708e-03, -1.54232e-04],
+                            "positiveOnly": True},
+    "MuonECat"           : {"coefficients": [1.31325e-01, 5.35146e-01],
+                            "positiveOnly": True},
+    "MuonEActandCat"     : {"coefficients": [1.21130e-02, 1.97903e-01, 7.82459e-04],
+                            "positiveOnly": True},
+    "VisibleHadE"        : {"coefficients": [5.85254e-02, 1.27796e+00, 3.75457e-01, -5.45618e-01, 1.65975e-01],
+                            "positiveOnly": False}
+}
+
+energyEstimators = {name: {"coefficients": list(settings["coefficients"]),
+                           "positiveOnly": settings["positiveOnly"]}
+                    for name, settings in defaultEnergyEstimators.items()}
+
+def EvaluatePolynomial(coefficients, x):
+    """Evaluate c0 + c1*x + ... + cn*x^n with Horner's scheme
+
+    Args:
+        coefficients (list): coefficients in increasing order
+        x (double, numpy array): variable
+
+    Returns:
+        double, numpy array: polynomial value(s)
+    """
+    value = coefficients[-1]
+    for c in reversed(coefficients[:-1]):
+        value = value*x + c
+    return value
+
+def EvaluateEnergyEstimator(name, x):
+    """Evaluate a registered energy estimator on a scalar or a numpy array
+
+    Args:
+        name (str): estimator name (key of energyEstimators)
+        x (double, numpy array): estimator input (track length, calorimetric energy, ...)
+
+    Returns:
+        double, numpy array: estimated energy (0 for inputs <= 0 if the estimator is positive only)
+    """
+    estimator = energyEstimators[name]
+    if (np.ndim(x) == 0):
+        if (estimator["positiveOnly"] and x <= 0.0):
+            return 0.0
+        return EvaluatePolynomial(estimator["coefficients"], x)
+
+    x     = np.asarray(x, dtype=np.float64)
+    value = EvaluatePolynomial(estimator["coefficients"], x)
+    if (estimator["positiveOnly"]):
+        value = np.where(x <= 0.0, 0.0, value)
+    return value
+
+def GetEnergyEstimatorCoefficients(name):
+    return list(energyEstimators[name]["coefficients"])
+
+def SetEnergyEstimatorCoefficients(name, coefficients):
+    """Replace the calibration coefficients of a registered estimator
+
+    Args:
+        name (str): estimator name (key of energyEstimators)
+        coefficients (list): coefficients in increasing order
+    """
+    if (name not in energyEstimators):
+        raise KeyError(f"Unknown energy estimator {name}, known: {list(energyEstimators)}")
+    if (len(coefficients) == 0):
+        raise ValueError(f"No coefficients given for energy estimator {name}")
+    energyEstimators[name]["coefficients"] = [float(c) for c in coefficients]
+
+def LoadEnergyEstimatorCoefficients(fileName):
+    """Load alternate calibration coefficients (e.g. an energy-scale systematic) from a JSON file
+       of the form {"PionEEst": [c0, c1, ...], "MuonEAct": {"coefficients": [...]}, ...}.
+       Estimators that are not in the file keep their current coefficients.
+
+    Args:
+        fileName (str): JSON file name
+    """
+    with open(fileName) as jsonFile:
+        calibrations = json.load(jsonFile)
+
+    for name, settings in calibrations.items():
+        coefficients = settings["coefficients"] if isinstance(settings, dict) else settings
+        SetEnergyEstimatorCoefficients(name, coefficients)
+
+def ResetEnergyEstimatorCoefficients():
+    for name, settings in defaultEnergyEstimators.items():
+        energyEstimators[name]["coefficients"] = list(settings["coefficients"])
 
 def MuonEnergyEstimator(muonLen):
-    return (0.00206646*muonLen + 0.0201737)
+    return EvaluateEnergyEstimator("MuonEnergyEstimator", muonLen)
 
 def PionEEst(calE):
-    #p0 =    0.220848   
-    #p1 =    -1.62171    
-    #p2 =      1.7838    
-    #p3 =      83.802    
-    #p4 =    -455.285    
-    #p5 =     1046.78    
-    #p6 =    -1162.29    
-    #p7 =     501.243    
-    #p8 =     79.3445    
-    #p9 =    -93.2052
-
-
-    p0 =     0.348592    
-    p1 =     -5.98497    
-    p2 =       54.545    
-    p3 =     -207.531    
-    p4 =      361.683    
-    p5 =     -41.3106    
-    p6 =     -941.125    
-    p7 =      1647.79    
-    p8 =     -1210.14    
-    p9 =      343.351    
-    
-    return (p0              +
-            p1*calE         +
-            p2*pow(calE, 2) +
-            p3*pow(calE, 3) +
-            p4*pow(calE, 4) +
-            p5*pow(calE, 5) +
-            p6*pow(calE, 6) +
-            p7*pow(calE, 7) +
-            p8*pow(calE, 8) +
-            p9*pow(calE, 9))
+    return EvaluateEnergyEstimator("PionEEst", calE)
 
 def CalculateRecoT(muonInfo, pionInfo):
     if(pionInfo[0] >= 0 and muonInfo[0] >= 0):
@@ -387,39 +516,13 @@ def TrkLenCat(MuonInfo):
     return -1000.0
 
 def MuonEAct(TrackLenAct):
-    p0    =  1.67012e-01
-    p1    =  1.79305e-01
-    p2    =  3.74708e-03
-    p3    = -1.54232e-04
-    MuonE =  0.0
-
-    if (TrackLenAct <= 0.0): 
-        return 0.0
-    MuonE = p0 + p1 * TrackLenAct + p2 * pow(TrackLenAct, 2) + p3 * pow(TrackLenAct, 3)
-    return MuonE
+    return EvaluateEnergyEstimator("MuonEAct", TrackLenAct)
 
 def MuonECat(trklencat):
-    offset  =  1.31325e-01
-    slope   =  5.35146e-01
-    MuonE   =  0.0
-
-    if (trklencat <= 0.0): 
-        return 0.0
-
-    MuonE = slope*trklencat + offset
-    return MuonE
+    return EvaluateEnergyEstimator("MuonECat", trklencat)
 
 def MuonEActandCat(trklenactandcat):
-    p0   =  1.21130e-02
-    p1   =  1.97903e-01
-    p2   =  7.82459e-04
-    MuonE = 0.0
-
-    if (trklenactandcat <= 0.0):
-        return 0.0
-
-    MuonE = p0 + p1 * trklenactandcat + p2 * pow(trklenactandcat, 2)
-    return MuonE
+    return EvaluateEnergyEstimator("MuonEActandCat", trklenactandcat)
 
 def CalculateMuonEUsingKalmanTracks(muonInfo):
     muonE          = 0.0
@@ -447,17 +550,7 @@ def CalculateMuonEUsingKalmanTracks(muonInfo):
     return ( muonE + muonEact )/(1 - 7.65237e-4 )
 
 def VisibleHadE(vishadE):
-    p0    =   5.85254e-02
-    p1    =   1.27796e+00
-    p2    =   3.75457e-01
-    p3    =  -5.45618e-01
-    p4    =   1.65975e-01
-    HadE  =   0.0
-
-    HadE = p0 + (p1 * vishadE) + p2 * pow(vishadE, 2) + p3 * pow(vishadE, 3) + p4 * pow(vishadE, 4)
-    return HadE
-
-
+    return EvaluateEnergyEstimator("VisibleHadE", vishadE)
 
 def CalculatePionEUsingKalmanTracks(pionInfo):
     # if (pionInfo.GetNTracks() == 2):
@@ -677,9 +770,37 @@ def CalculateRecoTUsingKalmanTracks(muonKalmanInfo, pionKalmanInfo):
 def CalculateErrorOfTheBin(BinContent):
     return sqrt(BinContent)
 
+def RatioWithErrorArrays(numContent, denomContent):
+    """Bin arrays of CalculateErrorOfRatioHist: num/denom where denom is non zero (0 otherwise),
+       error sqrt(1/num + 1/denom)*ratio where both are non zero (0 otherwise)
+
+    Args:
+        numContent (numpy array): numerator bin contents
+        denomContent (numpy array): denominator bin contents
+
+    Returns:
+        list: [ratio, errors, both] where both marks the bins with both contents non zero
+    """
+    content = np.zeros(len(numContent))
+    errors  = np.zeros(len(numContent))
+
+    nonZero          = denomContent != 0
+    content[nonZero] = numContent[nonZero]/denomContent[nonZero]
+
+    both  = (numContent != 0) & (denomContent != 0)
+    ratio = numContent[both]/denomContent[both]
+    error = CheckedSqrt((1/numContent[both]) + (1/denomContent[both]))*ratio
+
+    content[both] = ratio
+    errors [both] = error
+
+    return [content, errors, both]
+
 def CalculateErrorOfRatioHist(numHist, denomHist):
     """
     This function creates the ratio histogram of the two histograms provided.
+    Bins where numerator and denominator are both non zero get the ratio with error
+    sqrt(1/num + 1/denom)*ratio, every other bin keeps the TH1::Divide content with 0 error.
     
     Args:
         numHist   ([TH1]): [Histogram that goes to numerator]
@@ -689,54 +810,29 @@ def CalculateErrorOfRatioHist(numHist, denomHist):
     hist.SetDirectory(0)
     hist.Divide(denomHist)
 
-    for i in (range(0, hist.GetNbinsX()+2)):
-        numBinContent   = numHist.  GetBinContent(i)
-        denomBinContent = denomHist.GetBinContent(i)
-
-        # numBinError   = sqrt(numBinContent)
-        # denomBinError = sqrt(denomBinContent)
-
-        if (denomBinContent != 0 and numBinContent != 0):
-            ratioBinContent = numBinContent/denomBinContent
-            ratioBinError   = sqrt(((1/numBinContent) + (1/denomBinContent)))*ratioBinContent
-
-            hist.SetBinContent(i, ratioBinContent)
-            hist.SetBinError(i, ratioBinError)
-
-        elif (numBinContent != 0 and denomBinContent == 0):
-            # ratioBinContent = hist.GetBinContent(i)
-            # ratioBinError   = sqrt( pow(((numBinError)/numBinContent)    , 2) +
-            #                         0
-            #                     )*ratioBinContent
+    numContent   = GetHistBinArrays(numHist  , withSumw2=False)[0]
+    denomContent = GetHistBinArrays(denomHist, withSumw2=False)[0]
+    content      = GetHistBinArrays(hist     , withSumw2=False)[0]
 
-            hist.SetBinError(i, 0)
-
-        elif (numBinContent == 0 and denomBinContent != 0):
-            # ratioBinContent = hist.GetBinContent(i)
-            # ratioBinError   = sqrt( 0 +
-            #                         pow(((denomBinError)/denomBinContent), 2)
-            #                     )*ratioBinContent
-
-            hist.SetBinError(i, 0)
-
-        elif (numBinContent == 0 and denomBinContent == 0):
-            hist.SetBinError(i, 0)
+    ratio, errors, both = RatioWithErrorArrays(numContent, denomContent)
+    content[both] = ratio[both]
 
+    # one SetBinContent per bin with both contents non zero
+    entries = hist.GetEntries() + np.count_nonzero(both)
+    SetHistBinArrays(hist, content, errors*errors, entries)
 
     return hist
 
 def CalculateStatisticalErrorBinByBin(hist):
-    for i in (range(1, hist.GetNbinsX() + 1)):
-        binVal = hist.GetBinContent(i)
-        binError = sqrt(binVal)
-        hist.SetBinError(i, binError)
+    content = GetHistBinArrays(hist, withSumw2=False)[0]
+    nBins   = hist.GetNbinsX()
+    errors  = np.zeros(len(content))
+    errors[1:nBins + 1] = CheckedSqrt(content[1:nBins + 1])
+    SetHistBinErrors(hist, errors, 1, nBins)
     return hist
 
 def CalculateStatErrorBinByBin(hist):
-    for i in (range(1, hist.GetNbinsX() + 1)):
-        binVal = hist.GetBinContent(i)
-        binError = sqrt(binVal)
-        hist.SetBinError(i, binError)
+    CalculateStatisticalErrorBinByBin(hist)
 
 def CalculateStatisticalErrorOfSumOfHist(hist1, hist2):
     """Generate sum of Two Hists with errors.
@@ -756,13 +852,15 @@ def CalculateStatisticalErrorOfSumOfHist(hist1, hist2):
     else:
         total = hist1.Clone("total")
         total.SetDirectory(0)
-        for i in range(1, (nBins1 + 1)):
-            bin1 = hist1.GetBinContent(i)
-            bin2 = hist2.GetBinContent(i)
-            error1 = hist1.GetBinError(i)
-            error2 = hist2.GetBinError(i)
-            total.SetBinContent(i, (bin1 + bin2))
-            total.SetBinError(i, sqrt(pow(error1, 2) + pow(error2, 2)))
+
+        content = GetHistBinArrays(hist1, withSumw2=False)[0]
+        content[1:nBins1 + 1] += GetHistBinArrays(hist2, withSumw2=False)[0][1:nBins1 + 1]
+        error1  = GetHistBinErrors(hist1)
+        error2  = GetHistBinErrors(hist2)
+
+        # one SetBinContent per bin
+        SetHistBinArrays(total, content, None, total.GetEntries() + nBins1)
+        SetHistBinErrors(total, np.sqrt(error1*error1 + error2*error2), 1, nBins1)
 
         return total
 
@@ -782,46 +880,33 @@ def CalculateErrorOfRatioHistFullyCorelated(numHist, denomHist):
     hist.SetDirectory(0)
     #hist.Divide(denomHist)
 
-    for i in (range(1, hist.GetNbinsX()+1)):
-        numBinContent   = numHist.  GetBinContent(i)
-        denomBinContent = denomHist.GetBinContent(i)
-
-        numBinError   = 0
-        denomBinError = denomHist.GetBinError(i)
-        
-
-        if (denomBinContent != 0 and numBinContent != 0):
-            #ratioBinContent = hist.GetBinContent(i)
-            ratioBinContent = numBinContent/denomBinContent
-            ratioBinError   = sqrt( pow(((numBinError)/numBinContent)    , 2) +
-                                    pow(((denomBinError)/denomBinContent), 2)
-                                )*ratioBinContent
-
-            hist.SetBinContent(i, ratioBinContent)
-            hist.SetBinError(i, ratioBinError)
-
-        elif (numBinContent != 0 and denomBinContent == 0):
-            ratioBinContent = hist.GetBinContent(i)
-            ratioBinError   = sqrt( pow(((numBinError)/numBinContent)    , 2) +
-                                    0
-                                )*ratioBinContent
-
-            hist.SetBinContent(i, 0)
-            hist.SetBinError(i, ratioBinError)
-
-        elif (numBinContent == 0 and denomBinContent != 0):
-            ratioBinContent = hist.GetBinContent(i)
-            ratioBinError   = sqrt( 0 +
-                                    pow(((denomBinError)/denomBinContent), 2)
-                                )*ratioBinContent
-
-            hist.SetBinContent(i, ratioBinContent)
-            hist.SetBinError(i, ratioBinError)
-
-        elif (numBinContent == 0 and denomBinContent == 0):
-            hist.SetBinContent(i, 0)
-            hist.SetBinError(i, 0)
-
+    nBins         = hist.GetNbinsX()
+    numContent    = GetHistBinArrays(numHist  , withSumw2=False)[0]
+    denomContent  = GetHistBinArrays(denomHist, withSumw2=False)[0]
+    denomBinError = GetHistBinErrors(denomHist)
+    content       = GetHistBinArrays(hist, withSumw2=False)[0]
+    errors        = np.zeros(len(content))
+
+    inRange = np.zeros(len(content), dtype=bool)
+    inRange[1:nBins + 1] = True
+    both      = inRange & (numContent != 0) & (denomContent != 0)
+    numOnly   = inRange & (numContent != 0) & (denomContent == 0)
+    denomOnly = inRange & (numContent == 0) & (denomContent != 0)
+    neither   = inRange & (numContent == 0) & (denomContent == 0)
+
+    # the numerator error is 0 (fully correlated), so only the relative denominator error is left
+    ratio         = numContent[both]/denomContent[both]
+    content[both] = ratio
+    errors [both] = np.sqrt(np.power(denomBinError[both]/denomContent[both], 2))*ratio
+
+    # numerator only: content 0, error 0*num; denominator only: content (0) and error (0) unchanged
+    content[numOnly]   = 0
+    errors [denomOnly] = np.sqrt(np.power(denomBinError[denomOnly]/denomContent[denomOnly], 2))*content[denomOnly]
+    content[neither]   = 0
+
+    # one SetBinContent per bin
+    SetHistBinArrays(hist, content, None, hist.GetEntries() + nBins)
+    SetHistBinErrors(hist, errors, 1, nBins)
 
     return hist
 
@@ -851,11 +936,11 @@ def GetCumulativeHistWithErrors(inHist):
 
     hist = ROOT.TH1D(f"{inHist.GetName()}_cum","", inHist.GetNbinsX(), inHist.GetXaxis().GetXmin(), inHist.GetXaxis().GetXmax() )
     hist.SetDirectory(0)
-    total = 0
-    for i in range(1, inHist.GetNbinsX() + 1):
-        total = inHist.Integral(i, inHist.GetNbinsX())
-        hist.SetBinContent(i, total)
-        hist.SetBinError(i, sqrt(total))
+    cumulative = ReverseCumulativeSum(GetHistBinArrays(inHist, withSumw2=False)[0])
+
+    # SetBinError stores error*error, hence the squared square root
+    errors = CheckedSqrt(cumulative)
+    SetHistBinArrays(hist, cumulative, errors*errors, inHist.GetNbinsX())
 
     return hist
 
@@ -869,3 +954,940 @@ def GetCumulativeHistWithErrors(inHist):
     
 
 
+def ReadTreeColumns(fileName, treeName, branches, entryStart=None, entryStop=None):
+    """Read the requested TTree branches in bulk with uproot
+
+    Args:
+        fileName (string): Input file name and location
+        treeName (string): Name of the TTree inside the file
+        branches (list): Names of the branches to read
+        entryStart (int): First entry to read (None = first entry of the tree)
+        entryStop (int): Entry after the last one to read (None = end of the tree)
+
+    Returns:
+        dict: branch name -> numpy float64 array
+    """
+    with uproot.open(fileName) as f:
+        arrays = f[treeName].arrays(branches, entry_start=entryStart, entry_stop=entryStop, library="np")
+
+    # PyROOT hands every branch value to python as a double, so the cuts
+    # are evaluated in double precision to make exactly the same decisions.
+    return {branch: np.asarray(arrays[branch], dtype=np.float64) for branch in branches}
+
+def GetTreeNumEntries(fileName, treeName):
+    """Number of entries of a TTree read with uproot
+
+    Args:
+        fileName (string): Input file name and location
+        treeName (string): Name of the TTree inside the file
+
+    Returns:
+        int: number of entries
+    """
+    with uproot.open(fileName) as f:
+        return int(f[treeName].num_entries)
+
+def GetTreeFileAndPath(tree):
+    """File name and path inside the file of a TTree, to read it again with ReadTreeColumns
+
+    Args:
+        tree (TTree): tree read from a file
+
+    Returns:
+        list: [fileName, treePath], None for a TChain (many files) or a tree that is not in a file
+    """
+    if (tree.InheritsFrom("TChain")):
+        return None
+
+    directory = tree.GetDirectory()
+    if ((not directory) or (not directory.GetFile())):
+        return None
+
+    # GetPath is fileName:/dir/subdir, the tree can be in a subdirectory of the file
+    dirPath = directory.GetPath().split(":/", 1)[1]
+    return [directory.GetFile().GetName(), f"{dirPath}/{tree.GetName()}".lstrip("/")]
+
+def EntryRanges(nEntries, chunkSize):
+    """Split the entries of a TTree into consecutive [entryStart, entryStop) chunks
+
+    Args:
+        nEntries (int): number of entries
+        chunkSize (int): number of entries per chunk
+
+    Returns:
+        list: list of [entryStart, entryStop]
+    """
+    if (chunkSize <= 0):
+        raise ValueError(f"chunkSize must be positive, got {chunkSize}")
+    return [[start, min(start + chunkSize, nEntries)] for start in range(0, nEntries, chunkSize)]
+
+def FindBinArray(values, nBins, xMin, xMax):
+    """Array version of TAxis::FindBin for a fixed bin width axis
+
+    Args:
+        values (numpy array): values
+        nBins (int): number of bins
+        xMin (double): lower edge of the first bin
+        xMax (double): upper edge of the last bin
+
+    Returns:
+        numpy array: bin index of every value (0 = underflow, nBins + 1 = overflow)
+    """
+    values  = np.asarray(values, dtype=np.float64)
+    inRange = (values >= xMin) & (values < xMax)
+
+    bins                = np.full(values.shape, nBins + 1, dtype=np.int64)
+    bins[values < xMin] = 0
+
+    # TAxis::FindFixBin moves values that the division puts in a neighbouring bin
+    # back into the bin whose GetBinLowEdge/GetBinUpEdge contain them
+    inside   = values[inRange]
+    binWidth = (xMax - xMin)/nBins
+    found    = 1 + (nBins*(inside - xMin)/(xMax - xMin)).astype(np.int64)
+    found    = np.where(inside <  xMin + (found - 1)*binWidth, found - 1,
+               np.where(inside >= xMin + found*binWidth      , found + 1, found))
+    bins[inRange] = found
+    return bins
+
+def FillBinArrays(values, weights, nBins, xMin, xMax):
+    """Fill the bin arrays of a fixed bin width TH1 from column arrays.
+       Bin indices use the same arithmetic as TAxis::FindBin, so entries sitting
+       on a bin edge or on xMax end up in the same bin as with TH1::Fill.
+
+    Args:
+        values (numpy array): values to fill
+        weights (numpy array): weight of each value (None = unweighted)
+        nBins (int): number of bins
+        xMin (double): lower edge of the first bin
+        xMax (double): upper edge of the last bin
+
+    Returns:
+        list: [content, sumw2] arrays of length nBins + 2 (0 = underflow, nBins + 1 = overflow),
+              sumw2 is None for unweighted fills
+    """
+    bins = FindBinArray(values, nBins, xMin, xMax)
+
+    if (weights is None):
+        content = np.bincount(bins, minlength=(nBins + 2)).astype(np.float64)
+        return [content, None]
+
+    weights = np.asarray(weights, dtype=np.float64)
+    content = np.bincount(bins, weights=weights, minlength=(nBins + 2))
+    sumw2   = np.bincount(bins, weights=(weights*weights), minlength=(nBins + 2))
+    return [content, sumw2]
+
+def FillUniverseBinArrays(values, weights, nBins, xMin, xMax):
+    """Fill the bin arrays of N systematic universes sharing the same values in one pass.
+       Row u is what FillBinArrays(values, weights[u], nBins, xMin, xMax) gives.
+
+    Args:
+        values (numpy array): values to fill
+        weights (2D numpy array): (nUniverses, nValues) weight of each value in each universe
+        nBins (int): number of bins
+        xMin (double): lower edge of the first bin
+        xMax (double): upper edge of the last bin
+
+    Returns:
+        list: [content, sumw2] arrays of shape (nUniverses, nBins + 2)
+    """
+    weights    = np.asarray(weights, dtype=np.float64)
+    nUniverses = weights.shape[0]
+    nCells     = nBins + 2
+
+    # universe u, bin b -> cell u*nCells + b of one flat bincount
+    cells   = (np.arange(nUniverses, dtype=np.int64)[:, None]*nCells + FindBinArray(values, nBins, xMin, xMax)[None, :]).ravel()
+    content = np.bincount(cells, weights=weights.ravel(), minlength=(nUniverses*nCells))
+    sumw2   = np.bincount(cells, weights=(weights*weights).ravel(), minlength=(nUniverses*nCells))
+    return [content.reshape(nUniverses, nCells), sumw2.reshape(nUniverses, nCells)]
+
+def SetHistBinArrays(hist, content, sumw2=None, entries=None):
+    """Write bin arrays (including under/overflow) into a TH1 in one go
+
+    Args:
+        hist (TH1): histogram to update
+        content (numpy array): bin contents, length nBins + 2
+        sumw2 (numpy array): sum of squared weights, length nBins + 2 (None = keep current errors)
+        entries (double): number of entries to set (None = leave as set by TH1::SetContent)
+    """
+    hist.SetContent(np.ascontiguousarray(content, dtype=np.float64))
+
+    if (sumw2 is not None):
+        if (hist.GetSumw2N() == 0):
+            hist.Sumw2()
+        hist.GetSumw2().Set(len(sumw2), np.ascontiguousarray(sumw2, dtype=np.float64))
+
+    if (entries is not None):
+        hist.SetEntries(entries)
+
+# numpy type of the bin content array of the histogram classes that can be viewed without copying bin by bin
+histArrayTypes = {"TH1D": np.float64,
+                  "TH1F": np.float32}
+
+def GetHistBinArrays(hist, withSumw2=True):
+    """Read the bin arrays (including under/overflow) of a TH1. TH1D/TH1F arrays are read
+       through a buffer view of the C++ array, other classes bin by bin.
+
+    Args:
+        hist (TH1): histogram
+        withSumw2 (bool): also read the sum of squared weights
+
+    Returns:
+        list: [content, sumw2] numpy arrays of length nBins + 2 (sumw2 = None if Sumw2 is off or not requested)
+    """
+    nCells  = hist.GetNcells()
+    content = None
+    if (hist.ClassName() in histArrayTypes):
+        try:
+            content = np.frombuffer(hist.GetArray(), dtype=histArrayTypes[hist.ClassName()], count=nCells).astype(np.float64)
+        except (TypeError, ValueError):
+            content = None
+    if (content is None):
+        content = np.fromiter((hist.GetBinContent(i) for i in range(nCells)), dtype=np.float64, count=nCells)
+
+    sumw2 = None
+    if (withSumw2 and (hist.GetSumw2N() > 0)):
+        sumw2Array = hist.GetSumw2()
+        try:
+            sumw2 = np.frombuffer(sumw2Array.GetArray(), dtype=np.float64, count=nCells).copy()
+        except (TypeError, ValueError):
+            sumw2 = np.fromiter((sumw2Array.At(i) for i in range(nCells)), dtype=np.float64, count=nCells)
+    return [content, sumw2]
+
+def GetHistBinErrors(hist):
+    """Bin errors (including under/overflow) of a TH1, same values as hist.GetBinError(i)
+
+    Args:
+        hist (TH1): histogram
+
+    Returns:
+        numpy array: bin errors, length nBins + 2
+    """
+    if (hist.GetBinErrorOption() != ROOT.TH1.kNormal):
+        # asymmetric (Poisson) errors are only available bin by bin
+        return np.fromiter((hist.GetBinError(i) for i in range(hist.GetNcells())), dtype=np.float64, count=hist.GetNcells())
+
+    content, sumw2 = GetHistBinArrays(hist)
+    if (sumw2 is None):
+        return np.sqrt(np.abs(content))
+    return np.sqrt(sumw2)
+
+def GetHistBinEdges(hist):
+    """Bin edges of the x axis, same values as GetBinLowEdge/GetBinUpEdge
+
+    Args:
+        hist (TH1): histogram
+
+    Returns:
+        numpy array: edges, length nBins + 1
+    """
+    axis  = hist.GetXaxis()
+    nBins = axis.GetNbins()
+    if (axis.GetXbins().GetSize() > 0):
+        # variable bin widths
+        return np.fromiter((axis.GetBinLowEdge(i) for i in range(1, nBins + 2)), dtype=np.float64, count=nBins + 1)
+
+    xMin = axis.GetXmin()
+    return xMin + np.arange(nBins + 1)*((axis.GetXmax() - xMin)/nBins)
+
+# columns of the tables written by ExportHists
+histTableColumns = ["name", "bin", "lowEdge", "upEdge", "content", "error"]
+
+def HistTable(hists, names=None):
+    """Bin arrays of many histograms as one columnar table with one row per bin.
+       Bin 0 (underflow) and nBins + 1 (overflow) have -inf/+inf as outer edge.
+
+    Args:
+        hists (list): TH1 histograms
+        names (list): name of every histogram in the table (None = hist.GetName())
+
+    Returns:
+        dict: column name (histTableColumns) -> numpy array
+    """
+    if (names is None):
+        names = [hist.GetName() for hist in hists]
+
+    table = {column: [] for column in histTableColumns}
+    for name, hist in zip(names, hists):
+        if (hist.GetDimension() != 1):
+            # the table has one x axis, the cells of a TH2/TH3 would be written as meaningless 1D bins
+            raise ValueError(f"HistTable only takes 1D histograms, {hist.GetName()} has {hist.GetDimension()} dimensions")
+        edges = GetHistBinEdges(hist)
+        nBins = len(edges) - 1
+
+        table["name"   ].append(np.full(nBins + 2, name, dtype=object))
+        table["bin"    ].append(np.arange(nBins + 2))
+        table["lowEdge"].append(np.concatenate([[-np.inf], edges]))
+        table["upEdge" ].append(np.concatenate([edges, [np.inf]]))
+        table["content"].append(GetHistBinArrays(hist, withSumw2=False)[0])
+        table["error"  ].append(GetHistBinErrors(hist))
+
+    return {column: (np.concatenate(arrays) if (arrays) else np.zeros(0)) for column, arrays in table.items()}
+
+def ExportHists(hists, fileName, fileFormat=None, names=None):
+    """Write many histograms into a single table file (see HistTable).
+       Parquet and Feather need pyarrow, which is only imported for these formats.
+
+    Args:
+        hists (list): TH1 histograms
+        fileName (string): output file name
+        fileFormat (string): "csv", "parquet" or "feather" (None = from the file extension)
+        names (list): name of every histogram in the table (None = hist.GetName())
+    """
+    if (fileFormat is None):
+        fileFormat = os.path.splitext(fileName)[1].lstrip(".").lower()
+
+    table = HistTable(hists, names)
+
+    if (fileFormat == "csv"):
+        with open(fileName, "w", newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(histTableColumns)
+            writer.writerows(zip(*[table[column].tolist() for column in histTableColumns]))
+
+    elif (fileFormat in ["parquet", "feather"]):
+        try:
+            import pyarrow
+            if (fileFormat == "parquet"):
+                import pyarrow.parquet as arrowFile
+            else:
+                import pyarrow.feather as arrowFile
+        except ImportError as error:
+            raise ImportError(f"pyarrow is needed to write {fileFormat} files (pip install pyarrow)") from error
+
+        arrowTable = pyarrow.table({column: (table[column].astype(str) if (column == "name") else table[column])
+                                    for column in histTableColumns})
+        if (fileFormat == "parquet"):
+            arrowFile.write_table(arrowTable, fileName)
+        else:
+            arrowFile.write_feather(arrowTable, fileName)
+
+    else:
+        raise ValueError(f"Unknown histogram table format {fileFormat}, use csv, parquet or feather")
+
+    print(f"Successfully exported {len(hists)} histograms to {fileName}")
+
+def SetHistBinErrors(hist, errors, first=0, last=None):
+    """Bulk version of hist.SetBinError(i, errors[i]) for the bins first..last,
+       the sum of squared weights of the other bins is left as SetBinError would leave it
+
+    Args:
+        hist (TH1): histogram to update
+        errors (numpy array): bin errors including under/overflow, length nBins + 2
+        first (int): first bin to set
+        last (int): last bin to set (None = overflow bin)
+    """
+    if (last is None):
+        last = hist.GetNcells() - 1
+    if (hist.GetSumw2N() == 0):
+        hist.Sumw2()
+
+    sumw2                 = GetHistBinArrays(hist)[1]
+    errors                = np.asarray(errors, dtype=np.float64)
+    sumw2[first:last + 1] = errors[first:last + 1]*errors[first:last + 1]
+    hist.GetSumw2().Set(len(sumw2), sumw2)
+
+def CheckedSqrt(values):
+    """np.sqrt that fails like math.sqrt on negative values (the bin loops used math.sqrt)
+
+    Args:
+        values (numpy array): values
+
+    Returns:
+        numpy array: square roots
+    """
+    if (np.any(values < 0)):
+        raise ValueError("math domain error")
+    return np.sqrt(values)
+
+def FillHistFromColumns(hist, values, weights=None):
+    """Columnar equivalent of calling hist.Fill(value, weight) for every entry
+
+    Args:
+        hist (TH1): fixed bin width histogram to fill
+        values (numpy array): values to fill
+        weights (numpy array): weight of each value (None = unweighted)
+
+    Returns:
+        TH1: the filled histogram
+    """
+    nBins = hist.GetNbinsX()
+    xMin  = hist.GetXaxis().GetXmin()
+    xMax  = hist.GetXaxis().GetXmax()
+
+    # TH1::Fill only switches on Sumw2 once it sees a weight different from 1
+    if ((weights is not None) and (not np.any(np.asarray(weights) != 1))):
+        weights = None
+
+    content, sumw2 = FillBinArrays(values, weights, nBins, xMin, xMax)
+    SetHistBinArrays(hist, content, sumw2, len(values))
+    return hist
+
+def SignalRegionMask(columns, muonIDCut=0.4, pionIDCut=0.3, hitIDCut=0.46, kinematicIDCut=0.84, recoTCut=0):
+    """Signal region cuts evaluated on column arrays
+
+    Args:
+        columns (dict): branch name -> numpy array
+
+    Returns:
+        numpy array: boolean mask of the events passing the cuts
+    """
+    return ((columns["BestKalmanMuonID" ] >= muonIDCut     ) &
+            (columns["FinalPionID"      ] >  pionIDCut     ) &
+            (columns["FinalHitScore"    ] >  hitIDCut      ) &
+            (columns["NewKinematicScore"] >  kinematicIDCut) &
+            (columns["RecoTKalman"      ] >= recoTCut      ))
+
+def BackgroundRegionMask(columns, muonIDCut=0.4, pionIDCut=0.05, hitIDCut=0.05, kinematicIDCut=0.84, recoTCut=0):
+    """Background control region cuts evaluated on column arrays
+
+    Args:
+        columns (dict): branch name -> numpy array
+
+    Returns:
+        numpy array: boolean mask of the events passing the cuts
+    """
+    return ((columns["BestKalmanMuonID" ] >= muonIDCut      ) &
+            ((columns["FinalPionID"     ] <  pionIDCut)  |
+             (columns["FinalHitScore"   ] <  hitIDCut))     &
+            (columns["NewKinematicScore"] >  kinematicIDCut ) &
+            (columns["RecoTKalman"      ] >= recoTCut       ))
+
+def MuonIDRegionMask(columns, muonIDCut=0.4, recoTCut=0):
+    """MuonID only cuts evaluated on column arrays
+
+    Args:
+        columns (dict): branch name -> numpy array
+
+    Returns:
+        numpy array: boolean mask of the events passing the cuts
+    """
+    return ((columns["BestKalmanMuonID"] >= muonIDCut) &
+            (columns["RecoTKalman"     ] >= recoTCut ))
+
+def LowTMuonMask(columns, muonIDCut=0.615, recoTMax=0.2):
+    """Common cuts of the FillHists sideband histograms: good muon and 0 <= |t| < recoTMax
+
+    Args:
+        columns (dict): branch name -> numpy array
+
+    Returns:
+        numpy array: boolean mask of the events passing the cuts
+    """
+    return ((columns["BestKalmanMuonID"] >  muonIDCut) &
+            (columns["RecoTKalman"     ] >= 0        ) &
+            (columns["RecoTKalman"     ] <  recoTMax ))
+
+def PionIDSidebandMask(columns):
+    """Events entering the PionID histogram of FillHists
+
+    Args:
+        columns (dict): branch name -> numpy array
+
+    Returns:
+        numpy array: boolean mask of the events passing the cuts
+    """
+    return (LowTMuonMask(columns) &
+            ((columns["FinalHitScore"    ] < 0.46) |
+             (columns["NewKinematicScore"] < 0.84)))
+
+def HitIDSidebandMask(columns):
+    """Events entering the HitID histogram of FillHists
+
+    Args:
+        columns (dict): branch name -> numpy array
+
+    Returns:
+        numpy array: boolean mask of the events passing the cuts
+    """
+    return (LowTMuonMask(columns) &
+            ((columns["FinalPionID"      ] < 0.3 ) |
+             (columns["NewKinematicScore"] < 0.84)))
+
+def KinematicIDSidebandMask(columns):
+    """Events entering the KinematicID histogram of FillHists
+
+    Args:
+        columns (dict): branch name -> numpy array
+
+    Returns:
+        numpy array: boolean mask of the events passing the cuts
+    """
+    return (LowTMuonMask(columns) &
+            ((columns["FinalPionID"  ] < 0.05) |
+             (columns["FinalHitScore"] < 0.05)))
+
+# Comparison operators understood by the declarative cuts
+cutOperators = {">" : np.greater      ,
+                ">=": np.greater_equal,
+                "<" : np.less         ,
+                "<=": np.less_equal   ,
+                "==": np.equal        ,
+                "!=": np.not_equal    }
+
+def CutConditionsMask(columns, conditions):
+    """Evaluate a list of (branch, operator, threshold) conditions on column arrays.
+       All conditions have to be fulfilled.
+
+    Args:
+        columns (dict): branch name -> numpy array
+        conditions (list): list of (branch, operator, threshold), e.g. [("RecoTKalman", ">=", 0)]
+
+    Returns:
+        numpy array: boolean mask of the events passing all conditions
+    """
+    mask = None
+    for branch, operator, threshold in conditions:
+        passed = cutOperators[operator](columns[branch], threshold)
+        mask   = passed if (mask is None) else (mask & passed)
+    return mask
+
+def InteractionCategoryMask(columns, inttype, iscc):
+    """Interaction category selection of CutTableCell evaluated on column arrays.
+       inttype = 999 selects every event, iscc = 0 selects every NC event.
+
+    Args:
+        columns (dict): branch name -> numpy array
+        inttype (int): Interaction type
+        iscc (int): Is Charged-Current? yes = 1 no = 0
+
+    Returns:
+        numpy array: boolean mask of the events in the category
+    """
+    if (int(inttype) == 999):
+        return np.ones(len(columns["IntType"]), dtype=bool)
+
+    return (((columns["IntType"] == int(inttype)) & (columns["IsCC"] == int(iscc))) |
+            ((int(iscc) == 0) & (columns["IsCC"] == 0)))
+
+def UnitVectorArrays(x, y, z):
+    """Array version of TVector3.Unit(): zero length vectors are left untouched
+
+    Args:
+        x, y, z (numpy array): vector components
+
+    Returns:
+        list: [x, y, z] of the unit vectors
+    """
+    x    = np.asarray(x, dtype=np.float64)
+    y    = np.asarray(y, dtype=np.float64)
+    z    = np.asarray(z, dtype=np.float64)
+    tot2 = x*x + y*y + z*z
+    with np.errstate(divide="ignore"):
+        tot = np.where(tot2 > 0, 1.0/np.sqrt(tot2), 1.0)
+    return [x*tot, y*tot, z*tot]
+
+def TrkLenActArray(nTracks, lenInAct, lenInCat):
+    """Array version of TrkLenAct, same branch order and -1000 sentinels
+
+    Args:
+        nTracks, lenInAct, lenInCat (numpy array): muon Kalman track information
+
+    Returns:
+        numpy array: track length in the active region (m)
+    """
+    return np.select([ nTracks < 1,
+                      (lenInAct > 0) & (lenInCat < 0),
+                      (lenInAct > 0) & (lenInCat > 0),
+                      (lenInAct < 0) & (lenInCat > 0)],
+                     [ -1000.0,
+                      (lenInAct / 100.0) + (lenInCat / 100.0),
+                      (lenInAct / 100.0),
+                       0.0],
+                     default=-1000.0)
+
+def TrkLenCatArray(nTracks, lenInAct, lenInCat):
+    """Array version of TrkLenCat, same branch order and -1000 sentinels
+
+    Args:
+        nTracks, lenInAct, lenInCat (numpy array): muon Kalman track information
+
+    Returns:
+        numpy array: track length in the muon catcher (m)
+    """
+    return np.select([ nTracks < 1,
+                      (lenInAct > 0) & (lenInCat < 0),
+                      (lenInAct > 0) & (lenInCat > 0),
+                      (lenInAct < 0) & (lenInCat > 0)],
+                     [ -1000.0,
+                       0.0,
+                      (lenInCat / 100.),
+                      (lenInAct / 100.) + (lenInCat / 100.)],
+                     default=-1000.0)
+
+def MuonEActArray(TrackLenAct):
+    return EvaluateEnergyEstimator("MuonEAct", TrackLenAct)
+
+def MuonECatArray(trklencat):
+    return EvaluateEnergyEstimator("MuonECat", trklencat)
+
+def MuonEActandCatArray(trklenactandcat):
+    return EvaluateEnergyEstimator("MuonEActandCat", trklenactandcat)
+
+def CalculateMuonEUsingKalmanTracksArray(muonInfo):
+    """Array version of CalculateMuonEUsingKalmanTracks
+
+    Args:
+        muonInfo (MuonInfo): MuonInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: muon energy (GeV), -1000 when there is no Kalman track
+    """
+    nTracks  = np.asarray(muonInfo.GetNTracks())
+    lenInAct = np.asarray(muonInfo.GetLenInAct(), dtype=np.float64)
+    lenInCat = np.asarray(muonInfo.GetLenInCat(), dtype=np.float64)
+
+    trkLenAct = TrkLenActArray(nTracks, lenInAct, lenInCat)
+    trkLenCat = TrkLenCatArray(nTracks, lenInAct, lenInCat)
+
+    muonEact       = MuonEActArray(trkLenAct)
+    muonEactandcat = MuonEActandCatArray(trkLenAct) + MuonECatArray(trkLenCat)
+
+    return np.select([ nTracks < 1,
+                      (lenInAct > 0) & (lenInCat < 0),
+                      (lenInAct > 0) & (lenInCat > 0)],
+                     [ -1000.0,
+                       muonEact/(1 - 7.65237e-4),
+                       muonEactandcat/(1 - 7.65237e-4)],
+                     default=0.0)
+
+def CalculatePionEUsingKalmanTracksArray(pionInfo):
+    """Array version of CalculatePionEUsingKalmanTracks
+
+    Args:
+        pionInfo (PionInfo): PionInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: pion energy (GeV)
+    """
+    hadE = np.asarray(pionInfo.GetPionPngKE(), dtype=np.float64) + 0.13957
+    return hadE/(1 + 3.82389e-2)
+
+def KalmanMuonMomentumArrays(muonInfo, muonE):
+    """Muon momentum vectors of the Kalman-track kinematics
+
+    Args:
+        muonInfo (MuonInfo): MuonInfo whose fields are numpy arrays
+        muonE (numpy array): muon energy from CalculateMuonEUsingKalmanTracksArray
+
+    Returns:
+        list: [px, py, pz] numpy arrays (NaN where the energy is below the muon mass)
+    """
+    with np.errstate(invalid="ignore"):
+        Pmuon = np.sqrt(np.power(muonE, 2) - pow(0.105658, 2))
+    unitMuonDir = UnitVectorArrays(muonInfo.GetDirX(), muonInfo.GetDirY(), muonInfo.GetDirZ())
+    return [component*Pmuon for component in unitMuonDir]
+
+def KalmanPionMomentumArrays(useTrack, pionInfo, pionE):
+    """Pion energy and momentum vectors of the Kalman-track kinematics.
+       Events with useTrack use the regressed pion energy and the Kalman track
+       direction, the others fall back to the prong kinetic energy and direction.
+
+    Args:
+        useTrack (numpy array): boolean mask of the events that use the Kalman track
+        pionInfo (PionInfo): PionInfo whose fields are numpy arrays
+        pionE (numpy array): pion energy from CalculatePionEUsingKalmanTracksArray
+
+    Returns:
+        list: [E, px, py, pz] numpy arrays
+    """
+    pionE       = np.where(useTrack, pionE, np.asarray(pionInfo.GetPionPngKE(), dtype=np.float64) + 0.13957)
+    trkDir      = UnitVectorArrays(pionInfo.GetTrackDirX(), pionInfo.GetTrackDirY(), pionInfo.GetTrackDirZ())
+    pngDir      = UnitVectorArrays(pionInfo.GetProngDirX(), pionInfo.GetProngDirY(), pionInfo.GetProngDirZ())
+    with np.errstate(invalid="ignore"):
+        Ppion   = np.sqrt((pionE * pionE) - pow(0.13957, 2))
+    unitPionDir = [np.where(useTrack, trk, png) for trk, png in zip(trkDir, pngDir)]
+    return [pionE] + [component*Ppion for component in unitPionDir]
+
+def KalmanPairSelection(muonInfo, pionInfo, muonE, pionE):
+    """Branch selection shared by the muon + pion Kalman-track variables
+
+    Returns:
+        list: [useTrack, useProng] boolean masks, events in neither get the -10000 sentinel
+    """
+    useTrack = (np.asarray(muonInfo.GetNTracks()) == 2) & (muonE > 0) & (pionE > 0.13957)
+    useProng = (~useTrack) & (muonE > 0) & (np.asarray(pionInfo.GetPionPngKE()) > 0)
+    return [useTrack, useProng]
+
+def CalculateMuonPtUsingKalmanTracksArray(muonInfo):
+    """Array version of CalculateMuonPtUsingKalmanTracks
+
+    Args:
+        muonInfo (MuonInfo): MuonInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: muon transverse momentum, -10000 when not computable
+    """
+    muonE   = CalculateMuonEUsingKalmanTracksArray(muonInfo)
+    valid   = (np.asarray(muonInfo.GetNTracks()) > 0) & (muonE > 0)
+    vecMuon = KalmanMuonMomentumArrays(muonInfo, muonE)
+    muonPt  = GetBeamFrame().Transverse(*vecMuon)
+    with np.errstate(invalid="ignore"):
+        return np.where(valid, np.sqrt(muonPt[0]*muonPt[0] + muonPt[1]*muonPt[1] + muonPt[2]*muonPt[2]), -10000.0)
+
+def CalculatePionPtUsingKalmanTracksArray(pionInfo):
+    """Array version of CalculatePionPtUsingKalmanTracks
+
+    Args:
+        pionInfo (PionInfo): PionInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: pion transverse momentum, -10000 when not computable
+    """
+    pionE    = CalculatePionEUsingKalmanTracksArray(pionInfo)
+    useTrack = (np.asarray(pionInfo.GetNTracks()) == 2) & (pionE > 0.13957)
+    useProng = (~useTrack) & (np.asarray(pionInfo.GetPionPngKE()) > 0)
+    vecPion  = KalmanPionMomentumArrays(useTrack, pionInfo, pionE)[1:]
+    pionPt   = GetBeamFrame().Transverse(*vecPion)
+    with np.errstate(invalid="ignore"):
+        return np.where(useTrack | useProng, np.sqrt(pionPt[0]*pionPt[0] + pionPt[1]*pionPt[1] + pionPt[2]*pionPt[2]), -10000.0)
+
+def CalculateMissingPtUsingKalmanTracksArray(muonKalmanInfo, pionKalmanInfo):
+    """Array version of CalculateMissingPtUsingKalmanTracks
+
+    Args:
+        muonKalmanInfo (MuonInfo): MuonInfo whose fields are numpy arrays (one entry per event)
+        pionKalmanInfo (PionInfo): PionInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: missing transverse momentum, -10000 when not computable
+    """
+    muonE              = CalculateMuonEUsingKalmanTracksArray(muonKalmanInfo)
+    pionE              = CalculatePionEUsingKalmanTracksArray(pionKalmanInfo)
+    useTrack, useProng = KalmanPairSelection(muonKalmanInfo, pionKalmanInfo, muonE, pionE)
+
+    vecPion   = KalmanPionMomentumArrays(useTrack, pionKalmanInfo, pionE)[1:]
+    vecMuon   = KalmanMuonMomentumArrays(muonKalmanInfo, muonE)
+    vecTotalP = [m + p for m, p in zip(vecMuon, vecPion)]
+    totalPl   = GetBeamFrame().Longitudinal(*vecTotalP)
+    with np.errstate(invalid="ignore"):
+        missingPt = np.sqrt((vecTotalP[0]*vecTotalP[0] + vecTotalP[1]*vecTotalP[1] + vecTotalP[2]*vecTotalP[2]) - np.power(totalPl, 2))
+    return np.where(useTrack | useProng, missingPt, -10000.0)
+
+def CalculateOpeningAngleUsingKalmanTracksArray(muonKalmanInfo, pionKalmanInfo):
+    """Array version of CalculateOpeningAngleUsingKalmanTracks
+
+    Args:
+        muonKalmanInfo (MuonInfo): MuonInfo whose fields are numpy arrays (one entry per event)
+        pionKalmanInfo (PionInfo): PionInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: opening angle between the muon and the pion (rad)
+    """
+    muonE       = CalculateMuonEUsingKalmanTracksArray(muonKalmanInfo)
+    useTrack    = (np.asarray(muonKalmanInfo.GetNTracks()) == 2) & (muonE > 0)
+    trkDir      = UnitVectorArrays(pionKalmanInfo.GetTrackDirX(), pionKalmanInfo.GetTrackDirY(), pionKalmanInfo.GetTrackDirZ())
+    pngDir      = UnitVectorArrays(pionKalmanInfo.GetProngDirX(), pionKalmanInfo.GetProngDirY(), pionKalmanInfo.GetProngDirZ())
+    unitPionDir = [np.where(useTrack, trk, png) for trk, png in zip(trkDir, pngDir)]
+    unitMuonDir = UnitVectorArrays(muonKalmanInfo.GetDirX(), muonKalmanInfo.GetDirY(), muonKalmanInfo.GetDirZ())
+    with np.errstate(invalid="ignore"):
+        return np.arccos(unitMuonDir[0]*unitPionDir[0] + unitMuonDir[1]*unitPionDir[1] + unitMuonDir[2]*unitPionDir[2])
+
+def CalculateVisibleAngleUsingKalmanTracksArray(muonKalmanInfo, pionKalmanInfo):
+    """Array version of CalculateVisibleAngleUsingKalmanTracks
+
+    Args:
+        muonKalmanInfo (MuonInfo): MuonInfo whose fields are numpy arrays (one entry per event)
+        pionKalmanInfo (PionInfo): PionInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: angle between the visible momentum and the beam (rad), -10000 when not computable
+    """
+    muonE              = CalculateMuonEUsingKalmanTracksArray(muonKalmanInfo)
+    pionE              = CalculatePionEUsingKalmanTracksArray(pionKalmanInfo)
+    useTrack, useProng = KalmanPairSelection(muonKalmanInfo, pionKalmanInfo, muonE, pionE)
+
+    vecPion   = KalmanPionMomentumArrays(useTrack, pionKalmanInfo, pionE)[1:]
+    vecMuon   = KalmanMuonMomentumArrays(muonKalmanInfo, muonE)
+    unitTotal = UnitVectorArrays(*[m + p for m, p in zip(vecMuon, vecPion)])
+    with np.errstate(invalid="ignore"):
+        visibleAngle = np.arccos(GetBeamFrame().Longitudinal(*unitTotal))
+    return np.where(useTrack | useProng, visibleAngle, -10000.0)
+
+def CalculateRecoTUsingKalmanTracksArray(muonKalmanInfo, pionKalmanInfo):
+    """Array version of CalculateRecoTUsingKalmanTracks
+
+    Args:
+        muonKalmanInfo (MuonInfo): MuonInfo whose fields are numpy arrays (one entry per event)
+        pionKalmanInfo (PionInfo): PionInfo whose fields are numpy arrays (one entry per event)
+
+    Returns:
+        numpy array: reconstructed |t|, -10000 when not computable
+    """
+    muonE              = CalculateMuonEUsingKalmanTracksArray(muonKalmanInfo)
+    pionE              = CalculatePionEUsingKalmanTracksArray(pionKalmanInfo)
+    useTrack, useProng = KalmanPairSelection(muonKalmanInfo, pionKalmanInfo, muonE, pionE)
+
+    pion      = KalmanPionMomentumArrays(useTrack, pionKalmanInfo, pionE)
+    pionE     = pion[0]
+    vecPion   = pion[1:]
+    vecMuon   = KalmanMuonMomentumArrays(muonKalmanInfo, muonE)
+
+    muonPl    = GetBeamFrame().Longitudinal(*vecMuon)
+    pionPl    = GetBeamFrame().Longitudinal(*vecPion)
+    vecTotalP = [m + p for m, p in zip(vecMuon, vecPion)]
+
+    recoT = (np.power((muonE - muonPl + pionE - pionPl), 2) +
+             ((vecTotalP[0]*vecTotalP[0] + vecTotalP[1]*vecTotalP[1] + vecTotalP[2]*vecTotalP[2]) - np.power(GetBeamFrame().Longitudinal(*vecTotalP), 2)))
+    return np.where(useTrack | useProng, recoT, -10000.0)
+
+def FlattenJagged(jagged):
+    """Split a jagged (per-event) branch into offsets and a flat value array.
+       Awkward arrays (uproot library="ak") are flattened without copying the values.
+
+    Args:
+        jagged (awkward array, numpy object array or list): one array of values per event
+
+    Returns:
+        list: [offsets, flat] where event i owns flat[offsets[i]:offsets[i + 1]]
+    """
+    if (hasattr(jagged, "layout")):
+        counts = ak.to_numpy(ak.num(jagged, axis=1))
+        flat   = ak.to_numpy(ak.flatten(jagged, axis=1))
+    else:
+        counts = np.fromiter((len(event) for event in jagged), dtype=np.int64, count=len(jagged))
+        flat   = np.concatenate([np.asarray(event) for event in jagged]) if (len(jagged) > 0) else np.zeros(0)
+
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return [offsets, flat]
+
+def ReverseCumulativeSum(content):
+    """Suffix sums of the bin contents in one pass: bin i of the result is
+       hist.Integral(i, nBins), under/overflow bins of the result are 0
+
+    Args:
+        content (numpy array): bin contents including under/overflow, length nBins + 2
+                               (a 2D array is summed along its last axis, one histogram per row)
+
+    Returns:
+        numpy array: cumulative contents, length nBins + 2
+    """
+    content               = np.asarray(content, dtype=np.float64)
+    cumulative            = np.zeros(content.shape)
+    cumulative[..., 1:-1] = np.cumsum(content[..., -2:0:-1], axis=-1)[..., ::-1]
+    return cumulative
+
+def ForwardCumulativeSum(content):
+    """Prefix sums of the bin contents: bin i of the result is hist.Integral(1, i),
+       under/overflow bins of the result are 0
+
+    Args:
+        content (numpy array): bin contents including under/overflow, length nBins + 2
+                               (a 2D array is summed along its last axis, one histogram per row)
+
+    Returns:
+        numpy array: cumulative contents, length nBins + 2
+    """
+    content               = np.asarray(content, dtype=np.float64)
+    cumulative            = np.zeros(content.shape)
+    cumulative[..., 1:-1] = np.cumsum(content[..., 1:-1], axis=-1)
+    return cumulative
+
+def SystematicRatioArrays(nominal, shifted, nominalErrors=None):
+    """Ratios of N shifted histograms to the nominal one in one pass.
+       Uncorrelated: errors as CalculateErrorOfRatioHist (sqrt(1/shifted + 1/nominal)*ratio).
+       Fully correlated (nominalErrors given): errors as CalculateErrorOfRatioHistFullyCorelated
+       (|nominalError/nominal|*ratio). Bins where either content is 0 get ratio 0 and error 0.
+
+    Args:
+        nominal (numpy array): nominal bin contents, length nBins + 2
+        shifted (numpy array): (N x nBins + 2) bin contents of the shifted histograms
+        nominalErrors (numpy array): nominal bin errors (None = uncorrelated)
+
+    Returns:
+        list: [ratio, errors, both], (N x nBins + 2) arrays, both marks the bins with both contents non zero
+    """
+    shifted = np.atleast_2d(np.asarray(shifted, dtype=np.float64))
+    nominal = np.broadcast_to(np.asarray(nominal, dtype=np.float64), shifted.shape)
+    ratio   = np.zeros(shifted.shape)
+    errors  = np.zeros(shifted.shape)
+
+    both        = (shifted != 0) & (nominal != 0)
+    ratio[both] = shifted[both]/nominal[both]
+
+    if (nominalErrors is None):
+        errors[both] = CheckedSqrt((1/shifted[both]) + (1/nominal[both]))*ratio[both]
+    else:
+        nominalErrors = np.broadcast_to(np.asarray(nominalErrors, dtype=np.float64), shifted.shape)
+        errors[both]  = np.abs(nominalErrors[both]/nominal[both])*ratio[both]
+
+    return [ratio, errors, both]
+
+def SystematicEnvelopeArrays(ratio, nominal, sources=None):
+    """Up/down envelope of N shifted/nominal ratios and quadrature sum over the systematic sources.
+       The deviation of a source is the largest shift of its histograms above (up) and below (down)
+       the nominal, bins with an empty nominal have no deviation.
+
+    Args:
+        ratio (numpy array): (N x nBins + 2) ratios to the nominal (see SystematicRatioArrays)
+        nominal (numpy array): nominal bin contents, length nBins + 2
+        sources (list): source name of every shifted histogram (None = every histogram is its own source)
+
+    Returns:
+        dict: "max"/"min" (largest/smallest ratio of all shifts), "up"/"down" (quadrature sum of the
+              source deviations), "sourceUp"/"sourceDown" (source name -> deviation)
+    """
+    ratio = np.atleast_2d(ratio)
+    if (sources is None):
+        sources = list(range(len(ratio)))
+
+    filled    = np.asarray(nominal) != 0
+    deviation = np.where(filled, ratio - 1, 0.0)
+
+    sourceUp   = OrderedDict()
+    sourceDown = OrderedDict()
+    for source in dict.fromkeys(sources):
+        rows               = np.asarray([name == source for name in sources])
+        sourceUp  [source] = np.maximum(np.max( deviation[rows], axis=0), 0.0)
+        sourceDown[source] = np.maximum(np.max(-deviation[rows], axis=0), 0.0)
+
+    up   = np.sqrt(np.sum(np.power(list(sourceUp  .values()), 2), axis=0))
+    down = np.sqrt(np.sum(np.power(list(sourceDown.values()), 2), axis=0))
+
+    return {"max"       : np.where(filled, np.max(ratio, axis=0), 0.0),
+            "min"       : np.where(filled, np.min(ratio, axis=0), 0.0),
+            "up"        : up        ,
+            "down"      : down      ,
+            "sourceUp"  : sourceUp  ,
+            "sourceDown": sourceDown}
+
+def CumulativeFigOfMerits(sigContent, backContent):
+    """Cut scan "keep everything at or above bin i" of signal and background from one
+       suffix-sum pass. Every array has length nBins + 2 with 0 in the under/overflow bins.
+
+       - purity      = s/(s + b), 0 if s + b = 0
+       - sensitivity = s/sqrt(s + b), 0 if s + b = 0 (NaN if s + b < 0)
+       - efficiency  = s/total and b/total, total = Integral(1, -1) including overflow
+         (None if the total is 0)
+
+    Args:
+        sigContent (numpy array): signal bin contents including under/overflow
+        backContent (numpy array): background bin contents including under/overflow
+
+    Returns:
+        dict: sigCum, backCum, purity, sensitivity, sigTotal, backTotal, sigEfficiency, backEfficiency
+    """
+    sigContent  = np.asarray(sigContent , dtype=np.float64)
+    backContent = np.asarray(backContent, dtype=np.float64)
+    sigCum      = ReverseCumulativeSum(sigContent)
+    backCum     = ReverseCumulativeSum(backContent)
+    total       = sigCum + backCum
+    nonZero     = (total != 0)
+
+    purity      = np.zeros(len(total))
+    sensitivity = np.zeros(len(total))
+    with np.errstate(invalid="ignore"):
+        purity[nonZero]      = sigCum[nonZero]/total[nonZero]
+        sensitivity[nonZero] = sigCum[nonZero]/np.sqrt(total[nonZero])
+
+    sigTotal  = sigContent [1:].sum()
+    backTotal = backContent[1:].sum()
+
+    return {"sigCum"        : sigCum                                              ,
+            "backCum"       : backCum                                             ,
+            "purity"        : purity                                              ,
+            "sensitivity"   : sensitivity                                         ,
+            "sigTotal"      : sigTotal                                            ,
+            "backTotal"     : backTotal                                           ,
+            "sigEfficiency" : (sigCum/sigTotal)   if (sigTotal  != 0) else None   ,
+            "backEfficiency": (backCum/backTotal) if (backTotal != 0) else None   }
@@ -1,22 +1,85 @@
-import ROOT
-import uproot
 import sys
+import os
+import traceback
+import hashlib
+import json
 import array
 import math
 import csv
 import time
-import multiprocessing
-import concurrent.futures
-import subprocess
 import itertools
+import importlib
 import numpy as np
 from math import acos, sqrt, pow
-from terminaltables import AsciiTable
-from matplotlib import pyplot as plt
-from multiprocessing.dummy import freeze_support
 from random import randint
-from colorama import *
-import time
-import concurrent.futures
+from collections import OrderedDict, Counter
+
+class LazyImport:
+    """Module (or attribute of a module) that is imported the first time it is used.
+       Importing the scripts only to call a numpy helper then does not pay for PyROOT,
+       uproot or matplotlib: ROOT.TH1D(...) imports ROOT at that call.
+    """
+    def __init__(self, lazyModuleName, lazyAttribute=None, lazyImportName=None):
+        """Input arguments of the constructor
+
+        Args:
+            lazyModuleName (string): module to import, e.g. "matplotlib.pyplot"
+            lazyAttribute (string): attribute of the module to use instead of the module (None = the module)
+            lazyImportName (string): module imported first, e.g. "concurrent.futures" for the package
+                                     "concurrent" (None = lazyModuleName)
+        """
+        self.lazyModuleName = lazyModuleName
+        self.lazyAttribute  = lazyAttribute
+        self.lazyImportName = lazyModuleName if (lazyImportName is None) else lazyImportName
+        self.lazyTarget     = None
+
+    def Load(self):
+        if (self.lazyTarget is None):
+            importlib.import_module(self.lazyImportName)
+            target = sys.modules[self.lazyModuleName]
+            if (self.lazyAttribute is not None):
+                target = getattr(target, self.lazyAttribute)
+            self.lazyTarget = target
+        return self.lazyTarget
+
+    def IsLoaded(self):
+        return self.lazyTarget is not None
+
+    def __getattr__(self, name):
+        # only called for names that are not attributes of the proxy itself
+        return getattr(self.Load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.Load()(*args, **kwargs)
+
+    def __dir__(self):
+        return dir(self.Load())
+
+    def __repr__(self):
+        name = self.lazyModuleName if (self.lazyAttribute is None) else f"{self.lazyModuleName}.{self.lazyAttribute}"
+        return f"<LazyImport {name} ({'loaded' if (self.IsLoaded()) else 'not loaded'})>"
 
+# Heavy backends, imported on first use
+ROOT            = LazyImport("ROOT")
+uproot          = LazyImport("uproot")
+ak              = LazyImport("awkward")
+plt             = LazyImport("matplotlib.pyplot")
+multiprocessing = LazyImport("multiprocessing")
+concurrent      = LazyImport("concurrent", None, "concurrent.futures")
+subprocess      = LazyImport("subprocess")
+AsciiTable      = LazyImport("terminaltables", "AsciiTable")
+freeze_support  = LazyImport("multiprocessing.dummy", "freeze_support")
+# every public name of "from colorama import *"
+Fore                     = LazyImport("colorama", "Fore")
+Back                     = LazyImport("colorama", "Back")
+Style                    = LazyImport("colorama", "Style")
+Cursor                   = LazyImport("colorama", "Cursor")
+AnsiToWin32              = LazyImport("colorama", "AnsiToWin32")
+init                     = LazyImport("colorama", "init")
+deinit                   = LazyImport("colorama", "deinit")
+reinit                   = LazyImport("colorama", "reinit")
+colorama_text            = LazyImport("colorama", "colorama_text")
+just_fix_windows_console = LazyImport("colorama", "just_fix_windows_console")
 
+# Modules whose import dominates the start up time (see MeasureImportTime)
+heavyModules = ["ROOT", "uproot", "awkward", "matplotlib", "terminaltables", "colorama"]
@@ -0,0 +1,31 @@
+import numpy as np
+
+from functions import CalculateMuonEUsingKalmanTracks
+from classes import MuonInfo, PionInfo
+
+
+def MakeEvents(n=3000, seed=5):
+    """Scalar MuonInfo/PionInfo of every event and the same information as MuonInfo/PionInfo of numpy arrays"""
+    rng      = np.random.RandomState(seed)
+    nKalman  = rng.choice([0, 1, 2, 3], n)
+    lenInAct = rng.choice([-1, 0, 1], n)*rng.uniform(0, 1500, n)
+    lenInCat = rng.choice([-1, 0, 1], n)*rng.uniform(0, 500, n)
+    pngKE    = rng.choice([-1, 0, 1], n)*rng.uniform(0, 2, n)
+    nTracks  = rng.choice([1, 2], n)
+    muonDir  = rng.normal(size=(3, n))
+    pngDir   = rng.normal(size=(3, n))
+    trkDir   = rng.normal(size=(3, n))
+
+    # the scalar functions fail (sqrt of a negative number) below the muon mass, the arrays give NaN there
+    muonE = np.array([CalculateMuonEUsingKalmanTracks(MuonInfo(nKalman[i], lenInAct[i], lenInCat[i], 0, 0, 1)) for i in range(n)])
+    keep  = ~((muonE > 0) & (muonE < 0.105658))
+
+    columns  = [nKalman, lenInAct, lenInCat, pngKE, nTracks, *muonDir, *pngDir, *trkDir]
+    columns  = [column[keep] for column in columns]
+    nKalman, lenInAct, lenInCat, pngKE, nTracks, mx, my, mz, px, py, pz, tx, ty, tz = columns
+
+    muons  = [MuonInfo(nKalman[i], lenInAct[i], lenInCat[i], mx[i], my[i], mz[i]) for i in range(len(nKalman))]
+    pions  = [PionInfo(nTracks[i], 0.0, 0.0, 0.0, pngKE[i], px[i], py[i], pz[i], tx[i], ty[i], tz[i]) for i in range(len(nKalman))]
+    muonArrays = MuonInfo(nKalman, lenInAct, lenInCat, mx, my, mz)
+    pionArrays = PionInfo(nTracks, 0.0, 0.0, 0.0, pngKE, px, py, pz, tx, ty, tz)
+    return [muons, pions, muonArrays, pionArrays]
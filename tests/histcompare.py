@@ -0,0 +1,95 @@
+from math import sqrt
+
+import numpy as np
+import ROOT
+
+
+def GetCells(hist):
+    """Contents and errors of every cell (including under/overflow) read bin by bin through the TH1 API"""
+    nCells = hist.GetNcells()
+    return [np.array([hist.GetBinContent(i) for i in range(nCells)]),
+            np.array([hist.GetBinError(i)   for i in range(nCells)])]
+
+
+def AssertSameHist(hist, reference, rtol=1e-12):
+    """Contents, errors, entries and Sumw2 state of hist equal those of reference"""
+    assert hist.GetNcells() == reference.GetNcells()
+
+    content     , errors          = GetCells(hist)
+    refContent  , refErrors       = GetCells(reference)
+    np.testing.assert_allclose(content, refContent, rtol=rtol, atol=0)
+    np.testing.assert_allclose(errors , refErrors , rtol=rtol, atol=0)
+
+    # TH1::Divide recomputes the entries from the bin sums, equal up to the summation order
+    np.testing.assert_allclose(hist.GetEntries(), reference.GetEntries(), rtol=rtol, atol=0)
+    assert (hist.GetSumw2N() > 0) == (reference.GetSumw2N() > 0)
+
+
+def MakeHist(name, seed, weighted, emptyBins, nBins=40):
+    """Filled TH1D with entries in the under/overflow bins, emptyBins are left at 0 to hit every zero-content case"""
+    rng  = np.random.RandomState(seed)
+    hist = ROOT.TH1D(name, "", nBins, 0, 1)
+    hist.SetDirectory(0)
+    for value, weight in zip(rng.uniform(-0.1, 1.1, 3000), rng.uniform(0.5, 1.5, 3000)):
+        if (int(value*nBins) + 1 in emptyBins):
+            continue
+        if (weighted):
+            hist.Fill(value, weight)
+        else:
+            hist.Fill(value)
+    return hist
+
+
+def MakeScanHist(inHist):
+    hist = ROOT.TH1D(f"{inHist.GetName()}_ref", "", inHist.GetNbinsX(), inHist.GetXaxis().GetXmin(), inHist.GetXaxis().GetXmax())
+    hist.SetDirectory(0)
+    return hist
+
+
+# per-bin loops the vectorized functions replaced, shared by the tests of their callers
+def CalculateErrorOfRatioHistLoop(numHist, denomHist):
+    hist = numHist.Clone("hist")
+    hist.SetDirectory(0)
+    hist.Divide(denomHist)
+    for i in range(0, hist.GetNbinsX() + 2):
+        numBinContent   = numHist.GetBinContent(i)
+        denomBinContent = denomHist.GetBinContent(i)
+        if ((denomBinContent != 0) and (numBinContent != 0)):
+            ratioBinContent = numBinContent/denomBinContent
+            hist.SetBinContent(i, ratioBinContent)
+            hist.SetBinError(i, sqrt((1/numBinContent) + (1/denomBinContent))*ratioBinContent)
+        else:
+            hist.SetBinError(i, 0)
+    return hist
+
+
+def CalculateErrorOfRatioHistFullyCorelatedLoop(numHist, denomHist):
+    hist = numHist.Clone("hist")
+    hist.SetDirectory(0)
+    for i in range(1, hist.GetNbinsX() + 1):
+        numBinContent   = numHist.GetBinContent(i)
+        denomBinContent = denomHist.GetBinContent(i)
+        denomBinError   = denomHist.GetBinError(i)
+        if ((denomBinContent != 0) and (numBinContent != 0)):
+            ratioBinContent = numBinContent/denomBinContent
+            hist.SetBinContent(i, ratioBinContent)
+            hist.SetBinError(i, sqrt(pow(denomBinError/denomBinContent, 2))*ratioBinContent)
+        elif ((numBinContent != 0) and (denomBinContent == 0)):
+            ratioBinContent = hist.GetBinContent(i)
+            hist.SetBinContent(i, 0)
+            hist.SetBinError(i, 0*ratioBinContent)
+        elif ((numBinContent == 0) and (denomBinContent != 0)):
+            ratioBinContent = hist.GetBinContent(i)
+            hist.SetBinContent(i, ratioBinContent)
+            hist.SetBinError(i, sqrt(pow(denomBinError/denomBinContent, 2))*ratioBinContent)
+        else:
+            hist.SetBinContent(i, 0)
+            hist.SetBinError(i, 0)
+    return hist
+
+
+def CreateCumulativePlotLoop(inHist):
+    hist = MakeScanHist(inHist)
+    for i in range(1, inHist.GetNbinsX() + 1):
+        hist.SetBinContent(i, inHist.Integral(i, inHist.GetNbinsX()))
+    return hist
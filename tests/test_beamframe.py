@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from beamframe import BeamFrame, BeamFrameMap, DefaultBeamFrame
+from functions import AverageBeamDirection
+
+
+def BaselineBeamDirection():
+    # TVector3 the kinematics functions built on every call before the beam frame existed
+    return ROOT.TVector3(0.0011401229, -0.061901052, 0.99807253).Unit()
+
+
+def MakeVectors(n=500, seed=11):
+    return np.random.RandomState(seed).normal(scale=2.0, size=(n, 3))
+
+
+def test_default_direction_matches_the_tvector3():
+    beamDir = BaselineBeamDirection()
+    assert [AverageBeamDirection().X(), AverageBeamDirection().Y(), AverageBeamDirection().Z()] == [beamDir.X(), beamDir.Y(), beamDir.Z()]
+    assert list(DefaultBeamFrame.GetUnitArray()) == [beamDir.X(), beamDir.Y(), beamDir.Z()]
+
+
+def test_projections_match_the_tvector3():
+    beamDir = BaselineBeamDirection()
+    for x, y, z in MakeVectors():
+        vec = ROOT.TVector3(x, y, z)
+        pt  = vec - (vec.Dot(beamDir))*beamDir
+        assert DefaultBeamFrame.Longitudinal(x, y, z) == pytest.approx(vec.Dot(beamDir), rel=1e-12, abs=1e-15)
+        np.testing.assert_allclose(DefaultBeamFrame.Transverse(x, y, z), [pt.X(), pt.Y(), pt.Z()], rtol=1e-12, atol=1e-15)
+        assert DefaultBeamFrame.TransverseMag(x, y, z) == pytest.approx(pt.Mag(), rel=1e-12, abs=1e-15)
+
+
+def test_arrays_match_scalars():
+    x, y, z = MakeVectors().T
+    np.testing.assert_allclose(DefaultBeamFrame.Longitudinal(x, y, z), [DefaultBeamFrame.Longitudinal(*vec) for vec in zip(x, y, z)], rtol=1e-15)
+    np.testing.assert_allclose(DefaultBeamFrame.ToBeamFrame(x, y, z)[2], DefaultBeamFrame.Longitudinal(x, y, z), rtol=1e-12, atol=1e-15)
+
+
+def test_rotation_is_orthonormal():
+    rotation = DefaultBeamFrame.GetRotation()
+    np.testing.assert_allclose(rotation @ rotation.T, np.eye(3), atol=1e-15)
+
+
+def test_run_map_uses_the_frame_of_each_run():
+    frames     = BeamFrameMap({10: [0.0, 0.0, 1.0], 12: [0.01, -0.05, 1.0]})
+    runs       = np.array([10, 11, 12, 13, 9])
+    x, y, z    = MakeVectors(len(runs)).T
+    expected   = [frames.GetFrame(run).Longitudinal(*vec) for run, vec in zip(runs, zip(x, y, z))]
+    np.testing.assert_allclose(frames.Longitudinal(runs, x, y, z), expected, rtol=1e-15)
+    assert frames.GetFrame(11) is DefaultBeamFrame
+
+
+def test_direction_is_a_copy():
+    beamDir = AverageBeamDirection()
+    beamDir.SetXYZ(1, 2, 3)
+    beamDir *= 2
+    expected = BaselineBeamDirection()
+    assert [AverageBeamDirection().X(), AverageBeamDirection().Y(), AverageBeamDirection().Z()] == [expected.X(), expected.Y(), expected.Z()]
@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+
+import pytest
+
+import classes
+from classes import BuilderJob, BuilderScheduler
+
+# the workers find the builders in the globals of classes, which they only inherit when forked
+pytestmark = pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="builders are patched into the forked workers")
+
+
+class WriteBuilder:
+    """Builder that fails while its marker file exists (the marker is removed on the first failure)"""
+    def __init__(self, inFile, outFile, marker=""):
+        print(f"building {outFile} from {inFile}")
+        # written past sys.stdout, like the output of ROOT
+        os.write(1, f"descriptor output {inFile}\n".encode())
+        if (marker and os.path.exists(marker)):
+            os.remove(marker)
+            raise RuntimeError(f"flaky input {inFile}")
+        with open(outFile, "w") as fout:
+            fout.write(inFile)
+
+class BrokenBuilder:
+    def __init__(self, inFile, outFile):
+        print(f"building {outFile} from {inFile}")
+        raise RuntimeError(f"broken input {inFile}")
+
+
+@pytest.fixture
+def builders(monkeypatch):
+    monkeypatch.setattr(classes, "WriteBuilder" , WriteBuilder , raising=False)
+    monkeypatch.setattr(classes, "BrokenBuilder", BrokenBuilder, raising=False)
+
+
+@pytest.mark.parametrize("nWorkers", [1, 2])
+def test_retry_logs_and_failures(builders, tmp_path, nWorkers):
+    marker = tmp_path / "flaky.marker"
+    marker.write_text("")
+    jobs = [BuilderJob("WriteBuilder" , "good.root" , str(tmp_path / "good.out")),
+            BuilderJob("WriteBuilder" , "flaky.root", str(tmp_path / "flaky.out"), [str(marker)]),
+            BuilderJob("BrokenBuilder", "bad.root"  , str(tmp_path / "bad.out"))]
+
+    failed = BuilderScheduler(jobs, nWorkers=nWorkers, maxRetries=1).Run()
+
+    good, flaky, bad = jobs
+    assert failed == [bad]
+    assert [job.status   for job in jobs] == ["done", "done", "failed"]
+    assert [job.attempts for job in jobs] == [1, 2, 2]
+    assert (tmp_path / "good.out").read_text()  == "good.root"
+    assert (tmp_path / "flaky.out").read_text() == "flaky.root"
+    assert not (tmp_path / "bad.out").exists()
+    assert good.error is None and flaky.error is None
+    assert "RuntimeError: broken input bad.root" in bad.error
+
+    # every attempt appends its header, the output of the builder and the traceback to the log of its own job
+    goodLog  = (tmp_path / "good.log").read_text()
+    flakyLog = (tmp_path / "flaky.log").read_text()
+    badLog   = (tmp_path / "bad.log").read_text()
+    assert goodLog.count("### WriteBuilder good.root") == 1
+    assert f"building {tmp_path / 'good.out'} from good.root" in goodLog
+    assert goodLog.index("building") < goodLog.index("descriptor output good.root")
+    assert "Traceback" not in goodLog
+    assert [line.split(" attempt ")[1] for line in flakyLog.splitlines() if line.startswith("###")] == ["1", "2"]
+    assert flakyLog.count("RuntimeError: flaky input flaky.root") == 1
+    assert badLog.count("RuntimeError: broken input bad.root") == 2
+    assert "good.root" not in badLog and "bad.root" not in goodLog
+
+
+def test_unknown_builder_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="NoSuchBuilder"):
+        BuilderScheduler([("NoSuchBuilder", "in.root", str(tmp_path / "out.root"))])
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import EntryRanges, GetTreeFileAndPath
+from classes import FillHists, HistBins
+from histcompare import AssertSameHist
+
+binning = [200, 0, 1]
+
+
+def FillLoop(values, weights):
+    hist = ROOT.TH1D("loop", "", *binning)
+    hist.SetDirectory(0)
+    for value, weight in zip(values, weights):
+        hist.Fill(value, weight)
+    return hist
+
+
+@pytest.mark.parametrize("chunkSize", [1000, 777, 10**6])
+def test_merged_chunks_match_one_fill(chunkSize):
+    rng     = np.random.RandomState(6)
+    values  = rng.uniform(-0.1, 1.1, 5000)
+    # the first chunks only have unit weights, their bins have no Sumw2 until they are merged
+    weights = np.ones(len(values))
+    weights[3000:] = rng.uniform(0.5, 1.5, 2000)
+
+    merged = None
+    for start, stop in EntryRanges(len(values), chunkSize):
+        chunk  = HistBins.FromColumns(binning, values[start:stop], weights[start:stop])
+        merged = chunk if (merged is None) else merged.Add(chunk)
+
+    AssertSameHist(merged.GetHist("merged"), FillLoop(values, weights))
+
+
+def test_unit_weight_chunks_stay_unweighted():
+    values = np.random.RandomState(7).uniform(0, 1, 1000)
+    merged = HistBins.FromColumns(binning, values[:500], np.ones(500)).Add(HistBins.FromColumns(binning, values[500:], np.ones(500)))
+    assert merged.GetSumw2() is None
+    AssertSameHist(merged.GetHist("merged"), FillLoop(values, np.ones(1000)))
+
+
+def WriteSidebandTree(fileName, seed, n=3000):
+    """Tree with the FillHists branches in the subdirectory sel of fileName"""
+    rng      = np.random.RandomState(seed)
+    branches = {"BestKalmanMuonID": rng.uniform(0.5, 1, n), "RecoTKalman": rng.uniform(-0.05, 0.25, n),
+                "FinalPionID": rng.uniform(0, 1, n), "FinalHitScore": rng.uniform(0, 1, n), "NewKinematicScore": rng.uniform(0, 1, n)}
+    with ROOT.TDirectory.TContext():
+        f      = ROOT.TFile(fileName, "RECREATE")
+        f.mkdir("sel").cd()
+        tree   = ROOT.TTree("tree", "")
+        values = {name: np.zeros(1) for name in branches}
+        for name, value in values.items():
+            tree.Branch(name, value, f"{name}/D")
+        for i in range(n):
+            for name, value in values.items():
+                value[0] = branches[name][i]
+            tree.Fill()
+        tree.Write()
+        f.Close()
+
+
+def test_sideband_chunks_read_the_tree_path_and_fall_back_for_chains(tmp_path):
+    fileNames = [str(tmp_path / f"sideband{i}.root") for i in range(2)]
+    for seed, fileName in enumerate(fileNames):
+        WriteSidebandTree(fileName, seed)
+    histInfo = ["sideband", "", 20, 0, 1]
+
+    f    = ROOT.TFile(fileNames[0])
+    tree = f.Get("sel/tree")
+    assert GetTreeFileAndPath(tree) == [fileNames[0], "sel/tree"]
+    for chunk, loop in zip(FillHists(tree, histInfo).FillHists(True, chunkSize=700, nWorkers=1),
+                           FillHists(tree, histInfo).FillHists(True)):
+        AssertSameHist(chunk, loop)
+
+    # the files of a chain are not known up front, the chain is filled by the event loop
+    chain = ROOT.TChain("sel/tree")
+    for fileName in fileNames:
+        chain.Add(fileName)
+    assert chain.GetEntries() == 6000
+    assert GetTreeFileAndPath(chain) is None
+    for chunk, loop in zip(FillHists(chain, histInfo).FillHists(True, chunkSize=700, nWorkers=1),
+                           FillHists(chain, histInfo).FillHists(True)):
+        AssertSameHist(chunk, loop)
+    f.Close()
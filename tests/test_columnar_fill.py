@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import FillBinArrays, FillHistFromColumns, FindBinArray, SetHistBinArrays, SignalRegionMask, BackgroundRegionMask
+from histcompare import AssertSameHist
+
+nBins, xMin, xMax = 200, 0, 1
+
+
+def MakeHist(name):
+    hist = ROOT.TH1D(name, "", nBins, xMin, xMax)
+    hist.SetDirectory(0)
+    return hist
+
+
+def MakeValues(n=5000, seed=1):
+    rng    = np.random.RandomState(seed)
+    values = rng.uniform(-0.1, 1.1, n)
+    # bin edges, xMin and xMax themselves go to the same bins as with TH1::Fill
+    edges  = np.array([xMin, xMax, -1e-12, 1 - 1e-12, 0.005, 0.015, 0.5, 0.995, 0.3, 0.7])
+    # every bin edge, where the division and GetBinLowEdge can disagree, and its neighbours
+    allEdges = xMin + np.arange(nBins + 1)*(xMax - xMin)/nBins
+    return np.concatenate([values, edges, allEdges, np.nextafter(allEdges, -np.inf), np.nextafter(allEdges, np.inf)])
+
+
+def FillLoop(name, values, weights=None):
+    hist = MakeHist(name)
+    for i, value in enumerate(values):
+        if (weights is None):
+            hist.Fill(value)
+        else:
+            hist.Fill(value, weights[i])
+    return hist
+
+
+def test_find_bin_matches_taxis():
+    values = MakeValues()
+    axis   = MakeHist("axis").GetXaxis()
+    assert list(FindBinArray(values, nBins, xMin, xMax)) == [axis.FindBin(value) for value in values]
+
+
+def test_unweighted_fill():
+    values = MakeValues()
+    AssertSameHist(FillHistFromColumns(MakeHist("columns"), values), FillLoop("loop", values))
+
+
+def test_weighted_fill_switches_on_sumw2():
+    values  = MakeValues()
+    weights = np.random.RandomState(2).uniform(0.5, 1.5, len(values))
+    hist    = FillHistFromColumns(MakeHist("columns"), values, weights)
+    AssertSameHist(hist, FillLoop("loop", values, weights))
+    assert hist.GetSumw2N() > 0
+
+
+def test_unit_weights_keep_sumw2_off():
+    values = MakeValues()
+    hist   = FillHistFromColumns(MakeHist("columns"), values, np.ones(len(values)))
+    AssertSameHist(hist, FillLoop("loop", values, np.ones(len(values))))
+    assert hist.GetSumw2N() == 0
+
+
+def test_weight_different_from_one_late_in_the_fill():
+    # TH1::Fill switches Sumw2 on at the first weight != 1, the earlier entries count with w^2 = 1
+    values      = MakeValues()
+    weights     = np.ones(len(values))
+    weights[-3] = 2.5
+    AssertSameHist(FillHistFromColumns(MakeHist("columns"), values, weights), FillLoop("loop", values, weights))
+
+
+def test_set_bin_arrays_and_scale():
+    values  = MakeValues()
+    weights = np.random.RandomState(3).uniform(0.5, 1.5, len(values))
+
+    content, sumw2 = FillBinArrays(values, weights, nBins, xMin, xMax)
+    hist           = MakeHist("columns")
+    SetHistBinArrays(hist, content, sumw2, len(values))
+    hist.Scale(0.7)
+
+    reference = FillLoop("loop", values, weights)
+    reference.Scale(0.7)
+    AssertSameHist(hist, reference)
+
+
+@pytest.mark.parametrize("Mask, Cut", [
+    [SignalRegionMask    , lambda m, p, h, k, t: (m >= 0.4) and (p > 0.3) and (h > 0.46) and (k > 0.84) and (t >= 0)],
+    [BackgroundRegionMask, lambda m, p, h, k, t: (m >= 0.4) and ((p < 0.05) or (h < 0.05)) and (k > 0.84) and (t >= 0)]])
+def test_region_masks_match_the_event_loop(Mask, Cut):
+    rng     = np.random.RandomState(4)
+    n       = 20000
+    columns = {"BestKalmanMuonID" : rng.choice([0.3, 0.4, 0.5, 0.9], n),
+               "FinalPionID"      : rng.choice([0.01, 0.05, 0.3, 0.31], n),
+               "FinalHitScore"    : rng.choice([0.01, 0.05, 0.46, 0.47], n),
+               "NewKinematicScore": rng.choice([0.5, 0.84, 0.85], n),
+               "RecoTKalman"      : rng.uniform(-0.2, 1.2, n)}
+    names    = ["BestKalmanMuonID", "FinalPionID", "FinalHitScore", "NewKinematicScore", "RecoTKalman"]
+    expected = [Cut(*[columns[name][i] for name in names]) for i in range(n)]
+    assert list(Mask(columns)) == expected
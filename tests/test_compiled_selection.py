@@ -0,0 +1,37 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from classes import CompiledEventSelection, EventSelection
+
+thresholds = [0.4, 0.3, [0, 0.2], 0.84, 0.46]
+
+
+def MakeColumns(n=3000, seed=13):
+    rng = np.random.RandomState(seed)
+    # values at every threshold, below and above, and NaN
+    return {"MuonLen"          : rng.choice([-1.0, 0.0, 300.0], n),
+            "PionCalE"         : rng.choice([-0.1, 0.0, 0.5], n),
+            "BestKalmanMuonID" : rng.choice([0.39, 0.4, 0.41, np.nan], n),
+            "FinalPionID"      : rng.choice([0.29, 0.3, 0.31, np.nan], n),
+            "FinalHitScore"    : rng.choice([0.45, 0.46, 0.47], n),
+            "RecoTKalman"      : rng.choice([-0.1, 0.0, 0.1, 0.5], n),
+            "NewKinematicScore": rng.choice([0.83, 0.84, 0.85], n)}
+
+
+@pytest.mark.parametrize("flags", list(itertools.product([True, False], repeat=5)))
+def test_mask_matches_output(flags):
+    columns   = MakeColumns()
+    selection = EventSelection("cut", *flags)
+    selection.SetThresholds(*thresholds)
+    mask      = CompiledEventSelection.FromEventSelection(selection).Mask(columns)
+
+    expected = []
+    for i in range(len(mask)):
+        selection.SetVariables(columns["MuonLen"][i], columns["BestKalmanMuonID"][i], columns["PionCalE"][i], 0.0,
+                               columns["FinalPionID"][i], columns["RecoTKalman"][i], columns["NewKinematicScore"][i],
+                               columns["FinalHitScore"][i])
+        # Output() returns None for flag combinations it does not handle
+        expected.append(bool(selection.Output()))
+    assert list(mask) == expected
@@ -0,0 +1,74 @@
+from math import sqrt
+
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import CreateCumulativePlot, GetCumulativeHistWithErrors
+from classes import FigOfMerits
+from histcompare import AssertSameHist, CreateCumulativePlotLoop, MakeScanHist
+
+
+def MakeFilledHist(name, seed, nBins=50):
+    # weighted fill with entries in the under/overflow bins as well
+    rng  = np.random.RandomState(seed)
+    hist = ROOT.TH1D(name, "", nBins, 0, 1)
+    hist.SetDirectory(0)
+    for value, weight in zip(rng.uniform(-0.2, 1.2, 2000), rng.uniform(0.5, 1.5, 2000)):
+        hist.Fill(value, weight)
+    return hist
+
+
+def MakeEmptyBinsHist(name, nBins=50):
+    hist = ROOT.TH1D(name, "", nBins, 0, 1)
+    hist.SetDirectory(0)
+    for value in [0.05, 0.05, 0.3]:
+        hist.Fill(value)
+    return hist
+
+
+# per-bin Integral loops the cumulative functions replaced
+def GetCumulativeHistWithErrorsLoop(inHist):
+    hist = MakeScanHist(inHist)
+    for i in range(1, inHist.GetNbinsX() + 1):
+        total = inHist.Integral(i, inHist.GetNbinsX())
+        hist.SetBinContent(i, total)
+        hist.SetBinError(i, sqrt(total))
+    return hist
+
+
+def ScanLoop(sigHist, backHist, Value):
+    nBins = sigHist.GetNbinsX()
+    hist  = MakeScanHist(sigHist)
+    for i in range(1, nBins + 1):
+        hist.SetBinContent(i, Value(sigHist.Integral(i, nBins), backHist.Integral(i, nBins)))
+    return hist
+
+
+@pytest.mark.parametrize("MakeHist", [lambda: MakeFilledHist("in", 1), lambda: MakeEmptyBinsHist("in")])
+def test_cumulative_plot(MakeHist):
+    hist = MakeHist()
+    AssertSameHist(CreateCumulativePlot(hist), CreateCumulativePlotLoop(hist))
+    AssertSameHist(GetCumulativeHistWithErrors(hist), GetCumulativeHistWithErrorsLoop(hist))
+
+
+def test_fig_of_merits():
+    sigHist  = MakeFilledHist("sig" , 2)
+    backHist = MakeEmptyBinsHist("back")
+    fom      = FigOfMerits(sigHist, backHist)
+
+    sigTotal  = sigHist .Integral(1, -1)
+    backTotal = backHist.Integral(1, -1)
+
+    AssertSameHist(fom.GetPurityHist()     , ScanLoop(sigHist, backHist, lambda s, b: 0 if ((s + b) == 0) else s/(s + b)))
+    AssertSameHist(fom.GetSensitivityHist(), ScanLoop(sigHist, backHist, lambda s, b: 0 if ((s + b) == 0) else s/sqrt(s + b)))
+    AssertSameHist(fom.GetSignalEfficiencyHist()    , ScanLoop(sigHist, backHist, lambda s, b: s/sigTotal))
+    AssertSameHist(fom.GetBackgroundEfficiencyHist(), ScanLoop(backHist, sigHist, lambda b, s: b/backTotal))
+
+
+def test_empty_efficiency_raises_like_the_loop():
+    empty = ROOT.TH1D("empty", "", 10, 0, 1)
+    empty.SetDirectory(0)
+    with pytest.raises(ZeroDivisionError):
+        FigOfMerits(empty, empty).GetSignalEfficiencyHist()
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from classes import CutFlow, cutTableCategories
+from histcompare import AssertSameHist
+
+stageNames = ["npngsMuonID", "npngsPionID", "npngsHitID", "npngsKID"]
+
+
+def MakeColumns(weights, n=4000, seed=5):
+    rng = np.random.RandomState(seed)
+    # values at every threshold, below and above, prong counts in under/overflow
+    return {"BestKalmanMuonID" : rng.choice([0.39, 0.4, 0.41, np.nan], n),
+            "FinalPionID"      : rng.choice([0.29, 0.3, 0.31], n),
+            "FinalHitScore"    : rng.choice([0.45, 0.46, 0.47], n),
+            "RecoTKalman"      : rng.choice([-0.1, 0.0, 0.1], n),
+            "NewKinematicScore": rng.choice([0.83, 0.84, 0.85], n),
+            "nProngs"          : rng.randint(-1, 12, n).astype(np.float64),
+            "IntType"          : rng.choice([0, 1, 2, 3, 10, 5], n),
+            "IsCC"             : rng.choice([0, 1], n),
+            "weight"           : weights(rng, n)}
+
+
+def CutTableCellLoop(columns, inttype, iscc):
+    """Stage histograms filled event by event with the cascade of CutTableCell"""
+    hists = []
+    for name in stageNames:
+        hist = ROOT.TH1D(name + "Loop", "", 10, 0, 10)
+        hist.SetDirectory(0)
+        hists.append(hist)
+
+    for i in range(len(columns["nProngs"])):
+        eventinttype = columns["IntType"][i]
+        eventisCC    = columns["IsCC"][i]
+        if (not ((int(inttype) == 999) or ((eventinttype == int(inttype)) and (eventisCC == int(iscc))) or
+                 ((int(iscc) == 0) and (eventisCC == 0)))):
+            continue
+
+        npngs  = columns["nProngs"][i]
+        weight = columns["weight"][i]
+        if (columns["BestKalmanMuonID"][i] > 0.4):
+            hists[0].Fill(npngs, weight)
+            if (columns["FinalPionID"][i] > 0.3):
+                hists[1].Fill(npngs, weight)
+                if (columns["FinalHitScore"][i] > 0.46):
+                    hists[2].Fill(npngs, weight)
+                    if ((columns["RecoTKalman"][i] >= 0) and (columns["NewKinematicScore"][i] > 0.84)):
+                        hists[3].Fill(npngs, weight)
+    return hists
+
+
+@pytest.mark.parametrize("weights", [lambda rng, n: rng.uniform(0.5, 1.5, n),
+                                     lambda rng, n: np.ones(n)])
+def test_fill_matches_cut_table_cell(weights):
+    columns = MakeColumns(weights)
+    cutFlow = CutFlow()
+    cutFlow.Fill(columns)
+
+    for category, (inttype, iscc) in cutTableCategories.items():
+        loopHists = CutTableCellLoop(columns, inttype, iscc)
+        hists     = cutFlow.GetHists(category)
+        assert [hist.GetName() for hist in hists] == stageNames
+        for hist, reference in zip(hists, loopHists):
+            AssertSameHist(hist, reference)
+        # stage counts include under/overflow
+        np.testing.assert_allclose(cutFlow.GetStageCounts(category),
+                                   [sum(ref.GetBinContent(i) for i in range(ref.GetNcells())) for ref in loopHists],
+                                   rtol=1e-12)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from classes import CutTableAccumulator
+
+
+def MakeColumns(n=4000, seed=9):
+    rng = np.random.RandomState(seed)
+    # values at every threshold, below and above
+    return {"BestKalmanMuonID" : rng.choice([0.39, 0.4, 0.41, np.nan], n),
+            "FinalPionID"      : rng.choice([0.29, 0.3, 0.31], n),
+            "FinalHitScore"    : rng.choice([0.45, 0.46, 0.47], n),
+            "RecoTKalman"      : rng.choice([-0.1, 0.0, 0.1], n),
+            "NewKinematicScore": rng.choice([0.83, 0.84, 0.85], n),
+            "IntType"          : rng.choice([0, 1, 2, 3, 10, 5], n),
+            "IsCC"             : rng.choice([0, 1], n),
+            "weight"           : rng.uniform(0.5, 1.5, n)}
+
+
+def TallyLoop(columns):
+    """Weighted MC and data counts per row and category counted event by event"""
+    categories = list(CutTableAccumulator.categories.values())
+    mc         = np.zeros((5, len(categories) + 1))
+    data       = np.zeros(5)
+    for i in range(len(columns["weight"])):
+        category = len(categories)
+        for index, (inttype, iscc) in enumerate(categories):
+            if (((columns["IntType"][i] == inttype) and (columns["IsCC"][i] == iscc)) or
+                ((iscc == 0) and (columns["IsCC"][i] == 0))):
+                category = index
+
+        passed = [True,
+                  columns["BestKalmanMuonID"][i] > 0.4,
+                  columns["FinalPionID"][i] > 0.3,
+                  columns["FinalHitScore"][i] > 0.46,
+                  (columns["RecoTKalman"][i] >= 0) and (columns["NewKinematicScore"][i] > 0.84)]
+        for row in range(5):
+            if (not all(passed[:row + 1])):
+                break
+            mc[row][category] += columns["weight"][i]
+            data[row]         += 1
+    return mc, data
+
+
+def test_add_matches_the_event_loop():
+    columns = MakeColumns()
+    tally   = CutTableAccumulator()
+    tally.Add("mc"  , columns)
+    tally.Add("data", columns)
+
+    mc, data = TallyLoop(columns)
+    np.testing.assert_allclose(tally.mc, mc, rtol=1e-12)
+    np.testing.assert_array_equal(tally.data, data)
+
+
+def test_merged_chunks_match_a_single_add():
+    columns = MakeColumns()
+    single  = CutTableAccumulator()
+    single.Add("mc"  , columns)
+    single.Add("data", columns)
+
+    merged = CutTableAccumulator()
+    for start in range(0, len(columns["weight"]), 700):
+        chunk = merged.Empty()
+        chunk.Add("mc"  , {name: values[start:start + 700] for name, values in columns.items()})
+        chunk.Add("data", {name: values[start:start + 700] for name, values in columns.items()})
+        merged.Merge(chunk)
+
+    np.testing.assert_allclose(merged.mc, single.mc, rtol=1e-12)
+    np.testing.assert_array_equal(merged.data, single.data)
+
+
+def test_merge_rejects_different_stages():
+    with pytest.raises(ValueError):
+        CutTableAccumulator().Merge(CutTableAccumulator(firstRowName="NoCut"))
@@ -0,0 +1,32 @@
+from math import sqrt
+
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from classes import DataMCComparison
+from histcompare import AssertSameHist, CalculateErrorOfRatioHistLoop, MakeHist
+
+
+def CumulativeCloneLoop(hist, name):
+    # cumulative clone built by SaveDATACanvasCumRatio before DataMCComparison
+    nBins = hist.GetNbinsX()
+    cum   = hist.Clone(name)
+    cum.SetDirectory(0)
+    for i in range(1, nBins + 1):
+        cum.SetBinContent(i, hist.Integral(i, nBins))
+        cum.SetBinError(i, sqrt(cum.GetBinContent(i)))
+    return cum
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_ratio_panels_match_the_clone_path(weighted):
+    # data without weights, MC weighted or not, both with empty bins and under/overflow
+    dataHist   = MakeHist("data", 14, False   , [3, 7])
+    mcHist     = MakeHist("mc"  , 15, weighted, [5, 7])
+    comparison = DataMCComparison(dataHist, mcHist)
+
+    AssertSameHist(comparison.GetRatioHist(), CalculateErrorOfRatioHistLoop(dataHist, mcHist))
+    AssertSameHist(comparison.GetCumulativeRatioHist(),
+                   CalculateErrorOfRatioHistLoop(CumulativeCloneLoop(dataHist, "dataCum"), CumulativeCloneLoop(mcHist, "mcCum")))
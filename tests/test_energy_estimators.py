@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from functions import *
+
+
+# estimators as written out before the coefficient registry
+def MuonEnergyEstimatorBaseline(muonLen):
+    return (0.00206646*muonLen + 0.0201737)
+
+
+def PionEEstBaseline(calE):
+    p = [0.348592, -5.98497, 54.545, -207.531, 361.683, -41.3106, -941.125, 1647.79, -1210.14, 343.351]
+    return (p[0] + p[1]*calE + p[2]*pow(calE, 2) + p[3]*pow(calE, 3) + p[4]*pow(calE, 4) +
+            p[5]*pow(calE, 5) + p[6]*pow(calE, 6) + p[7]*pow(calE, 7) + p[8]*pow(calE, 8) + p[9]*pow(calE, 9))
+
+
+def MuonEActBaseline(TrackLenAct):
+    if (TrackLenAct <= 0.0):
+        return 0.0
+    return 1.67012e-01 + 1.79305e-01*TrackLenAct + 3.74708e-03*pow(TrackLenAct, 2) + -1.54232e-04*pow(TrackLenAct, 3)
+
+
+def MuonECatBaseline(trklencat):
+    if (trklencat <= 0.0):
+        return 0.0
+    return 5.35146e-01*trklencat + 1.31325e-01
+
+
+def MuonEActandCatBaseline(trklenactandcat):
+    if (trklenactandcat <= 0.0):
+        return 0.0
+    return 1.21130e-02 + 1.97903e-01*trklenactandcat + 7.82459e-04*pow(trklenactandcat, 2)
+
+
+def VisibleHadEBaseline(vishadE):
+    return 5.85254e-02 + (1.27796e+00*vishadE) + 3.75457e-01*pow(vishadE, 2) + -5.45618e-01*pow(vishadE, 3) + 1.65975e-01*pow(vishadE, 4)
+
+
+estimators = [[MuonEnergyEstimator, MuonEnergyEstimatorBaseline, None                 , np.linspace(-100, 2000, 211)],
+              [PionEEst           , PionEEstBaseline           , None                 , np.linspace(0, 1.5, 151)    ],
+              [MuonEAct           , MuonEActBaseline           , MuonEActArray        , np.linspace(-2, 15, 171)    ],
+              [MuonECat           , MuonECatBaseline           , MuonECatArray        , np.linspace(-2, 5, 71)      ],
+              [MuonEActandCat     , MuonEActandCatBaseline     , MuonEActandCatArray  , np.linspace(-2, 15, 171)    ],
+              [VisibleHadE        , VisibleHadEBaseline        , None                 , np.linspace(0, 3, 61)       ]]
+
+
+@pytest.mark.parametrize("Estimator, Baseline, ArrayEstimator, x", estimators)
+def test_estimators_match_the_expanded_polynomials(Estimator, Baseline, ArrayEstimator, x):
+    # Horner's scheme rounds differently from the expanded sums
+    expected = [Baseline(value) for value in x]
+    np.testing.assert_allclose([Estimator(value) for value in x], expected, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(Estimator(x), expected, rtol=1e-12, atol=1e-9)
+    if (ArrayEstimator is not None):
+        np.testing.assert_allclose(ArrayEstimator(x), expected, rtol=1e-12, atol=1e-9)
+
+
+def test_positive_only_estimators_return_zero():
+    assert MuonEAct(0.0) == 0.0
+    assert MuonECat(-1.0) == 0.0
+    assert list(MuonEActandCat(np.array([-1.0, 0.0]))) == [0.0, 0.0]
+
+
+def test_load_and_reset_coefficients(tmp_path):
+    fileName = tmp_path/"calibration.json"
+    fileName.write_text(json.dumps({"MuonECat": [1.0, 2.0], "VisibleHadE": {"coefficients": [0.5]}}))
+    try:
+        LoadEnergyEstimatorCoefficients(str(fileName))
+        assert MuonECat(3.0) == 7.0
+        assert MuonECat(-3.0) == 0.0
+        assert VisibleHadE(10.0) == 0.5
+        assert MuonEAct(1.0) == MuonEActBaseline(1.0)
+    finally:
+        ResetEnergyEstimatorCoefficients()
+    assert MuonECat(3.0) == MuonECatBaseline(3.0)
+
+
+def test_unknown_estimator_is_rejected():
+    with pytest.raises(KeyError):
+        SetEnergyEstimatorCoefficients("NoSuchEstimator", [1.0])
@@ -0,0 +1,67 @@
+from math import sqrt
+
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import (CalculateErrorOfRatioHist, CalculateErrorOfRatioHistFullyCorelated, CalculateStatisticalErrorBinByBin,
+                       CalculateStatisticalErrorOfSumOfHist, CalculateTotalError)
+from histcompare import (AssertSameHist, CalculateErrorOfRatioHistFullyCorelatedLoop, CalculateErrorOfRatioHistLoop,
+                         MakeHist)
+
+nBins = 40
+
+
+def MakePair(weighted):
+    # bins 3-4: empty numerator, 5-6: empty denominator, 7: both empty
+    return [MakeHist("num"  , 1, weighted, [3, 4, 7]),
+            MakeHist("denom", 2, weighted, [5, 6, 7])]
+
+
+# per-bin loops the vectorized functions replaced
+def CalculateStatisticalErrorBinByBinLoop(hist):
+    for i in range(1, hist.GetNbinsX() + 1):
+        hist.SetBinError(i, sqrt(hist.GetBinContent(i)))
+    return hist
+
+
+def CalculateStatisticalErrorOfSumOfHistLoop(hist1, hist2):
+    total = hist1.Clone("total")
+    total.SetDirectory(0)
+    for i in range(1, hist1.GetNbinsX() + 1):
+        total.SetBinContent(i, hist1.GetBinContent(i) + hist2.GetBinContent(i))
+        total.SetBinError(i, sqrt(pow(hist1.GetBinError(i), 2) + pow(hist2.GetBinError(i), 2)))
+    return total
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_ratio(weighted):
+    numHist, denomHist = MakePair(weighted)
+    AssertSameHist(CalculateErrorOfRatioHist(numHist, denomHist), CalculateErrorOfRatioHistLoop(numHist, denomHist))
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_ratio_fully_correlated(weighted):
+    numHist, denomHist = MakePair(weighted)
+    AssertSameHist(CalculateErrorOfRatioHistFullyCorelated(numHist, denomHist),
+                   CalculateErrorOfRatioHistFullyCorelatedLoop(numHist, denomHist))
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_statistical_error_bin_by_bin(weighted):
+    hist      = MakeHist("hist", 3, weighted, [2])
+    reference = hist.Clone("reference")
+    reference.SetDirectory(0)
+    AssertSameHist(CalculateStatisticalErrorBinByBin(hist), CalculateStatisticalErrorBinByBinLoop(reference))
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_sum_of_hists(weighted):
+    hist1, hist2 = MakePair(weighted)
+    AssertSameHist(CalculateStatisticalErrorOfSumOfHist(hist1, hist2), CalculateStatisticalErrorOfSumOfHistLoop(hist1, hist2))
+
+
+def test_total_error():
+    hist = MakeHist("hist", 4, True, [])
+    assert CalculateTotalError(hist) == pytest.approx(sqrt(sum(pow(hist.GetBinError(i), 2) for i in range(nBins + 2))), rel=1e-12)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import *
+from classes import MuonInfoArrays, PionInfoArrays
+from eventsample import MakeEvents
+
+events = MakeEvents()
+
+muonBranches = {"nKalman": "nKalman", "LenInAct": "LenInAct", "LenInCat": "LenInCat",
+                "DirX": "muonDirX", "DirY": "muonDirY", "DirZ": "muonDirZ"}
+pionBranches = {"nTracks": "nTracks", "muonOverlapE": "MuonOverlapE", "slcCalE": "SlcCalE", "muonCalE": "MuonCalE",
+                "pionPngKEReg": "PionPngKE", "pngDirX": "pngDirX", "pngDirY": "pngDirY", "pngDirZ": "pngDirZ",
+                "trkDirX": "trkDirX", "trkDirY": "trkDirY", "trkDirZ": "trkDirZ"}
+
+
+def MakeContainers():
+    """MuonInfoArrays/PionInfoArrays built from branch columns of the same events as the scalar objects"""
+    muons, pions, muonArrays, pionArrays = events
+    n       = len(muons)
+    columns = {"nKalman" : muonArrays.nKalman , "LenInAct": muonArrays.LenInAct, "LenInCat": muonArrays.LenInCat,
+               "muonDirX": muonArrays.DirX    , "muonDirY": muonArrays.DirY    , "muonDirZ": muonArrays.DirZ    ,
+               "nTracks" : pionArrays.nTracks , "MuonOverlapE": np.zeros(n), "SlcCalE": np.zeros(n), "MuonCalE": np.zeros(n),
+               "PionPngKE": pionArrays.PionPngKE,
+               "pngDirX" : pionArrays.pngDirX , "pngDirY" : pionArrays.pngDirY , "pngDirZ" : pionArrays.pngDirZ ,
+               "trkDirX" : pionArrays.trkDirX , "trkDirY" : pionArrays.trkDirY , "trkDirZ" : pionArrays.trkDirZ }
+    return [muons, pions, columns,
+            MuonInfoArrays.FromColumns(columns, muonBranches), PionInfoArrays.FromColumns(columns, pionBranches)]
+
+
+def test_containers_do_not_copy_the_columns():
+    muons, pions, columns, muonArrays, pionArrays = MakeContainers()
+    assert len(muonArrays) == len(pionArrays) == len(muons)
+    assert muonArrays.GetLenInAct() is columns["LenInAct"]
+    assert pionArrays.GetPionPngKE() is columns["PionPngKE"]
+
+
+@pytest.mark.parametrize("Scalar, Array", [
+    [CalculateMissingPtUsingKalmanTracks   , CalculateMissingPtUsingKalmanTracksArray   ],
+    [CalculateOpeningAngleUsingKalmanTracks, CalculateOpeningAngleUsingKalmanTracksArray],
+    [CalculateRecoTUsingKalmanTracks       , CalculateRecoTUsingKalmanTracksArray       ]])
+def test_rows_and_arrays_match_the_objects(Scalar, Array):
+    muons, pions, columns, muonArrays, pionArrays = MakeContainers()
+    expected = [Scalar(muon, pion) for muon, pion in zip(muons, pions)]
+
+    rows = [Scalar(muonArrays.GetRow(i), pionArrays.GetRow(i)) for i in range(len(muons))]
+    np.testing.assert_allclose(rows, expected, rtol=1e-12, atol=0)
+    np.testing.assert_allclose(Array(muonArrays, pionArrays), expected, rtol=1e-9, atol=1e-12)
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+
+from classes import HistBins, HistCache, signalRegionCuts, backgroundRegionCuts
+
+
+def MakeBins(seed=0, weighted=True):
+    rng     = np.random.RandomState(seed)
+    content = rng.uniform(0, 10, 12)
+    return HistBins([10, 0.0, 1.0], content, content*rng.uniform(0.5, 1.5, 12) if (weighted) else None, 123.0)
+
+
+def MakeInput(tmp_path, name="input.root", content=b"events"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_key_follows_file_and_cuts(tmp_path):
+    cache  = HistCache(str(tmp_path / "cache"))
+    inFile = MakeInput(tmp_path)
+    key    = cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [200, 0, 1], 2.0)
+
+    assert cache.GetKey(inFile, "CreateSigTFile", dict(signalRegionCuts), [200, 0, 1], 2.0) == key
+    assert cache.GetKey(inFile, "CreateSigTFile", backgroundRegionCuts, [200, 0, 1], 2.0) != key
+    assert cache.GetKey(inFile, "CreateSigTFile", dict(signalRegionCuts, hitIDCut=0.5), [200, 0, 1], 2.0) != key
+    assert cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [100, 0, 1], 2.0) != key
+    assert cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [200, 0, 1], 1.0) != key
+    assert cache.GetKey(inFile, "CreateBkgdTFile", signalRegionCuts, [200, 0, 1], 2.0) != key
+
+    # a rewritten input file is a different entry
+    MakeInput(tmp_path, content=b"more events")
+    assert cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [200, 0, 1], 2.0) != key
+
+
+def test_content_hash_ignores_the_path(tmp_path):
+    cache = HistCache(str(tmp_path / "cache"), useContentHash=True)
+    first = MakeInput(tmp_path, "a.root")
+    copy  = MakeInput(tmp_path, "b.root")
+    other = MakeInput(tmp_path, "c.root", b"other events")
+    assert cache.GetKey(first, "CreateTRatio", {}, [200, 0, 1]) == cache.GetKey(copy, "CreateTRatio", {}, [200, 0, 1])
+    assert cache.GetKey(first, "CreateTRatio", {}, [200, 0, 1]) != cache.GetKey(other, "CreateTRatio", {}, [200, 0, 1])
+
+
+def test_miss_then_hit(tmp_path):
+    cache  = HistCache(str(tmp_path / "cache"))
+    inFile = MakeInput(tmp_path)
+    key    = cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [10, 0, 1])
+    assert cache.Load(key) is None
+
+    bins = {"hist": MakeBins(1), "unweighted": MakeBins(2, weighted=False)}
+    cache.Store(key, bins, inFile)
+    loaded = cache.Load(key)
+
+    assert list(loaded.keys()) == ["hist", "unweighted"]
+    for name, hist in bins.items():
+        assert loaded[name].binning == hist.binning
+        np.testing.assert_array_equal(loaded[name].GetContent(), hist.GetContent())
+        assert loaded[name].GetEntries() == hist.GetEntries()
+    np.testing.assert_array_equal(loaded["hist"].GetSumw2(), bins["hist"].GetSumw2())
+    assert loaded["unweighted"].GetSumw2() is None
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = HistCache(str(tmp_path / "cache"))
+    key   = cache.GetKey(MakeInput(tmp_path), "CreateSigTFile", signalRegionCuts, [10, 0, 1])
+    with open(cache.GetPath(key), "wb") as entry:
+        entry.write(b"not a npz file")
+
+    assert cache.Load(key) is None
+    assert not os.path.exists(cache.GetPath(key))
+
+
+def test_invalidate(tmp_path):
+    cache  = HistCache(str(tmp_path / "cache"))
+    inFile = MakeInput(tmp_path, "a.root")
+    other  = MakeInput(tmp_path, "b.root")
+    keys   = [cache.GetKey(inFile, "CreateSigTFile" , signalRegionCuts    , [10, 0, 1]),
+              cache.GetKey(inFile, "CreateBkgdTFile", backgroundRegionCuts, [10, 0, 1]),
+              cache.GetKey(other , "CreateSigTFile" , signalRegionCuts    , [10, 0, 1])]
+    for key, fileName in zip(keys, [inFile, inFile, other]):
+        cache.Store(key, {"hist": MakeBins()}, fileName)
+
+    assert cache.Invalidate(inFile=inFile) == 2
+    assert [cache.Load(key) is None for key in keys] == [True, True, False]
+    assert cache.Invalidate(key=keys[2]) == 1
+    assert cache.GetEntries() == []
+
+
+def test_evict_keeps_the_entry_just_stored(tmp_path):
+    # every entry alone is larger than the cache
+    cache  = HistCache(str(tmp_path / "cache"), maxSizeMB=1e-6)
+    inFile = MakeInput(tmp_path)
+    keys   = [cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [10, 0, i + 1]) for i in range(3)]
+    for key in keys:
+        cache.Store(key, {"hist": MakeBins()}, inFile)
+        assert [entry[0] for entry in cache.GetEntries()] == [cache.GetPath(key)]
+    assert cache.Load(keys[-1]) is not None
+
+
+def test_evict_drops_the_least_recently_used(tmp_path):
+    cache  = HistCache(str(tmp_path / "cache"))
+    inFile = MakeInput(tmp_path)
+    keys   = [cache.GetKey(inFile, "CreateSigTFile", signalRegionCuts, [10, 0, i + 1]) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.Store(key, {"hist": MakeBins()}, inFile)
+        os.utime(cache.GetPath(key), (1000 + i, 1000 + i))
+
+    # a hit makes the oldest entry the most recently used
+    cache.Load(keys[0])
+    size          = os.path.getsize(cache.GetPath(keys[0]))
+    cache.maxSize = 2*size
+    cache.Evict()
+    assert [cache.Load(key) is None for key in keys] == [False, True, False]
+
+    cache.maxSize = 0
+    cache.Evict(keep=cache.GetPath(keys[2]))
+    assert [entry[0] for entry in cache.GetEntries()] == [cache.GetPath(keys[2])]
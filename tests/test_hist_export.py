@@ -0,0 +1,58 @@
+import csv
+
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import ExportHists, HistTable, histToCSV
+from histcompare import MakeHist
+
+
+def histToCSVLoop(hist, fileName):
+    # bin by bin writer histToCSV replaced
+    with open(fileName, "w", newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=['bin', 'binContent', 'binerror'])
+        writer.writeheader()
+        writer.writerow({'bin': "under", 'binContent': hist.GetBinContent(0), 'binerror': hist.GetBinError(0)})
+        for i in range(1, hist.GetNbinsX() + 1):
+            writer.writerow({'bin': i, 'binContent': hist.GetBinContent(i), 'binerror': hist.GetBinError(i)})
+        writer.writerow({'bin': "over", 'binContent': hist.GetBinContent(hist.GetNbinsX() + 1),
+                         'binerror': hist.GetBinError(hist.GetNbinsX() + 1)})
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_hist_to_csv_writes_the_same_file(weighted, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    hist = MakeHist("exported", 20, weighted, [4])
+    histToCSV(hist)
+    histToCSVLoop(hist, "reference.csv")
+    assert (tmp_path/"exported.csv").read_text() == (tmp_path/"reference.csv").read_text()
+
+
+def test_hist_table_matches_the_th1_api(tmp_path):
+    hists = [MakeHist("a", 21, True, []), MakeHist("b", 22, False, [2])]
+    table = HistTable(hists)
+    row   = 0
+    for hist in hists:
+        for i in range(hist.GetNcells()):
+            assert table["name"   ][row] == hist.GetName()
+            assert table["bin"    ][row] == i
+            assert table["content"][row] == hist.GetBinContent(i)
+            assert table["error"  ][row] == pytest.approx(hist.GetBinError(i), rel=1e-15)
+            if (0 < i <= hist.GetNbinsX()):
+                assert table["lowEdge"][row] == pytest.approx(hist.GetXaxis().GetBinLowEdge(i), rel=1e-15, abs=1e-15)
+                assert table["upEdge" ][row] == pytest.approx(hist.GetXaxis().GetBinUpEdge(i) , rel=1e-15, abs=1e-15)
+            row += 1
+    assert row == len(table["bin"])
+
+    ExportHists(hists, str(tmp_path/"hists.csv"))
+    with open(tmp_path/"hists.csv") as csvfile:
+        assert len(list(csv.reader(csvfile))) == row + 1
+
+
+def test_hist_table_rejects_multidimensional_hists():
+    hist2D = ROOT.TH2D("hist2D", "", 4, 0, 1, 4, 0, 1)
+    hist2D.SetDirectory(0)
+    with pytest.raises(ValueError, match="hist2D"):
+        HistTable([MakeHist("a", 21, True, []), hist2D])
@@ -0,0 +1,10 @@
+import pytest
+
+from functions import MeasureImportTime, importTimeBudget
+
+
+@pytest.mark.parametrize("moduleName", ["headers", "functions", "classes"])
+def test_import_within_budget(moduleName):
+    report = MeasureImportTime(moduleName, importTimeBudget)
+    assert report["withinBudget"], f"import {moduleName} took {report['seconds']} s"
+    assert report["loadedBackends"] == []
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import *
+from classes import KalmanKinematics, MuonInfo, PionInfo
+
+# getter -> function it memoizes
+pairFunctions = [["GetRecoT"        , CalculateRecoTUsingKalmanTracks       ],
+                 ["GetMissingPt"    , CalculateMissingPtUsingKalmanTracks   ],
+                 ["GetVisibleAngle" , CalculateVisibleAngleUsingKalmanTracks],
+                 ["GetOpeningAngle" , CalculateOpeningAngleUsingKalmanTracks]]
+
+
+def MakeEvents(n=1000, seed=10):
+    rng    = np.random.RandomState(seed)
+    events = []
+    while (len(events) < n):
+        muon = MuonInfo(rng.choice([0, 1, 2]), rng.choice([-1, 0, 1])*rng.uniform(0, 1500), rng.choice([-1, 0, 1])*rng.uniform(0, 500),
+                        *rng.normal(size=3))
+        pion = PionInfo(rng.choice([1, 2]), 0.0, 0.0, 0.0, rng.choice([-1, 0, 1])*rng.uniform(0, 2), *rng.normal(size=6))
+        # the functions fail (sqrt of a negative number) below the muon mass
+        muonE = CalculateMuonEUsingKalmanTracks(muon)
+        if ((muonE > 0) and (muonE < 0.105658)):
+            continue
+        events.append([muon, pion])
+    return events
+
+
+@pytest.mark.parametrize("order", [1, -1])
+def test_getters_match_the_functions(order):
+    # both call orders, so every getter runs once on a cold and once on a warm cache
+    for muon, pion in MakeEvents():
+        kinematics = KalmanKinematics(muon, pion)
+        for getter, Function in pairFunctions[::order]:
+            assert getattr(kinematics, getter)() == Function(muon, pion)
+        assert kinematics.GetMuonE()  == CalculateMuonEUsingKalmanTracks(muon)
+        assert kinematics.GetPionE()  == CalculatePionEUsingKalmanTracks(pion)
+        assert kinematics.GetMuonPt() == CalculateMuonPtUsingKalmanTracks(muon)
+        assert kinematics.GetPionPt() == CalculatePionPtUsingKalmanTracks(pion)
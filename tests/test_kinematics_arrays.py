@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import *
+from eventsample import MakeEvents
+
+
+events = MakeEvents()
+
+
+@pytest.mark.parametrize("Scalar, Array", [
+    [CalculateMuonEUsingKalmanTracks , CalculateMuonEUsingKalmanTracksArray ],
+    [CalculateMuonPtUsingKalmanTracks, CalculateMuonPtUsingKalmanTracksArray]])
+def test_muon_variables(Scalar, Array):
+    muons, pions, muonArrays, pionArrays = events
+    np.testing.assert_allclose(Array(muonArrays), [Scalar(muon) for muon in muons], rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("Scalar, Array", [
+    [CalculatePionEUsingKalmanTracks , CalculatePionEUsingKalmanTracksArray ],
+    [CalculatePionPtUsingKalmanTracks, CalculatePionPtUsingKalmanTracksArray]])
+def test_pion_variables(Scalar, Array):
+    muons, pions, muonArrays, pionArrays = events
+    np.testing.assert_allclose(Array(pionArrays), [Scalar(pion) for pion in pions], rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("Scalar, Array", [
+    [CalculateMissingPtUsingKalmanTracks   , CalculateMissingPtUsingKalmanTracksArray   ],
+    [CalculateOpeningAngleUsingKalmanTracks, CalculateOpeningAngleUsingKalmanTracksArray],
+    [CalculateVisibleAngleUsingKalmanTracks, CalculateVisibleAngleUsingKalmanTracksArray],
+    [CalculateRecoTUsingKalmanTracks       , CalculateRecoTUsingKalmanTracksArray       ]])
+def test_pair_variables(Scalar, Array):
+    muons, pions, muonArrays, pionArrays = events
+    np.testing.assert_allclose(Array(muonArrays, pionArrays), [Scalar(muon, pion) for muon, pion in zip(muons, pions)],
+                               rtol=1e-9, atol=1e-12)
+
+
+def test_track_lengths():
+    muons, pions, muonArrays, pionArrays = events
+    args = [muonArrays.GetNTracks(), muonArrays.GetLenInAct(), muonArrays.GetLenInCat()]
+    assert list(TrkLenActArray(*args)) == [TrkLenAct(muon) for muon in muons]
+    assert list(TrkLenCatArray(*args)) == [TrkLenCat(muon) for muon in muons]
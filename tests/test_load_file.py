@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from classes import LoadFile
+from histcompare import AssertSameHist, MakeHist
+
+nDirs = 5
+
+
+@pytest.fixture
+def inputFile(tmp_path):
+    """File laid out like the builder outputs: trees, TotalPOT and one directory with hist and pot per sample"""
+    fileName = str(tmp_path / "input.root")
+    with ROOT.TDirectory.TContext():
+        f = ROOT.TFile(fileName, "RECREATE")
+        for treeName, nEntries in [["events", 17], ["spill", 3]]:
+            tree  = ROOT.TTree(treeName, "")
+            value = np.zeros(1)
+            tree.Branch("value", value, "value/D")
+            for i in range(nEntries):
+                value[0] = i
+                tree.Fill()
+            tree.Write()
+
+        totalPOT = ROOT.TH1D("TotalPOT", "", 1, 0, 1)
+        totalPOT.SetBinContent(1, 3.5e20)
+        totalPOT.Write()
+
+        for number in range(nDirs):
+            directory = f.mkdir(f"sample{number}")
+            directory.cd()
+            hist = MakeHist("hist", 10 + number, number % 2 == 0, [number + 1])
+            pot  = ROOT.TH1D("pot", "", 1, 0, 1)
+            pot.SetBinContent(1, (number + 1)*1e19)
+            hist.Write()
+            pot.Write()
+        f.Close()
+    return fileName
+
+
+def test_lazy_and_eager_read_the_same_objects(inputFile, tmp_path):
+    eager = LoadFile(inputFile)
+    lazy  = LoadFile(inputFile, lazy=True)
+
+    assert (lazy.GetNTrees(), lazy.GetNHists()) == (eager.GetNTrees(), eager.GetNHists()) == (2, nDirs)
+    for number in range(nDirs):
+        eagerHist, eagerPOT = eager.GetHistAndPOT(number)
+        lazyHist , lazyPOT  = lazy.GetHistAndPOT(number)
+        assert lazyHist.GetName() == eagerHist.GetName() == f"sample{number}"
+        AssertSameHist(lazyHist, eagerHist, rtol=0)
+        AssertSameHist(lazyPOT , eagerPOT , rtol=0)
+    for number in range(2):
+        assert lazy.GetTree(number).GetName()    == eager.GetTree(number).GetName()
+        assert lazy.GetTree(number).GetEntries() == eager.GetTree(number).GetEntries()
+    assert lazy.GetPOTHist().GetBinContent(1) == eager.GetPOTHist().GetBinContent(1) == 3.5e20
+
+    # the tables only agree once the lazy file has read every directory
+    eager.SaveCSV(str(tmp_path / "eager.csv"))
+    lazy .SaveCSV(str(tmp_path / "lazy.csv"))
+    assert (tmp_path / "lazy.csv").read_text() == (tmp_path / "eager.csv").read_text()
+    eager.Close()
+    lazy .Close()
+
+
+def test_print_content(inputFile, capsys):
+    pytest.importorskip("terminaltables")
+    eager = LoadFile(inputFile)
+    lazy  = LoadFile(inputFile, lazy=True)
+
+    lazy.PrintContent()
+    rows = capsys.readouterr().out
+    # directories not requested yet are listed from their keys
+    assert all(f"sample{number}" in rows for number in range(nDirs))
+    assert rows.count("TDirectoryFile") == nDirs
+
+    lazy.GetHists(range(nDirs))
+    lazy.PrintContent()
+    lazyTable = capsys.readouterr().out
+    eager.PrintContent()
+    assert lazyTable == capsys.readouterr().out
+    assert "TDirectoryFile" not in lazyTable and "TH1D" in lazyTable
+    eager.Close()
+    lazy .Close()
+
+
+def test_cached_hists_are_bounded(inputFile):
+    eager = LoadFile(inputFile)
+    lazy  = LoadFile(inputFile, lazy=True, maxCachedHists=2)
+
+    first = lazy.GetHistAndPOT(0)[0]
+    assert lazy.GetHistAndPOT(0)[0] is first
+    for number in [1, 0, 2, 3]:
+        lazy.GetHistAndPOT(number)
+        assert len(lazy.cachedHists) <= 2
+    # 0 was used after 1, so 1 was dropped first, then 0
+    assert list(lazy.cachedHists) == ["sample2", "sample3"]
+
+    # dropped histograms are read again from the file
+    reread = lazy.GetHistAndPOT(0)[0]
+    assert reread is not first
+    AssertSameHist(reread, eager.GetHistAndPOT(0)[0], rtol=0)
+    assert list(lazy.cachedHists) == ["sample3", "sample0"]
+    eager.Close()
+    lazy .Close()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import SignalRegionMask, BackgroundRegionMask
+from classes import HistRegion
+from histcompare import AssertSameHist
+
+binning = [200, 0, 1]
+
+
+def MakeColumns(n=6000, seed=21):
+    rng = np.random.RandomState(seed)
+    # |t| in under/overflow and on the bin edges, IDs at the thresholds
+    recoT = np.concatenate([rng.uniform(-0.2, 1.2, n - 4), [0.0, 1.0, 0.005, 0.995]])
+    return {"BestKalmanMuonID" : rng.choice([0.3, 0.4, 0.5, 0.9], n),
+            "FinalPionID"      : rng.choice([0.01, 0.05, 0.3, 0.31], n),
+            "FinalHitScore"    : rng.choice([0.01, 0.05, 0.46, 0.47], n),
+            "NewKinematicScore": rng.choice([0.5, 0.84, 0.85], n),
+            "RecoTKalman"      : recoT,
+            "weight"           : rng.uniform(0.5, 1.5, n),
+            "unitWeight"       : np.ones(n),
+            "shift"            : rng.uniform(0.9, 1.1, n)}
+
+
+def FillLoop(columns, cut, weights):
+    """Region filled event by event the way the CreateSigTFile/CreateBkgdTFile loops did"""
+    hist = ROOT.TH1D("loop", "", *binning)
+    hist.SetDirectory(0)
+    mask = cut(columns)
+    for i in range(len(mask)):
+        if (mask[i]):
+            hist.Fill(columns["RecoTKalman"][i], weights[i])
+    return hist
+
+
+@pytest.mark.parametrize("cut", [SignalRegionMask, BackgroundRegionMask])
+@pytest.mark.parametrize("weight", ["weight", "unitWeight", ["weight", "shift"]])
+def test_region_matches_the_event_loop(cut, weight):
+    columns = MakeColumns()
+    region  = HistRegion("region", "RecoTKalman", cut, binning, weight=weight)
+    hist    = region.Fill(columns).GetHist("region")
+
+    weights = columns["weight"]*columns["shift"] if (isinstance(weight, list)) else columns[weight]
+    AssertSameHist(hist, FillLoop(columns, cut, weights))
+
+
+def test_regions_share_one_read():
+    columns = MakeColumns()
+    regions = [HistRegion("sig" , "RecoTKalman", SignalRegionMask    , binning),
+               HistRegion("bkgd", "RecoTKalman", BackgroundRegionMask, binning)]
+    bins    = {region.GetName(): region.Fill(columns) for region in regions}
+
+    AssertSameHist(bins["sig"].GetHist("sig")  , FillLoop(columns, SignalRegionMask    , columns["weight"]))
+    AssertSameHist(bins["bkgd"].GetHist("bkgd"), FillLoop(columns, BackgroundRegionMask, columns["weight"]))
@@ -0,0 +1,36 @@
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from classes import OutputPolicy
+
+
+def test_session_file_is_never_the_current_directory(tmp_path):
+    ROOT.gROOT.cd()
+    sessionFile = str(tmp_path / "session_Objects.root")
+    policy      = OutputPolicy(formats=[], sessionFile=sessionFile)
+    c           = ROOT.TCanvas("policyCanvas", "", 200, 200)
+    hist        = ROOT.TH1D("policyHist", "", 10, 0, 1)
+    hist.SetDirectory(0)
+
+    created = []
+    for name in ["plot0", "plot1", "dir/plot2", "plot0"]:
+        policy.SaveObjects(c, [hist], name)
+        assert ROOT.gDirectory.GetPath() == ROOT.gROOT.GetPath()
+        # histograms created between plots belong to gROOT, not to the session file
+        created.append(ROOT.TH1D(f"created{len(created)}", "", 10, 0, 1))
+        assert created[-1].GetDirectory().GetPath() == ROOT.gROOT.GetPath()
+
+    policy.Close()
+    assert ROOT.gDirectory.GetPath() == ROOT.gROOT.GetPath()
+    # still owned by gROOT, Close did not delete them
+    assert [h.GetEntries() for h in created] == [0, 0, 0, 0]
+
+    f       = ROOT.TFile(sessionFile)
+    index   = str(f.Get("index").GetString()).split("\n")
+    subdirs = [key.GetName() for key in f.GetListOfKeys() if (key.GetClassName() == "TDirectoryFile")]
+    assert index == ["plot0", "plot1", "dir_plot2"]
+    assert sorted(subdirs) == sorted(index)
+    for name in index:
+        assert sorted(key.GetName() for key in f.GetDirectory(name).GetListOfKeys()) == ["policyCanvas", "policyHist"]
+    f.Close()
@@ -0,0 +1,43 @@
+import csv
+
+import numpy as np
+import pytest
+
+from classes import CreateParticleCandidateTable
+
+
+def SaveCSVFileLoop(candidates, particleName, csvFileName):
+    # list.count per distinct candidate, as CreateParticleCandidateTable did before
+    with open(csvFileName, "w", newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=[f"{particleName} Candidate", "Number of Events", "Percentage"])
+        writer.writeheader()
+        for particleCand in list(dict.fromkeys(candidates)):
+            writer.writerow({f"{particleName} Candidate": particleCand, "Number of Events": candidates.count(particleCand),
+                             "Percentage": round((candidates.count(particleCand)/len(candidates))*100, 3)})
+
+
+def MakeCandidates(n=5000, seed=23):
+    return np.random.RandomState(seed).choice([13, -13, 211, -211, 2212, 11, 22], n, p=[0.4, 0.05, 0.3, 0.1, 0.1, 0.03, 0.02])
+
+
+@pytest.mark.parametrize("asArray", [False, True])
+def test_csv_matches_the_count_loop(asArray, tmp_path):
+    candidates = MakeCandidates()
+    table      = CreateParticleCandidateTable(candidates if (asArray) else candidates.tolist(), "Muon", str(tmp_path/"table.csv"))
+    table.SaveCSVFile()
+    SaveCSVFileLoop(candidates.tolist(), "Muon", str(tmp_path/"reference.csv"))
+    assert (tmp_path/"table.csv").read_text() == (tmp_path/"reference.csv").read_text()
+
+
+def test_chunks_count_like_one_list(tmp_path):
+    candidates = MakeCandidates()
+    table      = CreateParticleCandidateTable(None, "Muon", str(tmp_path/"table.csv"))
+    for start in range(0, len(candidates), 700):
+        table.AddCandidates(candidates[start:start + 700])
+    table.SaveCSVFile()
+    SaveCSVFileLoop(candidates.tolist(), "Muon", str(tmp_path/"reference.csv"))
+    assert (tmp_path/"table.csv").read_text() == (tmp_path/"reference.csv").read_text()
+
+
+def test_empty_table():
+    assert CreateParticleCandidateTable([], "Pion", "unused.csv").GetPercentage(211) == 0.0
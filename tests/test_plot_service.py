@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from classes import FigureSpec, PlotService
+
+
+def MakeHist(name, nBins, xMax, fill):
+    hist = ROOT.TH1D(name, "", nBins, 0, xMax)
+    hist.SetDirectory(0)
+    for value in fill:
+        hist.Fill(value)
+    return hist
+
+
+def test_figures_get_their_own_axes(tmp_path):
+    specs = [FigureSpec([MakeHist("first" , 10, 1 , [0.25, 0.35, 0.35]),
+                         MakeHist("second", 10, 1 , [0.45])], ["first", "second"], str(tmp_path / "figure0"), [0.2, 0.8]),
+             FigureSpec([MakeHist("third" , 20, 20, [3, 5, 5, 9])] , ["third"]          , str(tmp_path / "figure1"), [2, 10])]
+    outFiles = PlotService(nWorkers=1, formats=["pdf", "root"]).Run(specs)
+
+    assert outFiles == [[str(tmp_path / f"figure{i}.{fileFormat}") for fileFormat in ["pdf", "root"]] for i in range(2)]
+    assert all(os.path.getsize(outFile) > 0 for files in outFiles for outFile in files)
+
+    # the range of every saved canvas is the one of its own figure, not the one of the figure before
+    for files, spec in zip(outFiles, specs):
+        f = ROOT.TFile(files[1])
+        c = f.Get(PlotService.canvas.GetName())
+        assert c.GetUxmin() == pytest.approx(spec.xRange[0])
+        assert c.GetUxmax() == pytest.approx(spec.xRange[1])
+        # the first histogram is drawn with its own frame, the others on top of it
+        options = {}
+        link    = c.GetListOfPrimitives().FirstLink()
+        while link:
+            options[link.GetObject().GetName()] = str(link.GetOption())
+            link = link.Next()
+        assert "TFrame" in options
+        assert [options[hist.GetName()] for hist in spec.hists] == ["hist"] + ["hist same"]*(len(spec.hists) - 1)
+        f.Close()
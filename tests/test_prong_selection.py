@@ -0,0 +1,31 @@
+import numpy as np
+
+from functions import SelectProngMuonCandidate, SelectProngMuonCandidateArrays
+from classes import ProngArrays
+
+
+def MakeProngs(nEvents=2000, seed=12):
+    rng     = np.random.RandomState(seed)
+    counts  = rng.choice([0, 1, 2, 3, 5, 8], nEvents)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    n       = offsets[-1]
+    # repeated MuonID/length values and lengths at the 500 cm threshold exercise the tie-breaking
+    muonID  = rng.choice([0.0, 0.1, 0.5, 0.5, 0.9], n)
+    length  = rng.choice([100.0, 499.9, 500.0, 500.0, 800.0, 1200.0], n)
+    zeros   = np.zeros(n)
+    return ProngArrays(offsets, muonID, zeros, length, zeros, zeros, zeros, zeros, zeros)
+
+
+def test_candidates_match_the_prong_loop():
+    prongs     = MakeProngs()
+    candidates = prongs.SelectMuonCandidates()
+    for event in range(prongs.GetNEvents()):
+        eventProngs = prongs.GetEventProngs(event)
+        if (len(eventProngs) == 0):
+            assert candidates[event] == -1
+            continue
+        assert candidates[event] == SelectProngMuonCandidate(eventProngs).index
+
+
+def test_no_events():
+    assert len(SelectProngMuonCandidateArrays([0], [], [])) == 0
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import SystematicEnvelopeArrays
+from classes import SystematicEnvelope
+from histcompare import (AssertSameHist, CalculateErrorOfRatioHistFullyCorelatedLoop, CalculateErrorOfRatioHistLoop, CreateCumulativePlotLoop,
+                         GetCells, MakeHist)
+
+
+def MakeShifts(weighted):
+    nominal = MakeHist("nominal", 16, weighted, [7])
+    shifted = [MakeHist(f"shift{i}", 17 + i, weighted, [3 + i, 7]) for i in range(4)]
+    return [nominal, shifted]
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_ratios_match_calculate_error_of_ratio_hist(weighted):
+    nominal, shifted = MakeShifts(weighted)
+    envelope         = SystematicEnvelope(nominal, shifted)
+    for index, hist in enumerate(shifted):
+        AssertSameHist(envelope.GetRatioHist(index), CalculateErrorOfRatioHistLoop(hist, nominal))
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_cumulative_ratios_match_the_cumulative_plots(weighted):
+    nominal, shifted = MakeShifts(weighted)
+    envelope         = SystematicEnvelope(nominal, shifted, cumulative=True)
+    nominalCum       = CreateCumulativePlotLoop(nominal)
+    for index, hist in enumerate(shifted):
+        AssertSameHist(envelope.GetRatioHist(index), CalculateErrorOfRatioHistLoop(CreateCumulativePlotLoop(hist), nominalCum))
+
+
+def test_correlated_ratios_match_in_the_visible_bins():
+    nominal, shifted = MakeShifts(True)
+    envelope         = SystematicEnvelope(nominal, shifted, isCorr=True)
+    nBins            = nominal.GetNbinsX()
+    for index, hist in enumerate(shifted):
+        content , errors    = GetCells(envelope.GetRatioHist(index))
+        expected, expErrors = GetCells(CalculateErrorOfRatioHistFullyCorelatedLoop(hist, nominal))
+        np.testing.assert_allclose(content[1:nBins + 1], expected [1:nBins + 1], rtol=1e-12, atol=0)
+        np.testing.assert_allclose(errors [1:nBins + 1], expErrors[1:nBins + 1], rtol=1e-12, atol=0)
+
+
+def test_paired_sources_take_the_larger_shift():
+    nominal = np.array([0.0, 10.0, 10.0, 0.0])
+    ratio   = np.array([[1.0, 1.2, 0.9, 1.0],     # knob up
+                        [1.0, 1.1, 0.8, 1.0],     # knob down, same direction as up in bin 1
+                        [1.0, 0.7, 1.3, 1.0]])    # second source
+    envelope = SystematicEnvelopeArrays(ratio, nominal, ["knob", "knob", "other"])
+    np.testing.assert_allclose(envelope["up"  ], [0.0, 0.2, 0.3, 0.0])
+    np.testing.assert_allclose(envelope["down"], [0.0, 0.3, 0.2, 0.0])
+
+    # without sources both knob shifts are added in quadrature
+    unpaired = SystematicEnvelopeArrays(ratio, nominal)
+    np.testing.assert_allclose(unpaired["up"][1], np.sqrt(0.2**2 + 0.1**2))
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+ROOT = pytest.importorskip("ROOT")
+
+from functions import FillBinArrays, FillUniverseBinArrays
+from classes import HistBins
+from histcompare import AssertSameHist
+
+binning = [200, 0, 1]
+
+
+def test_universe_rows_match_separate_fills():
+    rng     = np.random.RandomState(8)
+    values  = rng.uniform(-0.1, 1.1, 4000)
+    weights = rng.uniform(0.5, 1.5, (5, len(values)))
+
+    content, sumw2 = FillUniverseBinArrays(values, weights, *binning)
+    for universe in range(len(weights)):
+        rowContent, rowSumw2 = FillBinArrays(values, weights[universe], *binning)
+        np.testing.assert_allclose(content[universe], rowContent, rtol=1e-12, atol=0)
+        np.testing.assert_allclose(sumw2  [universe], rowSumw2  , rtol=1e-12, atol=0)
+
+
+def test_universe_hists_match_th1_fill():
+    rng     = np.random.RandomState(9)
+    values  = rng.uniform(-0.1, 1.1, 2000)
+    weights = rng.uniform(0.5, 1.5, (3, len(values)))
+    # universe 0 without any shift: TH1::Fill keeps Sumw2 off
+    weights[0] = 1
+
+    content, sumw2 = FillUniverseBinArrays(values, weights, *binning)
+    for universe in range(len(weights)):
+        hasSumw2 = np.any(weights[universe] != 1)
+        hist     = HistBins(binning, content[universe], sumw2[universe] if (hasSumw2) else None, len(values)).GetHist("universe")
+
+        reference = ROOT.TH1D("loop", "", *binning)
+        reference.SetDirectory(0)
+        for value, weight in zip(values, weights[universe]):
+            reference.Fill(value, weight)
+        AssertSameHist(hist, reference)